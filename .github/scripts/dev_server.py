@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Docs Dev Server
+Serves the docs site locally, watches docs/ and source files, rebuilds incrementally
+and live-reloads open pages
+
+The site is built into a throwaway directory (unless one is given), so serving
+never rewrites the committed docs-site, its manifest or its compressed files.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from typing import Dict, Iterable, List
+
+sys.path.insert(0, str(Path(__file__).parent))
+import site_generator
+
+SCRIPTS_DIR = Path(__file__).parent
+LANGUAGES_CONFIG = SCRIPTS_DIR.parent / 'config' / 'languages.json'
+
+# docs/ is tiny and polled often; a workspace walk costs more and a source edit
+# waits on the LLM anyway, so sources are polled less frequently
+POLL_INTERVAL = 0.25
+SOURCE_POLL_INTERVAL = 2.0
+# Let editors finish multi-file saves before rebuilding
+DEBOUNCE = 0.1
+
+WATCH_EXCLUDE_DIRS = {
+    'node_modules', '__pycache__', 'venv', 'env', 'dist', 'build', 'target',
+    'coverage', 'docs', 'docs-site', 'code-analysis',
+}
+DEFAULT_SOURCE_EXTENSIONS = {'.ts', '.js', '.tsx', '.jsx', '.py', '.go', '.rs', '.java'}
+
+RELOAD_PATH = '/__livereload'
+KEEPALIVE = 15
+
+RELOAD_SCRIPT = """<script>
+(function () {
+    var version = null;
+    var source = new EventSource('%s');
+    source.onmessage = function (e) {
+        if (version !== null && e.data !== version) location.reload();
+        version = e.data;
+    };
+})();
+</script>""" % RELOAD_PATH
+
+
+def source_extensions() -> set:
+    """Extensions generate-docs documents (from .github/config/languages.json)"""
+    try:
+        with open(LANGUAGES_CONFIG, 'r', encoding='utf-8') as f:
+            languages = json.load(f).get('languages', {})
+        extensions = {ext for conf in languages.values() for ext in conf.get('extensions', [])}
+        return extensions or DEFAULT_SOURCE_EXTENSIONS
+    except (OSError, ValueError):
+        return DEFAULT_SOURCE_EXTENSIONS
+
+
+def snapshot(root: Path, extensions: Iterable[str] = None, exclude_dirs: Iterable[str] = ()) -> Dict[str, tuple]:
+    """
+    Stat every matching file under root (hidden and excluded directories are pruned).
+
+    Returns:
+        path -> (mtime_ns, size)
+    """
+    extensions = set(extensions) if extensions is not None else None
+    exclude_dirs = set(exclude_dirs)
+    found = {}
+    stack = [str(root)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in exclude_dirs and not entry.name.startswith('.'):
+                            stack.append(entry.path)
+                    elif extensions is None or os.path.splitext(entry.name)[1] in extensions:
+                        stat = entry.stat()
+                        found[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    continue # deleted mid-scan
+    return found
+
+
+def changed_paths(old: Dict[str, tuple], new: Dict[str, tuple]) -> List[str]:
+    """Paths added, removed or modified between two snapshots"""
+    return sorted(path for path in old.keys() | new.keys() if old.get(path) != new.get(path))
+
+
+class ReloadHub:
+    """Build version counter that live-reload streams block on"""
+
+    def __init__(self):
+        self.version = 0
+        self._changed = threading.Condition()
+
+    def bump(self):
+        with self._changed:
+            self.version += 1
+            self._changed.notify_all()
+
+    def wait(self, seen: int, timeout: float = None) -> int:
+        """Block until the version moves past `seen` (or timeout); returns the current version"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != seen, timeout)
+            return self.version
+
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    """Static handler that injects the reload client into HTML and serves the reload stream"""
+
+    def __init__(self, *args, hub: ReloadHub = None, **kwargs):
+        self.hub = hub
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] == RELOAD_PATH:
+            return self._stream_reloads()
+
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, 'index.html')
+        if path.endswith('.html') and os.path.isfile(path):
+            return self._send_html(path)
+        return super().do_GET()
+
+    def end_headers(self):
+        # Never let the browser serve a stale page after a rebuild
+        self.send_header('Cache-Control', 'no-store')
+        super().end_headers()
+
+    def _send_html(self, path: str):
+        body = Path(path).read_bytes()
+        script = RELOAD_SCRIPT.encode('utf-8')
+        end = body.rfind(b'</body>')
+        body = body[:end] + script + body[end:] if end != -1 else body + script
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_reloads(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        version = self.hub.version
+        try:
+            while True:
+                # Sent on connect, on every rebuild and as a keepalive
+                self.wfile.write(f"data: {version}\n\n".encode('utf-8'))
+                self.wfile.flush()
+                version = self.hub.wait(version, timeout=KEEPALIVE)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class DevServer:
+    def __init__(self, docs_dir: Path = None, site_dir: Path = None, workspace: Path = None,
+                 host: str = '127.0.0.1', port: int = 8000, source_docs: bool = True):
+        self.docs_dir = Path(docs_dir or site_generator.DOCS_DIR)
+        self._temp_site = site_dir is None
+        self.site_dir = Path(site_dir or tempfile.mkdtemp(prefix='docs-dev-'))
+        self.workspace = Path(workspace or '.')
+        self.host = host
+        self.port = port
+        self.source_docs = source_docs
+        self.extensions = source_extensions()
+        self.hub = ReloadHub()
+        self.stop_event = threading.Event()
+
+        self._docs = {}
+        self._sources = {}
+        self._pending_sources = set()
+        self._pending_lock = threading.Lock()
+        self._docs_lock = threading.Lock()
+        self._generator = None
+
+    def build(self) -> Dict:
+        """Incremental build; bumps the reload version if anything on disk changed"""
+        with self._docs_lock:
+            start = time.perf_counter()
+            stats = site_generator.build_site(self.docs_dir, self.site_dir, compress=False)
+            if stats['rendered'] or stats['removed']:
+                self.hub.bump()
+                print(f"🔄 Rebuilt {len(stats['rendered'])} page(s) in {(time.perf_counter() - start) * 1000:.0f} ms")
+            return stats
+
+    def snapshot_docs(self) -> Dict[str, tuple]:
+        return snapshot(self.docs_dir, {'.md'})
+
+    def snapshot_sources(self) -> Dict[str, tuple]:
+        return snapshot(self.workspace, self.extensions, WATCH_EXCLUDE_DIRS)
+
+    def poll_docs(self) -> List[str]:
+        """Rebuild the site if any markdown under docs/ changed; returns the changed paths"""
+        current = self.snapshot_docs()
+        changed = changed_paths(self._docs, current)
+        if changed:
+            time.sleep(DEBOUNCE)
+            self._docs = self.snapshot_docs()
+            self.build()
+        return changed
+
+    def poll_sources(self) -> List[str]:
+        """Queue doc regeneration for changed source files; returns the changed paths"""
+        current = self.snapshot_sources()
+        changed = [p for p in changed_paths(self._sources, current) if p in current]
+        self._sources = current
+        if changed:
+            with self._pending_lock:
+                self._pending_sources.update(os.path.relpath(p, self.workspace) for p in changed)
+                # One generate-docs run at a time; edits made meanwhile go into the next run
+                if self._generator is None:
+                    self._generator = threading.Thread(target=self._regenerate_docs, daemon=True)
+                    self._generator.start()
+        return changed
+
+    def _regenerate_docs(self):
+        while not self.stop_event.is_set():
+            with self._pending_lock:
+                if not self._pending_sources:
+                    self._generator = None
+                    return
+                files = sorted(self._pending_sources)
+                self._pending_sources.clear()
+            print(f"📝 Regenerating docs for {len(files)} changed source file(s)")
+            subprocess.run([sys.executable, str(SCRIPTS_DIR / 'generate-docs.py'), *files], cwd=self.workspace)
+            # New markdown in docs/ is picked up by the docs watcher
+
+    def watch(self):
+        self._docs = self.snapshot_docs()
+        self._sources = self.snapshot_sources() if self.source_docs else {}
+        next_source_poll = time.monotonic() + SOURCE_POLL_INTERVAL
+
+        while not self.stop_event.wait(POLL_INTERVAL):
+            try:
+                self.poll_docs()
+                if self.source_docs and time.monotonic() >= next_source_poll:
+                    self.poll_sources()
+                    next_source_poll = time.monotonic() + SOURCE_POLL_INTERVAL
+            except Exception as e:
+                print(f"Warning: rebuild failed: {e}")
+
+    def make_server(self) -> ThreadingHTTPServer:
+        def handler(*args, **kwargs):
+            return DevRequestHandler(*args, hub=self.hub, directory=str(self.site_dir), **kwargs)
+
+        server = ThreadingHTTPServer((self.host, self.port), handler)
+        server.daemon_threads = True
+        return server
+
+    def serve_forever(self):
+        self.build()
+        server = self.make_server()
+        watcher = threading.Thread(target=self.watch, daemon=True)
+        watcher.start()
+
+        host, port = server.server_address[:2]
+        print(f"🌐 Serving {self.docs_dir}/ (built in {self.site_dir}) at http://{host}:{port}/ (Ctrl+C to stop)")
+        print(f"👀 Watching {self.docs_dir}/" + (" and source files" if self.source_docs else ""))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nStopping")
+        finally:
+            self.stop_event.set()
+            server.server_close()
+            self.close()
+
+    def close(self):
+        """Remove the throwaway site directory, if this server made one"""
+        if self._temp_site:
+            shutil.rmtree(self.site_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Serve the docs site with watch mode and live reload")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--no-source-docs', action='store_true',
+                        help="Only watch docs/, don't regenerate docs when source files change")
+    args = parser.parse_args()
+
+    DevServer(host=args.host, port=args.port, source_docs=not args.no_source_docs).serve_forever()
@@ -8,22 +8,75 @@ import os
 import re
 import ast
 import sys
+import hashlib
+from collections import Counter, defaultdict
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+DIAGRAM_CACHE_DIR = Path('.llm-cache') / 'diagrams'
+DIAGRAM_CACHE_VERSION = '1' # Bump when diagram output format changes
+ROOT_SLUG = 'top-level' # Page slug for files at the repository root
+RESERVED_SLUGS = {'index', ROOT_SLUG}
+
+VISIBILITY_PREFIX = {'public': '+', 'protected': '#', 'private': '-'}
+
+_analyzer = None
+_diagram_cache = {} # content hash -> diagram (per process)
+
+
+def _shared_analyzer():
+    """Lazily create one PolyglotAnalyzer per process (None if Tree-sitter is unavailable)"""
+    global _analyzer
+    if _analyzer is None:
+        try:
+            sys.path.insert(0, str(Path(__file__).parent))
+            from polyglot.polyglot_analyzer import PolyglotAnalyzer
+            _analyzer = PolyglotAnalyzer()
+        except ImportError as e:
+            print(f"Warning: Tree-sitter unavailable, using fallback parsers: {e}")
+            _analyzer = False
+    return _analyzer or None
+
 
 class DiagramGenerator:
-    def __init__(self):
+    def __init__(self, max_members: int = 5):
         self.classes = {} # name -> {inherits: [], methods: [], props: []}
         self.relationships = [] # (from, to, type)
+        self.max_members = max_members # Per kind (props/methods); None = no limit
 
-    def parse_file(self, file_path: str, content: str):
-        """Parse file content to extract structure"""
+    def parse_file(self, file_path: str, content: str, analyzer=None, tree=None):
+        """
+        Parse file content to extract structure.
+
+        Polyglot languages are read from the Tree-sitter tree; pass the caller's
+        analyzer/tree to reuse an existing parse instead of parsing again.
+        """
         ext = Path(file_path).suffix.lower()
-        if ext == '.py':
+        analyzer = analyzer or _shared_analyzer()
+        if analyzer is not None and ext.lstrip('.') in analyzer.parsers:
+            self._parse_classes(analyzer.extract_classes(content, ext, tree))
+        elif ext == '.py':
             self._parse_python(content)
         elif ext in ['.ts', '.js', '.java', '.cs', '.cpp', '.hpp']:
             self._parse_regex(content)
 
+    def _parse_classes(self, classes: List[Dict]):
+        """Load PolyglotAnalyzer.extract_classes() output"""
+        for cls in classes:
+            # Mermaid class names can't be qualified (mod.Base -> Base)
+            inherits = [base.split('.')[-1] for base in cls['bases'] if base]
+            self.classes[cls['name']] = {
+                'inherits': inherits,
+                'methods': [f"{VISIBILITY_PREFIX[m['visibility']]}{m['name']}()" for m in cls['methods']],
+                'props': [f"{VISIBILITY_PREFIX[f['visibility']]}{f['name']}" for f in cls['fields']]
+            }
+
+        for cls in classes:
+            for base in self.classes[cls['name']]['inherits']:
+                if base not in self.classes:
+                    self.classes[base] = {'inherits': [], 'methods': [], 'props': []}
+                self.relationships.append((base, cls['name'], '<|--'))
+
     def _parse_python(self, content: str):
         try:
             tree = ast.parse(content)
@@ -95,10 +148,13 @@ class DiagramGenerator:
         
         for cls, data in self.classes.items():
             lines.append(f"    class {cls} {{")
-            for prop in data['props'][:5]: # Limit to 5
-                lines.append(f"        {prop}")
-            for method in data['methods'][:5]: # Limit to 5
-                lines.append(f"        {method}")
+            for kind in ('props', 'methods'):
+                members = data[kind]
+                shown = members if self.max_members is None else members[:self.max_members]
+                for member in shown:
+                    lines.append(f"        {member}")
+                if len(members) > len(shown):
+                    lines.append(f"        +... {len(members) - len(shown)} more {kind}")
             lines.append("    }")
         
         for src, dst, rel in self.relationships:
@@ -108,9 +164,272 @@ class DiagramGenerator:
                 
         return "\n".join(lines)
 
+
+def generate_cached_diagram(file_path: str, content: str, analyzer=None, tree=None,
+                            max_members: int = 5, cache_dir: Path = DIAGRAM_CACHE_DIR) -> str:
+    """
+    Class diagram for a file, cached by content hash (in memory and on disk).
+    Unchanged files skip parsing entirely. The key includes which parser handles
+    the file, so a fallback diagram isn't served once Tree-sitter is available.
+    """
+    ext = Path(file_path).suffix.lower()
+    parsers = getattr(analyzer or _shared_analyzer(), 'parsers', ())
+    parser = 'tree-sitter' if ext.lstrip('.') in parsers else 'fallback'
+    key = hashlib.sha256(
+        f"{DIAGRAM_CACHE_VERSION}:{ext}:{parser}:{max_members}:{content}".encode('utf-8')
+    ).hexdigest()[:16]
+
+    if key in _diagram_cache:
+        return _diagram_cache[key]
+
+    cache_file = Path(cache_dir) / f"{key}.mmd" if cache_dir else None
+    if cache_file is not None and cache_file.exists():
+        try:
+            diagram = cache_file.read_text(encoding='utf-8')
+            _diagram_cache[key] = diagram
+            return diagram
+        except OSError:
+            pass
+
+    generator = DiagramGenerator(max_members=max_members)
+    generator.parse_file(file_path, content, analyzer=analyzer, tree=tree)
+    diagram = generator.generate_class_diagram()
+    _diagram_cache[key] = diagram
+
+    if cache_file is not None:
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            cache_file.write_text(diagram, encoding='utf-8')
+        except OSError:
+            pass
+
+    return diagram
+
+
+class DependencyDiagramGenerator:
+    """
+    Repository-level import graph diagrams (Mermaid flowcharts).
+
+    Small graphs render file by file. Larger graphs are collapsed into
+    directory clusters, pruned to the most connected nodes, and split into an
+    overview plus one linked sub-diagram per cluster so no single Mermaid
+    block grows past max_nodes.
+    """
+
+    def __init__(self, dependency_graph, max_nodes: int = 60, group_depth: int = 1):
+        """
+        Args:
+            dependency_graph: DependencyMapper.dependency_graph dict, or a DependencyGraph
+            max_nodes: Upper bound on nodes in any single diagram
+            group_depth: Directory levels used as the cluster key
+        """
+        self.max_nodes = max_nodes
+        self.group_depth = group_depth
+        self.files = set()
+        self.edges = set() # (source, dependency)
+        self._slugs = None
+
+        if isinstance(dependency_graph, dict):
+            items = dependency_graph.items()
+        else:
+            items = ((path, dependency_graph.dependencies(path)) for path in dependency_graph.paths)
+
+        for source, deps in items:
+            self.files.add(source)
+            for dep in deps:
+                self.files.add(dep)
+                if dep != source:
+                    self.edges.add((source, dep))
+
+    def cluster_of(self, path: str) -> str:
+        """Directory prefix (group_depth levels) a file is collapsed into"""
+        parts = path.split('/')[:-1][:self.group_depth]
+        return '/'.join(parts) if parts else '.'
+
+    def clusters(self) -> Dict[str, List[str]]:
+        grouped = defaultdict(list)
+        for path in sorted(self.files):
+            grouped[self.cluster_of(path)].append(path)
+        return dict(grouped)
+
+    def _collapse(self, mapping) -> Counter:
+        """Re-key edges through mapping(path) -> node; drops edges that collapse to self-loops"""
+        weights = Counter()
+        for src, dst in self.edges:
+            a, b = mapping(src), mapping(dst)
+            if a is not None and b is not None and a != b:
+                weights[(a, b)] += 1
+        return weights
+
+    @staticmethod
+    def _top_k(nodes, weights: Counter, k: int):
+        """Keep the k most connected nodes (by weighted degree, ties by name)"""
+        if len(nodes) <= k:
+            return set(nodes)
+        degree = Counter({n: 0 for n in nodes})
+        for (a, b), w in weights.items():
+            degree[a] += w
+            degree[b] += w
+        ranked = sorted(nodes, key=lambda n: (-degree[n], n))
+        return set(ranked[:k])
+
+    def slug(self, cluster: str) -> str:
+        """
+        Page name for a cluster. The root cluster gets ROOT_SLUG; a directory whose
+        name is reserved or clashes with another's (a-b vs a_b/A-B) gets a -2, -3... suffix.
+        """
+        if self._slugs is None:
+            self._slugs = {'.': ROOT_SLUG}
+            taken = set(RESERVED_SLUGS)
+            for name in sorted(c for c in self.clusters() if c != '.'):
+                base = re.sub(r'[^A-Za-z0-9_-]+', '-', name).strip('-').lower() or 'dir'
+                slug, n = base, 1
+                while slug in taken:
+                    n += 1
+                    slug = f"{base}-{n}"
+                taken.add(slug)
+                self._slugs[name] = slug
+        return self._slugs[cluster]
+
+    @staticmethod
+    def _label(text: str) -> str:
+        return text.replace('"', '#quot;')
+
+    def _render(self, nodes, weights: Counter, labels: Dict[str, str],
+                links: Dict[str, str] = None, groups: Dict[str, str] = None, omitted: int = 0) -> str:
+        """Render a flowchart; nodes get stable short IDs since paths aren't valid Mermaid IDs"""
+        ids = {node: f"n{i}" for i, node in enumerate(sorted(nodes))}
+        lines = ["flowchart LR"]
+        if omitted:
+            lines.append(f"    %% {omitted} less-connected nodes omitted")
+
+        by_group = defaultdict(list)
+        for node in sorted(nodes):
+            by_group[(groups or {}).get(node)].append(node)
+
+        for g, (group, members) in enumerate(sorted(by_group.items(), key=lambda item: item[0] or '')):
+            indent = "    "
+            if group:
+                lines.append(f'    subgraph g{g}["{self._label(group)}"]')
+                indent = "        "
+            for node in members:
+                lines.append(f'{indent}{ids[node]}["{self._label(labels.get(node, node))}"]')
+            if group:
+                lines.append("    end")
+
+        for (a, b), w in sorted(weights.items()):
+            if a in ids and b in ids:
+                arrow = f"-->|{w}|" if w > 1 else "-->"
+                lines.append(f"    {ids[a]} {arrow} {ids[b]}")
+
+        for node, target in sorted((links or {}).items()):
+            if node in ids:
+                lines.append(f'    click {ids[node]} "{target}"')
+
+        return "\n".join(lines)
+
+    def generate_overview(self, link_format: str = "{slug}.md") -> str:
+        """
+        Top-level diagram: individual files when they fit in max_nodes,
+        otherwise one node per directory cluster linking to its sub-diagram.
+        """
+        if len(self.files) <= self.max_nodes:
+            weights = self._collapse(lambda p: p)
+            groups = {p: self.cluster_of(p) for p in self.files}
+            return self._render(self.files, weights, {}, groups=groups)
+
+        clusters = self.clusters()
+        weights = self._collapse(self.cluster_of)
+        keep = self._top_k(clusters, weights, self.max_nodes)
+        labels = {c: f"{c} ({len(clusters[c])} files)" for c in keep}
+        links = {c: link_format.format(slug=self.slug(c)) for c in keep} if link_format else None
+        return self._render(keep, weights, labels, links=links, omitted=len(clusters) - len(keep))
+
+    def generate_cluster_diagram(self, cluster: str, link_format: str = "{slug}.md") -> str:
+        """Files inside one cluster, plus neighbouring clusters collapsed to single linked nodes"""
+        members = set(self.clusters().get(cluster, []))
+
+        def mapping(path):
+            return path if path in members else f"cluster:{self.cluster_of(path)}"
+
+        weights = self._collapse(mapping)
+        # Only keep external clusters that actually touch this one
+        nodes = set(members)
+        for a, b in weights:
+            if a in members or b in members:
+                nodes.update((a, b))
+
+        internal = self._top_k(members, weights, self.max_nodes)
+        external = {n for n in nodes if n not in members}
+        external = self._top_k(external, weights, max(0, self.max_nodes - len(internal)))
+        keep = internal | external
+
+        prefix = '' if cluster == '.' else cluster + '/'
+        labels = {n: n[len('cluster:'):] + "/" if n in external else n[len(prefix):] for n in keep}
+        links = {n: link_format.format(slug=self.slug(n[len('cluster:'):])) for n in external} if link_format else None
+        groups = {n: cluster for n in internal}
+        return self._render(keep, weights, labels, links=links, groups=groups, omitted=len(nodes) - len(keep))
+
+    def generate_pages(self, title: str = "Dependency Graph") -> Dict[str, str]:
+        """Markdown pages: index.md (overview) and one <cluster>.md per cluster when split"""
+        pages = {}
+        clusters = self.clusters()
+        split = len(self.files) > self.max_nodes
+        # Diagram clicks point at the pages as written; Markdown links below do the same
+        link_format = "{slug}.md"
+
+        index = f"# {title}\n\n"
+        index += f"{len(self.files)} files, {len(self.edges)} import edges, {len(clusters)} directories.\n\n"
+        index += "```mermaid\n" + self.generate_overview(link_format) + "\n```\n"
+
+        if split:
+            index += "\n## Directories\n\n"
+            for cluster in sorted(clusters):
+                slug = self.slug(cluster)
+                index += f"- [{cluster}]({slug}.md) - {len(clusters[cluster])} files\n"
+                pages[f"{slug}.md"] = (
+                    f"# {title}: {cluster}\n\n"
+                    f"[Back to overview](index.md)\n\n"
+                    "```mermaid\n" + self.generate_cluster_diagram(cluster, link_format) + "\n```\n"
+                )
+
+        pages['index.md'] = index
+        return pages
+
+    def write_pages(self, out_dir, title: str = "Dependency Graph") -> List[Path]:
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        for name, content in self.generate_pages(title).items():
+            path = out_dir / name
+            path.write_text(content, encoding='utf-8')
+            written.append(path)
+        return written
+
+
+def generate_dependency_pages(workspace_root: str, out_dir: str, max_nodes: int = 60, group_depth: int = 1):
+    """Scan a workspace with DependencyMapper and write linked dependency diagram pages"""
+    sys.path.insert(0, str(Path(__file__).parent))
+    from polyglot.dependency_mapper import DependencyMapper
+
+    mapper = DependencyMapper(workspace_root)
+    mapper.scan_workspace()
+    generator = DependencyDiagramGenerator(mapper.build_graph(), max_nodes=max_nodes, group_depth=group_depth)
+    return generator.write_pages(out_dir)
+
+
 def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == '--deps':
+        # diagram_generator.py --deps <workspace_root> [out_dir]
+        root = sys.argv[2] if len(sys.argv) > 2 else '.'
+        out_dir = sys.argv[3] if len(sys.argv) > 3 else 'docs-site/dependencies'
+        for path in generate_dependency_pages(root, out_dir):
+            print(f"Generated {path}")
+        return
+
     if len(sys.argv) < 2:
         print("Usage: diagram-generator.py <file_path>")
+        print("       diagram-generator.py --deps <workspace_root> [out_dir]")
         sys.exit(1)
         
     file_path = sys.argv[1]
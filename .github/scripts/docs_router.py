@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Docs Router
+Deterministic source path -> Pages/Wiki routing from .github/docs-routing.yml
+
+All route globs are compiled into one alternation regex, so a path is matched
+against every rule in a single scan; the first rule (in file order) wins. The
+publishing engine consults the router before the LLM and only unmatched files
+go to an LLM routing call.
+
+Glob syntax: `**/` matches any number of leading directories, `**` anything,
+`*` and `?` stay within one path segment. A pattern that matches a directory
+also matches everything under it.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import yaml
+except ImportError:  # PyYAML isn't installed by the workflows; the simple parser below covers this file
+    yaml = None
+
+ROUTING_FILE = Path('.github/docs-routing.yml')
+DEFAULT_STRATEGY = {'prefer_rules': True, 'llm_fallback': True}
+
+
+def glob_to_regex(glob: str) -> str:
+    """Regex source (unanchored) for one routing glob"""
+    regex = ''
+    i = 0
+    while i < len(glob):
+        if glob.startswith('**/', i):
+            regex += '(?:.*/)?'
+            i += 3
+        elif glob.startswith('**', i):
+            regex += '.*'
+            i += 2
+        elif glob[i] == '*':
+            regex += '[^/]*'
+            i += 1
+        elif glob[i] == '?':
+            regex += '[^/]'
+            i += 1
+        else:
+            regex += re.escape(glob[i])
+            i += 1
+    # A matching directory covers its contents
+    return regex + '(?:/.*)?'
+
+
+def _scalar(value: str):
+    value = value.strip()
+    if value[:1] in ('"', "'") and value[-1:] == value[:1]:
+        return value[1:-1]
+    lowered = value.lower()
+    if lowered in ('true', 'yes', 'on'):
+        return True
+    if lowered in ('false', 'no', 'off'):
+        return False
+    return value
+
+
+def parse_simple_yaml(text: str) -> Dict:
+    """
+    The YAML subset docs-routing.yml uses: top-level keys holding either a list
+    of flat mappings (`- key: value`) or a flat mapping, with # comments.
+    """
+    data = {}
+    section = None
+    for raw in text.splitlines():
+        line = re.sub(r'\s+#.*$', '', raw).rstrip()
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        indent = len(line) - len(line.lstrip())
+        key, _, value = line.strip().lstrip('- ').partition(':')
+        key = key.strip()
+
+        if indent == 0:
+            section = key
+            data[section] = _scalar(value) if value.strip() else None
+        elif line.strip().startswith('- '):
+            if not isinstance(data[section], list):
+                data[section] = []
+            data[section].append({key: _scalar(value)})
+        elif isinstance(data[section], list):
+            data[section][-1][key] = _scalar(value)
+        else:
+            if data[section] is None:
+                data[section] = {}
+            data[section][key] = _scalar(value)
+    return data
+
+
+def load_routing_config(path: Path = ROUTING_FILE) -> Dict:
+    """Parsed docs-routing.yml ({} if it's missing or unreadable)"""
+    try:
+        text = Path(path).read_text(encoding='utf-8')
+    except OSError:
+        return {}
+    try:
+        return (yaml.safe_load(text) if yaml else parse_simple_yaml(text)) or {}
+    except Exception as e:
+        print(f"⚠️  Could not parse {path}: {e}")
+        return {}
+
+
+class DocsRouter:
+    def __init__(self, routes: List[Dict], strategy: Dict = None):
+        self.routes = [r for r in routes if isinstance(r, dict) and r.get('glob')]
+        self.strategy = dict(DEFAULT_STRATEGY, **(strategy or {}))
+        self.stats = {'matched': 0, 'unmatched': 0}
+        pattern = '|'.join(f"(?P<r{i}>{glob_to_regex(r['glob'])})" for i, r in enumerate(self.routes))
+        self._pattern = re.compile(pattern) if pattern else None
+
+    @classmethod
+    def from_file(cls, path: Path = ROUTING_FILE) -> 'DocsRouter':
+        config = load_routing_config(path)
+        return cls(config.get('routes') or [], config.get('strategy') or {})
+
+    def match(self, source_path: str) -> Optional[Dict]:
+        """The first route whose glob matches the path: {'glob', 'pages', 'wiki'}, or None"""
+        found = self._pattern.fullmatch(Path(source_path).as_posix()) if self._pattern else None
+        if found:
+            self.stats['matched'] += 1
+            return self.routes[int(found.lastgroup[1:])]
+        self.stats['unmatched'] += 1
+        return None
+
+    def hit_rate(self) -> float:
+        total = self.stats['matched'] + self.stats['unmatched']
+        return self.stats['matched'] / total if total else 0.0
+
+    def report(self) -> str:
+        total = self.stats['matched'] + self.stats['unmatched']
+        return f"{self.stats['matched']}/{total} files matched a routing rule ({self.hit_rate():.0%})"
@@ -23,10 +23,13 @@ from datetime import datetime
 from datetime import datetime
 import requests
 from llm import get_client
+from provenance import ProvenanceIndex
+from markdown_sections import single_root
 
 # Add polyglot path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'polyglot'))
 from polyglot_analyzer import PolyglotAnalyzer
+from diagram_generator import generate_cached_diagram
 
 # Load Config
 CONFIG_PATH = Path(__file__).parent.parent / 'config' / 'languages.json'
@@ -46,12 +49,21 @@ def get_file_hash(content):
     """Generate SHA256 hash of content"""
     return hashlib.sha256(content.encode('utf-8')).hexdigest()
 
-def extract_symbols_detailed(content, file_path):
-    """Extract symbols using PolyglotAnalyzer"""
+_analyzer = None
+
+def get_analyzer():
+    """Shared PolyglotAnalyzer (parsers are built once per run)"""
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = PolyglotAnalyzer()
+    return _analyzer
+
+def extract_symbols_detailed(content, file_path, tree=None):
+    """Extract symbols using PolyglotAnalyzer (pass `tree` to reuse an existing parse)"""
     try:
-        analyzer = PolyglotAnalyzer()
+        analyzer = get_analyzer()
         ext = Path(file_path).suffix
-        raw_symbols = analyzer.extract_symbols(content, ext)
+        raw_symbols = analyzer.extract_symbols(content, ext, tree)
         
         symbols = []
         for sym in raw_symbols:
@@ -87,13 +99,13 @@ def extract_symbols_detailed(content, file_path):
         print(f"Polyglot extraction error for {file_path}: {e}")
         return []
 
-def detect_breaking_changes(old_content, new_content, file_path):
+def detect_breaking_changes(old_content, new_content, file_path, new_tree=None):
     """Detect breaking changes between versions"""
     if not old_content:
         return {'has_breaking': False, 'changes': []}
     
     old_symbols = {s['name']: s for s in extract_symbols_detailed(old_content, file_path)}
-    new_symbols = {s['name']: s for s in extract_symbols_detailed(new_content, file_path)}
+    new_symbols = {s['name']: s for s in extract_symbols_detailed(new_content, file_path, new_tree)}
     
     breaking_changes = []
     
@@ -179,10 +191,10 @@ Be thorough but concise. Format as GitHub-flavored Markdown."""
     except Exception as e:
         return f"Error: {e}"
 
-def generate_changelog_entry(file_path, old_content, new_content, breaking_info):
+def generate_changelog_entry(file_path, old_content, new_content, breaking_info, new_tree=None):
     """Generate changelog entry for this change"""
     old_symbols = {s['name']: s for s in extract_symbols_detailed(old_content, file_path)} if old_content else {}
-    new_symbols = {s['name']: s for s in extract_symbols_detailed(new_content, file_path)}
+    new_symbols = {s['name']: s for s in extract_symbols_detailed(new_content, file_path, new_tree)}
     
     added = [name for name in new_symbols if name not in old_symbols and new_symbols[name]['exported']]
     removed = [name for name in old_symbols if name not in new_symbols and old_symbols[name]['exported']]
@@ -313,14 +325,16 @@ def main():
     print("Advanced Auto Documentation Generator")
     print("="*80)
     
-    # Read changed files
-    if not os.path.exists('changed_files.txt'):
+    # Read changed files: named on the command line, or listed by the workflow
+    if len(sys.argv) > 1:
+        changed_files = sys.argv[1:]
+    elif os.path.exists('changed_files.txt'):
+        with open('changed_files.txt', 'r') as f:
+            changed_files = [line.strip() for line in f if line.strip()]
+    else:
         print("No changed files detected")
         sys.exit(0)
     
-    with open('changed_files.txt', 'r') as f:
-        changed_files = [line.strip() for line in f if line.strip()]
-    
     # Filter supported files
     supported_exts = set()
     for conf in LANGUAGE_CONFIG.values():
@@ -389,6 +403,8 @@ def main():
     # Process Docs
     docs_dir = Path('docs')
     docs_dir.mkdir(exist_ok=True)
+    # doc -> source index the Pages/Wiki managers resolve sources from
+    provenance = ProvenanceIndex()
     
     doc_files_created = []
     changelog_entries = []
@@ -398,7 +414,9 @@ def main():
         print(f"\n📝 {Path(file_path).name}...")
         
         old_content = old_contents.get(file_path, '')
-        breaking_info = detect_breaking_changes(old_content, content, file_path)
+        # Parse once; symbols, breaking changes and the diagram all share this tree
+        tree = get_analyzer().parse(content, Path(file_path).suffix)
+        breaking_info = detect_breaking_changes(old_content, content, file_path, tree)
         
         if breaking_info['has_breaking']:
             all_breaking_changes.extend(breaking_info['changes'])
@@ -412,15 +430,9 @@ def main():
         
         diff_context += f"```typescript\n{content}\n```\n\n"
         
-        # Generate Diagram
+        # Generate Diagram (cached by content hash)
         try:
-             # We import here to avoid circular dependencies or path issues at top level if not careful
-             sys.path.append(str(Path(__file__).parent))
-             from diagram_generator import DiagramGenerator
-             
-             diagram_gen = DiagramGenerator()
-             diagram_gen.parse_file(file_path, content)
-             diagram = diagram_gen.generate_class_diagram()
+             diagram = generate_cached_diagram(file_path, content, analyzer=get_analyzer(), tree=tree)
         except Exception as e:
             print(f"  Warning: Diagram generation failed: {e}")
             diagram = ""
@@ -432,27 +444,28 @@ def main():
         doc_filename = Path(file_path).stem + '.md'
         doc_path = docs_dir / doc_filename
         
+        doc_text = f"# {Path(file_path).name}\n\n"
+        doc_text += f"*Auto-generated from `{file_path}`*\n\n"
+        if breaking_info['has_breaking']:
+            doc_text += "## ⚠️ Breaking Changes\n\n"
+            for change in breaking_info['changes']:
+                doc_text += f"- **{change['type'].upper()}**: {change['message']}\n"
+        
+        if diagram:
+            doc_text += "## 🏗️ Structure\n\n```mermaid\n" + diagram + "\n```\n\n"
+        
+        doc_text += doc_content
+        
+        # One root heading per doc, so Pages/Wiki merges see the whole doc as one section
         with open(doc_path, 'w') as f:
-             f.write(f"# {Path(file_path).name}\n\n")
-             f.write(f"*Auto-generated from `{file_path}`*\n\n")
-             if breaking_info['has_breaking']:
-                 f.write("## ⚠️ Breaking Changes\n\n")
-                 for change in breaking_info['changes']:
-                     f.write(f"- **{change['type'].upper()}**: {change['message']}\n")
-             
-             if diagram:
-                f.write("## 🏗️ Structure\n\n")
-                f.write("```mermaid\n")
-                f.write(diagram)
-                f.write("\n```\n\n")
-                
-             f.write(doc_content)
+            f.write(single_root(doc_text))
              
+        provenance.record(doc_path, file_path, doc_cache[file_path])
         doc_files_created.append(str(doc_path))
         print(f"   ✓ Created {doc_path}")
 
          # Generate changelog entry
-        changelog = generate_changelog_entry(file_path, old_content, content, breaking_info)
+        changelog = generate_changelog_entry(file_path, old_content, content, breaking_info, tree)
         if changelog:
             changelog_entries.append({
                 'file': Path(file_path).name,
@@ -476,6 +489,7 @@ def main():
 
     # Save Cache
     with open(CACHE_FILE, 'w') as f: json.dump(doc_cache, f)
+    provenance.save()
     
     print("\n" + "="*80)
     print("COMPLETE")
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Mapping Store
+SQLite-backed source file <-> page mapping shared by the Pages and Wiki managers
+
+The committed JSON mapping (.github/pages-mapping.json, .github/wiki-mapping.json)
+stays the format of record; the store is a working copy next to it:
+
+  meta(key, value)              - version, description, site_structure, ... as JSON
+  pages(page, data)             - per-page metadata (created, last_updated, ...)
+  file_pages(file, page, seq)   - the mapping itself, indexed both ways
+  unexported(kind, name)        - files and pages recorded since the last export
+
+The database runs in WAL mode so readers never block and parallel workers can
+record mappings concurrently: every write is a short BEGIN IMMEDIATE transaction.
+When the JSON file changes underneath it (a git pull, a manual edit, another run
+exporting) the store re-imports it and re-applies what it recorded since its last
+export, so export_json() merges with the file on disk rather than overwriting it.
+Runs on different checkouts still only meet in git, where the JSON can conflict.
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+from pathlib import Path
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+SCHEMA_VERSION = 1
+BUSY_TIMEOUT = 30  # seconds a writer waits for another worker's transaction
+
+# Mapping keys handled relationally; everything else is stored in meta as-is
+RELATIONAL_KEYS = ('file_to_page', 'page_metadata')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    page TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS file_pages (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    file TEXT NOT NULL,
+    page TEXT NOT NULL,
+    UNIQUE (file, page)
+);
+CREATE INDEX IF NOT EXISTS file_pages_by_page ON file_pages (page, file);
+CREATE TABLE IF NOT EXISTS unexported (
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (kind, name)
+);
+"""
+
+
+def db_path_for(json_path: Path) -> Path:
+    """.github/pages-mapping.json -> .github/pages-mapping.db"""
+    return Path(json_path).with_suffix('.db')
+
+
+class MappingStore:
+    """
+    File -> page(s) mapping with page metadata.
+
+    multi_page: a file may map to several pages (Pages); otherwise recording a new
+    page for a file replaces the old one (Wiki).
+    files_key: name of the per-page file list in the exported JSON ('sources' or 'files').
+    """
+
+    def __init__(self, json_path: Path, db_path: Path = None, multi_page: bool = False,
+                 files_key: str = 'files', defaults: Dict = None):
+        self.json_path = Path(json_path)
+        self.db_path = Path(db_path) if db_path else db_path_for(self.json_path)
+        self.multi_page = multi_page
+        self.files_key = files_key
+        self.defaults = defaults or {}
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=BUSY_TIMEOUT, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self.sync_from_json()
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction; takes the write lock up front so concurrent upserts serialize"""
+        if self.conn.in_transaction:
+            yield self.conn  # nested: part of the outer transaction
+            return
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        self.conn.execute('COMMIT')
+
+    # -- JSON import / export --
+
+    def _json_digest(self) -> Optional[str]:
+        try:
+            return hashlib.sha256(self.json_path.read_bytes()).hexdigest()
+        except OSError:
+            return None
+
+    def sync_from_json(self) -> bool:
+        """
+        Re-import the JSON mapping if it changed since the store last wrote or read it,
+        keeping what was recorded since the last export on top of it
+        """
+        with self.transaction():
+            digest = self._json_digest()
+            if digest is not None and digest == self.get('_json_hash'):
+                return False
+            initialized = self.get('_schema') == SCHEMA_VERSION
+            if digest is None:
+                # No JSON yet: keep what the store has, or start from the defaults
+                if not initialized:
+                    self._import(self.defaults)
+                return not initialized
+
+            with open(self.json_path, 'r', encoding='utf-8') as f:
+                mapping = json.load(f)
+            changes = self._local_changes()
+            self._import(mapping)
+            self._reapply(*changes)
+            self.set('_json_hash', digest)
+            return True
+
+    def _local_changes(self) -> Tuple[Dict[str, List[str]], Dict[str, Dict]]:
+        """Mappings (file -> pages) and page metadata recorded since the last export"""
+        files = {file: self.pages_for(file) for (file,) in self.conn.execute(
+            "SELECT name FROM unexported WHERE kind = 'file'")}
+        pages = {}
+        for (page,) in self.conn.execute("SELECT name FROM unexported WHERE kind = 'page'"):
+            row = self.conn.execute('SELECT data FROM pages WHERE page = ?', (page,)).fetchone()
+            if row:
+                pages[page] = json.loads(row[0])
+        return files, pages
+
+    def _reapply(self, files: Dict[str, List[str]], pages: Dict[str, Dict]):
+        conn = self.conn
+        for file, file_pages in files.items():
+            if not self.multi_page:
+                conn.execute('DELETE FROM file_pages WHERE file = ?', (file,))
+            conn.executemany('INSERT OR IGNORE INTO file_pages (file, page) VALUES (?, ?)',
+                             [(file, page) for page in file_pages])
+        for page, data in pages.items():
+            row = conn.execute('SELECT data FROM pages WHERE page = ?', (page,)).fetchone()
+            merged = json.loads(row[0]) if row else {}
+            merged.update(data)
+            conn.execute(
+                'INSERT INTO pages (page, data) VALUES (?, ?) ON CONFLICT (page) DO UPDATE SET data = excluded.data',
+                (page, json.dumps(merged))
+            )
+
+    def _import(self, mapping: Dict):
+        conn = self.conn
+        conn.execute('DELETE FROM meta')
+        conn.execute('DELETE FROM pages')
+        conn.execute('DELETE FROM file_pages')
+        self.set('_schema', SCHEMA_VERSION)
+        for key, value in mapping.items():
+            if key not in RELATIONAL_KEYS:
+                self.set(key, value)
+
+        pairs = []
+        for file, pages in mapping.get('file_to_page', {}).items():
+            for page in ([pages] if isinstance(pages, str) else pages):
+                pairs.append((file, page))
+        # file_to_page order is kept for export; page file lists only add what it lacks
+        conn.executemany('INSERT OR IGNORE INTO file_pages (file, page) VALUES (?, ?)', pairs)
+        mapped = {file for file, _ in pairs}
+
+        for page, metadata in mapping.get('page_metadata', {}).items():
+            data = {k: v for k, v in metadata.items() if k != self.files_key}
+            conn.execute('INSERT INTO pages (page, data) VALUES (?, ?)', (page, json.dumps(data)))
+            files = metadata.get(self.files_key, [])
+            if not self.multi_page:
+                # A stale entry under a page the file has since moved away from
+                files = [f for f in files if f not in mapped]
+            conn.executemany('INSERT OR IGNORE INTO file_pages (file, page) VALUES (?, ?)',
+                             [(f, page) for f in files])
+
+    def to_dict(self) -> Dict:
+        """The mapping in its JSON layout"""
+        mapping = {k: v for k, v in self._meta_items() if not k.startswith('_')}
+
+        file_to_page = {}
+        page_files = {}
+        for file, page in self.conn.execute('SELECT file, page FROM file_pages ORDER BY seq'):
+            if self.multi_page:
+                file_to_page.setdefault(file, []).append(page)
+            else:
+                file_to_page[file] = page
+            page_files.setdefault(page, []).append(file)
+
+        page_metadata = {}
+        for page, data in self.conn.execute('SELECT page, data FROM pages ORDER BY rowid'):
+            metadata = json.loads(data)
+            # Keep the file list right after 'created', as the managers always wrote it
+            ordered = {k: metadata.pop(k) for k in ('created',) if k in metadata}
+            ordered[self.files_key] = page_files.get(page, [])
+            ordered.update(metadata)
+            page_metadata[page] = ordered
+
+        mapping['file_to_page'] = file_to_page
+        mapping['page_metadata'] = page_metadata
+        return mapping
+
+    def export_json(self):
+        """Atomically rewrite the JSON mapping from the store, merged with any newer file on disk"""
+        with self.transaction():
+            self.sync_from_json()
+            self.set('last_updated', datetime.now().isoformat())
+            data = json.dumps(self.to_dict(), indent=2)
+            self.json_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.json_path.with_name(f"{self.json_path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, self.json_path)
+            self.set('_json_hash', hashlib.sha256(data.encode('utf-8')).hexdigest())
+            self.conn.execute('DELETE FROM unexported')
+
+    # -- meta --
+
+    def _meta_items(self) -> List[Tuple[str, Any]]:
+        return [(k, json.loads(v)) for k, v in self.conn.execute('SELECT key, value FROM meta ORDER BY rowid')]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, key: str, value: Any):
+        self.conn.execute(
+            'INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value',
+            (key, json.dumps(value))
+        )
+
+    # -- lookups (index seeks, never full scans) --
+
+    def pages_for(self, file: str) -> List[str]:
+        return [row[0] for row in self.conn.execute(
+            'SELECT page FROM file_pages WHERE file = ? ORDER BY seq', (file,))]
+
+    def page_for(self, file: str) -> Optional[str]:
+        pages = self.pages_for(file)
+        return pages[0] if pages else None
+
+    def files_for(self, page: str) -> List[str]:
+        return [row[0] for row in self.conn.execute(
+            'SELECT file FROM file_pages WHERE page = ? ORDER BY seq', (page,))]
+
+    def page_metadata(self, page: str) -> Optional[Dict]:
+        row = self.conn.execute('SELECT data FROM pages WHERE page = ?', (page,)).fetchone()
+        if not row:
+            return None
+        metadata = json.loads(row[0])
+        metadata[self.files_key] = self.files_for(page)
+        return metadata
+
+    def pages(self) -> List[str]:
+        return [row[0] for row in self.conn.execute('SELECT page FROM pages ORDER BY page')]
+
+    def mappings(self, limit: int = None) -> List[Tuple[str, str]]:
+        """(file, page) pairs in the order they were recorded"""
+        query = 'SELECT file, page FROM file_pages ORDER BY seq'
+        if limit is not None:
+            query += f' LIMIT {int(limit)}'
+        return list(self.conn.execute(query))
+
+    def page_count(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+
+    def file_count(self) -> int:
+        return self.conn.execute('SELECT COUNT(DISTINCT file) FROM file_pages').fetchone()[0]
+
+    # -- writes --
+
+    def record(self, file: str, page: str, **metadata):
+        """
+        Upsert file -> page and the page's metadata in one transaction.
+        Sets created (new pages) and last_updated; extra keyword fields are merged in.
+        """
+        now = datetime.now().isoformat()
+        with self.transaction() as conn:
+            if not self.multi_page:
+                conn.execute('DELETE FROM file_pages WHERE file = ? AND page != ?', (file, page))
+            conn.execute('INSERT OR IGNORE INTO file_pages (file, page) VALUES (?, ?)', (file, page))
+
+            row = conn.execute('SELECT data FROM pages WHERE page = ?', (page,)).fetchone()
+            data = json.loads(row[0]) if row else {'created': now}
+            data['last_updated'] = now
+            data.update(metadata)
+            conn.execute(
+                'INSERT INTO pages (page, data) VALUES (?, ?) ON CONFLICT (page) DO UPDATE SET data = excluded.data',
+                (page, json.dumps(data))
+            )
+            conn.executemany('INSERT OR IGNORE INTO unexported (kind, name) VALUES (?, ?)',
+                             [('file', file), ('page', page)])
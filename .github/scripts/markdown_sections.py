@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Markdown Sections
+Heading-based section model so page merges can target one section
+
+A section is a heading line plus everything up to the next heading of the same
+or a higher level (so it includes its subsections). Text before the first
+heading - frontmatter, intro - is the preamble and is never merged into.
+
+structural_merge() reconciles an old and a regenerated section by heading
+path and symbol name without an LLM, raising MergeConflict when the two
+structures can't be matched up unambiguously.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+_HEADING = re.compile(r'^(#{1,6})[ \t]+(.+?)[ \t]*#*[ \t]*$')
+_FENCE = re.compile(r'^[ \t]*(`{3,}|~{3,})')
+_FRONTMATTER_END = re.compile(r'^---[ \t]*$')
+# The line generate-docs writes under a doc's root heading
+_GENERATED_FROM = re.compile(r'^\*Auto-generated from `[^`]*`\*')
+
+# Rough chars-per-token ratio used to size max_tokens for a section merge
+CHARS_PER_TOKEN = 3
+
+
+class MergeConflict(Exception):
+    """Old and new section trees can't be reconciled deterministically"""
+
+
+def normalize_title(title: str) -> str:
+    """`login()` -> login, '🏗️ Structure' -> structure, 'Auth.ts' -> auth ts"""
+    title = re.sub(r'\(.*?\)', '', title)
+    title = re.sub(r'[^\w\s]', ' ', title.lower())
+    return ' '.join(title.split())
+
+
+def section_key(title: str) -> str:
+    """Match key for a heading: the symbol in its first code span if any (`login(user)` -> login)"""
+    code = re.search(r'`([^`]+)`', title)
+    return normalize_title(code.group(1) if code else title)
+
+
+def shift_headings(text: str, delta: int) -> str:
+    """Move every heading (outside code fences) delta levels deeper, clamped to h1..h6"""
+    if delta == 0:
+        return text
+    lines = text.splitlines(keepends=True)
+    fence = None
+    for i, line in enumerate(lines):
+        fence_match = _FENCE.match(line)
+        if fence_match:
+            marker = fence_match.group(1)[0]
+            fence = marker if fence is None else (None if marker == fence else fence)
+            continue
+        if fence is None:
+            heading = _HEADING.match(line.rstrip('\n'))
+            if heading:
+                level = max(1, min(6, len(heading.group(1)) + delta))
+                lines[i] = '#' * level + line[len(heading.group(1)):]
+    return ''.join(lines)
+
+
+def first_heading(text: str) -> Optional[str]:
+    doc = MarkdownDocument(text)
+    return doc.sections[0][1] if doc.sections else None
+
+
+def single_root(text: str) -> str:
+    """
+    A generated doc as one heading-rooted section.
+
+    Docs used to be a '# auth.ts' stub (source line, breaking changes, structure)
+    followed by the LLM's own '# Authentication Module' and its sections; those
+    later top-level headings are moved one level below the stub's heading.
+    """
+    doc = MarkdownDocument(text)
+    if not doc.sections:
+        return text
+    level = doc.sections[0][0]
+    end = doc.span(0)[1]
+    if end == len(doc.lines):
+        return text
+    rest = ''.join(doc.lines[end:])
+    top = min(lvl for lvl, _, line in doc.sections if line >= end)
+    return ''.join(doc.lines[:end]) + shift_headings(rest, level + 1 - top)
+
+
+def strip_fences(text: str) -> str:
+    """Remove a ```markdown wrapper an LLM may have put around its answer"""
+    text = text.strip()
+    if text.startswith('```markdown'):
+        text = text[11:]
+    elif text.startswith('```'):
+        text = text[3:]
+    if text.endswith('```'):
+        text = text[:-3]
+    return text.strip()
+
+
+def merge_token_budget(*texts: str, minimum: int = 512, maximum: int = 8000) -> int:
+    """max_tokens for a merge that returns roughly the size of its inputs"""
+    estimate = sum(len(t) for t in texts) // CHARS_PER_TOKEN + 256
+    return max(minimum, min(maximum, estimate))
+
+
+class MarkdownDocument:
+    """
+    Line-based view of a markdown page.
+
+    sections: [(level, title, start_line), ...] in document order; headings inside
+    code fences and frontmatter are ignored.
+    """
+
+    def __init__(self, text: str):
+        self.lines = text.splitlines(keepends=True)
+        self.sections = []
+
+        fence = None
+        start = 0
+        # Skip frontmatter
+        if self.lines and _FRONTMATTER_END.match(self.lines[0].rstrip('\n')):
+            for i in range(1, len(self.lines)):
+                if _FRONTMATTER_END.match(self.lines[i].rstrip('\n')):
+                    start = i + 1
+                    break
+
+        for i in range(start, len(self.lines)):
+            line = self.lines[i].rstrip('\n')
+            fence_match = _FENCE.match(line)
+            if fence_match:
+                marker = fence_match.group(1)[0]
+                if fence is None:
+                    fence = marker
+                elif marker == fence:
+                    fence = None
+                continue
+            if fence is not None:
+                continue
+            heading = _HEADING.match(line)
+            if heading:
+                self.sections.append((len(heading.group(1)), heading.group(2), i))
+
+    def span(self, index: int) -> Tuple[int, int]:
+        """Line range [start, end) of a section including its subsections"""
+        level, _, start = self.sections[index]
+        for next_level, _, next_start in self.sections[index + 1:]:
+            if next_level <= level:
+                return start, next_start
+        return start, len(self.lines)
+
+    def is_doc_root(self, index: int) -> bool:
+        """Whether a heading is the root generate-docs wrote for a source file"""
+        for line in self.lines[self.sections[index][2] + 1:]:
+            if line.strip():
+                return bool(_GENERATED_FROM.match(line.strip()))
+        return False
+
+    def block_span(self, index: int) -> Tuple[int, int]:
+        """
+        span(), except that a generated doc's root runs on to the next generated doc
+        (or a shallower heading): docs written before single_root() continue past
+        their stub with top-level headings of their own.
+        """
+        start, end = self.span(index)
+        if not self.is_doc_root(index):
+            return start, end
+        level = self.sections[index][0]
+        for j in range(index + 1, len(self.sections)):
+            next_level, _, line = self.sections[j]
+            # A heading with nothing under it but another doc is that doc's wrapper
+            wrapper = (j + 1 < len(self.sections) and self.is_doc_root(j + 1)
+                       and not self.body(j).strip())
+            if next_level < level or self.is_doc_root(j) or wrapper:
+                return start, line
+        return start, len(self.lines)
+
+    def block_text(self, index: int) -> str:
+        start, end = self.block_span(index)
+        return ''.join(self.lines[start:end])
+
+    def children(self, index: int) -> List[int]:
+        """Direct subsections of a section"""
+        start, end = self.span(index)
+        result = []
+        child_level = None
+        for i in range(index + 1, len(self.sections)):
+            level, _, line = self.sections[i]
+            if line >= end:
+                break
+            if child_level is None or level <= child_level:
+                child_level = level
+                result.append(i)
+        return result
+
+    def body(self, index: int) -> str:
+        """Text between a section's heading line and its first subsection"""
+        start, end = self.span(index)
+        kids = self.children(index)
+        stop = self.sections[kids[0]][2] if kids else end
+        return ''.join(self.lines[start + 1:stop])
+
+    def text(self, index: int) -> str:
+        start, end = self.span(index)
+        return ''.join(self.lines[start:end])
+
+    def path(self, index: int) -> List[str]:
+        """Heading titles from the outermost ancestor down to this section"""
+        level = self.sections[index][0]
+        path = [self.sections[index][1]]
+        for i in range(index - 1, -1, -1):
+            if self.sections[i][0] < level:
+                level = self.sections[i][0]
+                path.insert(0, self.sections[i][1])
+        return path
+
+    def find(self, title: str, level: int = None) -> Optional[int]:
+        """Index of the first section whose normalized title matches (outermost level wins)"""
+        wanted = normalize_title(title)
+        matches = [
+            i for i, (lvl, text, _) in enumerate(self.sections)
+            if normalize_title(text) == wanted and (level is None or lvl == level)
+        ]
+        if not matches:
+            return None
+        return min(matches, key=lambda i: (self.sections[i][0], i))
+
+    def replace(self, index: int, new_section: str, block: bool = False) -> str:
+        """Full document text with one section (and its subsections, or its whole block) swapped out"""
+        start, end = self.block_span(index) if block else self.span(index)
+        heading_line = self.lines[start]
+
+        new_section = new_section.strip('\n')
+        # Keep the heading even if the merge returned only the body
+        if not _HEADING.match(new_section.split('\n', 1)[0]):
+            new_section = heading_line.rstrip('\n') + '\n\n' + new_section
+        new_section += '\n'
+        if end < len(self.lines):
+            new_section += '\n'
+
+        return ''.join(self.lines[:start]) + new_section + ''.join(self.lines[end:])
+
+    def append(self, new_section: str) -> str:
+        body = ''.join(self.lines).rstrip('\n')
+        return body + '\n\n' + new_section.strip('\n') + '\n'
+
+
+def structural_merge(old_section: str, new_section: str) -> Tuple[str, Dict[str, int]]:
+    """
+    Merge a regenerated section into its old version by heading structure.
+
+    The new content is authoritative: subsections are matched by symbol key and
+    replaced, new ones are added and ones missing from the new content are removed.
+    The result keeps the old section's heading level.
+
+    Returns:
+        (merged section text, {'added', 'replaced', 'removed', 'unchanged'} counts)
+
+    Raises:
+        MergeConflict: the two roots are different headings, the old section is a
+        leaf whose text differs (it may be hand-written), duplicate headings among
+        siblings, no shared subsections, or new content that isn't a single
+        heading-rooted section
+    """
+    old = MarkdownDocument(old_section)
+    new = MarkdownDocument(new_section)
+    if not old.sections or old.sections[0][2] != 0:
+        raise MergeConflict("old section doesn't start with a heading")
+    if not new.sections or ''.join(new.lines[:new.sections[0][2]]).strip():
+        raise MergeConflict("new content has text before its first heading")
+    if new.span(0)[1] != len(new.lines):
+        raise MergeConflict("new content has more than one top-level section")
+    if section_key(old.sections[0][1]) != section_key(new.sections[0][1]):
+        raise MergeConflict(f"'{old.sections[0][1]}' and '{new.sections[0][1]}' are different sections")
+    if not old.children(0) and old.body(0).strip() != new.body(0).strip():
+        raise MergeConflict("old section has no subsections to match and its text differs")
+
+    stats = {'added': 0, 'replaced': 0, 'removed': 0, 'unchanged': 0}
+    merged = _merge_node(old, 0, new, 0, old.sections[0][0], stats)
+    return merged, stats
+
+
+def _merge_node(old: MarkdownDocument, oi: int, new: MarkdownDocument, ni: int, level: int,
+                stats: Dict[str, int]) -> str:
+    old_children = old.children(oi)
+    new_children = new.children(ni)
+    old_keys = [section_key(old.sections[i][1]) for i in old_children]
+    new_keys = [section_key(new.sections[i][1]) for i in new_children]
+
+    if len(set(old_keys)) != len(old_keys) or len(set(new_keys)) != len(new_keys):
+        raise MergeConflict("duplicate sibling headings")
+    if old_children and not new_children:
+        raise MergeConflict("new content drops every subsection")
+    if old_children and new_children and not set(old_keys) & set(new_keys):
+        raise MergeConflict("no subsections in common")
+
+    body = new.body(ni)
+    if not body.strip():
+        body = old.body(oi)
+    text = '#' * level + ' ' + new.sections[ni][1] + '\n' + body
+
+    old_by_key = dict(zip(old_keys, old_children))
+    for key, child in zip(new_keys, new_children):
+        new_text = shift_headings(new.text(child), level + 1 - new.sections[child][0])
+        if key not in old_by_key:
+            stats['added'] += 1
+            merged = new_text
+        elif old.text(old_by_key[key]) == new_text:
+            stats['unchanged'] += 1
+            merged = new_text
+        else:
+            changes = stats['added'] + stats['replaced'] + stats['removed']
+            merged = _merge_node(old, old_by_key[key], new, child, level + 1, stats)
+            # Count the change once, at the deepest level it was recorded
+            if stats['added'] + stats['replaced'] + stats['removed'] == changes:
+                stats['replaced'] += 1
+        if text and not text.endswith('\n\n'):
+            text += '\n' if text.endswith('\n') else '\n\n'
+        text += merged
+
+    stats['removed'] += len(set(old_keys) - set(new_keys))
+    return text
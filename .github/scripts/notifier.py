@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Notifier
+Delivers notification payloads to Discord, Slack and Pushbullet concurrently
+
+Every configured sink is posted to at once over one pooled requests.Session,
+and the whole dispatch shares a single deadline: a slow or hanging webhook
+costs at most DEFAULT_DEADLINE seconds in total instead of delaying the sinks
+after it. Each delivery reports its own status and latency.
+
+A request cut off after it was sent (the deadline or the read timeout hit while
+waiting for the response) may well have been delivered: it is reported as
+`unknown`, and callers should not resend it.
+"""
+
+import os
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+PUSHBULLET_URL = 'https://api.pushbullet.com/v2/pushes'
+DEFAULT_DEADLINE = 15.0  # seconds for the whole dispatch
+CONNECT_TIMEOUT = 5.0
+
+
+class Sink:
+    """One notification destination: a display name, the URL to POST to and any headers"""
+
+    def __init__(self, name: str, url: str, headers: Optional[Dict] = None):
+        self.name = name
+        self.url = url
+        self.headers = headers or {}
+
+    def __repr__(self):
+        return f"Sink({self.name!r})"
+
+
+class Delivery:
+    """Outcome of posting one payload to one sink"""
+
+    def __init__(self, sink: Sink, ok: bool, status: Optional[int] = None, latency: float = 0.0,
+                 error: Optional[str] = None, retry_after: Optional[float] = None, unknown: bool = False):
+        self.sink = sink
+        self.ok = ok
+        self.status = status
+        self.latency = latency # seconds
+        self.error = error
+        self.retry_after = retry_after # seconds the sink asked us to wait (HTTP 429)
+        self.unknown = unknown # sent, but cut off before the response: may have been delivered
+
+    def describe(self) -> str:
+        timing = f"({self.latency * 1000:.0f} ms)"
+        if self.ok:
+            return f"✓ {self.sink.name}: Sent {timing}"
+        if self.unknown:
+            return f"❔ {self.sink.name}: Unknown - {self.error}, may have been delivered {timing}"
+        reason = self.error or f"HTTP {self.status}"
+        if self.status is not None and self.error:
+            reason = f"HTTP {self.status}: {self.error}"
+        return f"❌ {self.sink.name}: Failed - {reason} {timing}"
+
+
+def retry_after(response) -> Optional[float]:
+    """Seconds to back off from a 429: the Retry-After header, or Discord's JSON retry_after"""
+    try:
+        return max(0.0, float(response.headers['Retry-After']))
+    except (KeyError, TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, float(response.json()['retry_after']))
+    except Exception:
+        return None
+
+
+def configured_sinks(env: Dict = None) -> Dict[str, Sink]:
+    """'discord' / 'slack' / 'pushbullet' -> Sink, for each one with a webhook URL or token set"""
+    env = os.environ if env is None else env
+    sinks = {}
+    if env.get('DISCORD_WEBHOOK_URL'):
+        sinks['discord'] = Sink('Discord', env['DISCORD_WEBHOOK_URL'])
+    if env.get('SLACK_WEBHOOK_URL'):
+        sinks['slack'] = Sink('Slack', env['SLACK_WEBHOOK_URL'])
+    if env.get('PUSHBULLET'):
+        sinks['pushbullet'] = Sink('Pushbullet', PUSHBULLET_URL, {'Access-Token': env['PUSHBULLET']})
+    return sinks
+
+
+def make_session(pool_size: int = 10) -> requests.Session:
+    """A session whose connection pool can serve every sink at once (no hidden retries)"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class Notifier:
+    def __init__(self, deadline: float = DEFAULT_DEADLINE, session: requests.Session = None):
+        self.deadline = deadline
+        self.session = session or make_session()
+
+    def dispatch(self, messages: List[Tuple[Sink, Dict]]) -> List[Delivery]:
+        """POST each (sink, payload) concurrently; one Delivery per message, in order"""
+        if not messages:
+            return []
+        start = time.monotonic()
+        deadline = start + self.deadline
+
+        executor = ThreadPoolExecutor(max_workers=len(messages), thread_name_prefix='notify')
+        futures = [executor.submit(self._post, sink, payload, deadline) for sink, payload in messages]
+        wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        # Don't block on stragglers; their own timeouts are bounded by the deadline
+        executor.shutdown(wait=False)
+
+        deliveries = []
+        for (sink, _), future in zip(messages, futures):
+            if future.done():
+                deliveries.append(future.result())
+            else:
+                # A request that never started wasn't sent; one still running may land
+                started = not future.cancel()
+                deliveries.append(Delivery(sink, False, latency=time.monotonic() - start,
+                                           error='deadline exceeded', unknown=started))
+        return deliveries
+
+    def _post(self, sink: Sink, payload: Dict, deadline: float) -> Delivery:
+        start = time.monotonic()
+        remaining = deadline - start
+        if remaining <= 0:
+            return Delivery(sink, False, error='deadline exceeded')
+        try:
+            response = self.session.post(sink.url, json=payload, headers=sink.headers,
+                                         timeout=(min(CONNECT_TIMEOUT, remaining), remaining))
+        except Exception as e:
+            # The exception text includes the URL, and webhook URLs are secrets
+            return Delivery(sink, False, latency=time.monotonic() - start, error=type(e).__name__,
+                            unknown=isinstance(e, requests.exceptions.ReadTimeout))
+
+        latency = time.monotonic() - start
+        if 200 <= response.status_code < 300:
+            return Delivery(sink, True, response.status_code, latency)
+        return Delivery(sink, False, response.status_code, latency, response.text[:200] or None,
+                        retry_after(response) if response.status_code == 429 else None)
+
+
+def report(deliveries: List[Delivery]):
+    """Print one line per delivery with its latency"""
+    for delivery in deliveries:
+        print(delivery.describe())
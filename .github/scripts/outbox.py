@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Notification Outbox
+Persistent queue between send-notifications.py and the webhooks
+
+Notifications are enqueued per sink in .github/notification-outbox.json and sent
+by flush():
+
+  - coalescing: the first event after a quiet period goes out at once; events
+    within COALESCE_WINDOW of the last send are held and later go out together
+    as one digest (built by the caller), so a merge train posts twice, not dozens
+    of times
+  - retries: a failed send stays queued with exponential backoff, up to
+    MAX_ATTEMPTS; rejected payloads (4xx) and exhausted items go to a dead-letter list.
+    A send with an unknown outcome (cut off after the request went out) is not
+    retried, so a notification is never posted twice: delivery is at most once
+  - rate limits: a 429 blocks that sink for its Retry-After, and a sink is never
+    posted to more often than MIN_INTERVAL allows
+
+Held digests and retries are sent by the next flush: the next push, or the
+scheduled notification-outbox workflow.
+
+The outbox is not committed: the workflows keep it in the Actions cache and share
+one concurrency group, so runs take turns and each starts from the last run's
+state. `head` records the newest commit seen, which lets a run queue the commits
+of any run that was cancelled while waiting its turn (see send-notifications.py).
+Commits seen while their own run was still going are kept in `deferred` until
+that run queues them or ends without doing so.
+A cache entry unused for 7 days is evicted, which only loses what was still held.
+"""
+
+import os
+import json
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from notifier import Delivery, Notifier, Sink
+
+OUTBOX_VERSION = 1
+OUTBOX_FILE = Path('.github/notification-outbox.json')
+COALESCE_WINDOW = 600  # seconds
+MAX_ATTEMPTS = 5
+BASE_BACKOFF = 60  # seconds, doubled after every failed attempt
+MAX_BACKOFF = 3600
+DEAD_LETTER_LIMIT = 50
+# Minimum seconds between posts to one sink (Discord webhooks allow 5 per 2 s, Slack about 1 per s)
+MIN_INTERVAL = {'discord': 0.4, 'slack': 1.0, 'pushbullet': 1.0}
+
+
+class Outbox:
+    def __init__(self, path: Path = OUTBOX_FILE, window: float = COALESCE_WINDOW,
+                 clock: Callable[[], float] = time.time):
+        self.path = Path(path)
+        self.window = window
+        self.clock = clock
+        self.pending = [] # {'sink', 'event', 'payload', 'created', 'attempts', 'next_attempt', 'last_error'}
+        self.sinks = {} # sink key -> {'last_sent', 'last_attempt', 'blocked_until'}
+        self.dead = []
+        self.head = None # newest commit queued or deferred
+        self.deferred = [] # commits passed over while their own run was in flight
+        self.dirty = False
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == OUTBOX_VERSION:
+                self.pending = data.get('pending', [])
+                self.sinks = data.get('sinks', {})
+                self.dead = data.get('dead', [])
+                self.head = data.get('head')
+                self.deferred = data.get('deferred', [])
+        except (OSError, ValueError):
+            print(f"⚠️  Outbox {self.path} unreadable, starting empty")
+
+    def save(self):
+        """Write the outbox atomically (only if it changed)"""
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': OUTBOX_VERSION, 'pending': self.pending, 'sinks': self.sinks,
+                       'dead': self.dead, 'head': self.head, 'deferred': self.deferred},
+                      f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def enqueue(self, sink_key: str, payload: Optional[Dict], event: Dict):
+        """
+        Queue a notification. `payload` is what to send if it goes out alone (None:
+        a digest of just this event); `event` is the summary a digest is built from.
+        An event already queued for the sink (same event['id'], e.g. a re-run
+        workflow) is replaced, not repeated.
+        """
+        self.pending = [item for item in self.pending
+                        if not (item['sink'] == sink_key and event.get('id') and item['event'].get('id') == event['id'])]
+        self.pending.append({
+            'sink': sink_key,
+            'event': event,
+            'payload': payload,
+            'created': self.clock(),
+            'attempts': 0,
+            'next_attempt': 0,
+            'last_error': None,
+        })
+        self.dirty = True
+
+    def queued(self, sink_key: str) -> List[Dict]:
+        return [item for item in self.pending if item['sink'] == sink_key]
+
+    def advance(self, sha: str):
+        """Record `sha` as the newest commit queued or deferred"""
+        if sha != self.head:
+            self.head = sha
+            self.dirty = True
+
+    def defer(self, sha: str):
+        """Leave `sha` for its own run to queue"""
+        if sha not in self.deferred:
+            self.deferred.append(sha)
+            self.dirty = True
+
+    def undefer(self, sha: str) -> bool:
+        """Stop waiting for `sha`'s run; True if it was deferred"""
+        if sha not in self.deferred:
+            return False
+        self.deferred.remove(sha)
+        self.dirty = True
+        return True
+
+    def _hold_reason(self, sink_key: str, items: List[Dict], now: float, force: bool) -> Optional[str]:
+        """Why the sink's due items can't go out now, or None"""
+        state = self.sinks.get(sink_key, {})
+        if state.get('blocked_until', 0) > now:
+            return f"rate limited for {state['blocked_until'] - now:.0f}s"
+        if now - state.get('last_attempt', 0) < MIN_INTERVAL.get(sink_key, 1.0):
+            return "rate limited"
+        if not items:
+            waits = [item['next_attempt'] - now for item in self.queued(sink_key)]
+            return f"retrying in {min(waits):.0f}s" if waits else None
+        if not force and now - state.get('last_sent', 0) < self.window:
+            closes = state['last_sent'] + self.window - now
+            return f"coalescing into a digest (window closes in {closes:.0f}s)"
+        return None
+
+    def flush(self, sinks: Dict[str, Sink], digest: Callable[[str, List[Dict]], Dict],
+              notifier: Notifier = None, force: bool = False) -> List[Delivery]:
+        """
+        Send what's due for each configured sink: one item as its own payload, several
+        as digest(sink_key, events). Sinks are posted to concurrently. force=True
+        ignores the coalescing window (not backoff or rate limits).
+        """
+        now = self.clock()
+        messages, batches = [], []
+        for key, sink in sinks.items():
+            queued = self.queued(key)
+            if not queued:
+                continue
+            due = [item for item in queued if item['next_attempt'] <= now]
+            reason = self._hold_reason(key, due, now, force)
+            if reason:
+                print(f"⏳ {sink.name}: holding {len(queued)} notification(s), {reason}")
+                continue
+            if len(due) == 1 and due[0]['payload']:
+                payload = due[0]['payload']
+            else:
+                payload = digest(key, [item['event'] for item in due])
+            messages.append((sink, payload))
+            batches.append((key, due))
+
+        deliveries = (notifier or Notifier()).dispatch(messages)
+        for (key, items), delivery in zip(batches, deliveries):
+            self._settle(key, items, delivery, now)
+        return deliveries
+
+    def _settle(self, sink_key: str, items: List[Dict], delivery: Delivery, now: float):
+        state = self.sinks.setdefault(sink_key, {})
+        state['last_attempt'] = now
+        self.dirty = True
+
+        if delivery.ok or delivery.unknown:
+            state['last_sent'] = now
+            self._drop(items)
+            if delivery.unknown:
+                print(f"❔ {delivery.sink.name}: {len(items)} notification(s) may have been delivered, not retrying")
+            return
+        if delivery.status == 429:
+            # Not the payload's fault: wait as asked, without spending an attempt
+            state['blocked_until'] = now + (delivery.retry_after if delivery.retry_after is not None else BASE_BACKOFF)
+            return
+
+        error = delivery.error or f"HTTP {delivery.status}"
+        rejected = delivery.status is not None and 400 <= delivery.status < 500
+        for item in items:
+            item['attempts'] += 1
+            item['last_error'] = error
+            item['next_attempt'] = now + min(MAX_BACKOFF, BASE_BACKOFF * 2 ** (item['attempts'] - 1))
+        given_up = [item for item in items if rejected or item['attempts'] >= MAX_ATTEMPTS]
+        if given_up:
+            print(f"💀 {delivery.sink.name}: giving up on {len(given_up)} notification(s) ({error})")
+            self._drop(given_up)
+            self.dead = (self.dead + given_up)[-DEAD_LETTER_LIMIT:]
+
+    def _drop(self, items: List[Dict]):
+        ids = {id(item) for item in items}
+        self.pending = [item for item in self.pending if id(item) not in ids]
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Page Classifier
+Predicts the page a source file belongs on from the mappings recorded so far
+
+Multinomial naive Bayes over path features (file name words, directory names,
+extension) trained from wiki-mapping.json / pages-mapping.json. Predictions come
+with the posterior probability of the winning page; callers only trust ones above
+CONFIDENCE_THRESHOLD and ask the LLM otherwise, so a mature repo routes most
+files locally in microseconds while new kinds of files still get a real decision.
+"""
+
+import math
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from search_index import tokenize
+
+CONFIDENCE_THRESHOLD = 0.9
+# Below this many training files the posteriors say more about the prior than the file
+MIN_TRAINING_FILES = 10
+# File name words are the strongest signal, so they count twice
+NAME_WEIGHT = 2
+# Label for "this file has no page here" (e.g. no features/ page)
+NO_PAGE = ''
+
+
+def path_features(path: str) -> List[str]:
+    """'src/api/user_auth.ts' -> ['user', 'user', 'auth', 'auth', 'dir:src', 'dir:api', 'ext:.ts']"""
+    p = Path(path)
+    features = []
+    for token in tokenize(p.stem):
+        features.extend([token] * NAME_WEIGHT)
+    for part in p.parent.parts:
+        features.extend(f"dir:{token}" for token in tokenize(part))
+    if p.suffix:
+        features.append(f"ext:{p.suffix.lower()}")
+    return features
+
+
+class PageClassifier:
+    def __init__(self, alpha: float = 1.0):
+        self.alpha = alpha
+        self.class_files = {} # label -> training files
+        self.feature_counts = {} # label -> {feature: count}
+        self.totals = {} # label -> total feature count
+        self.vocabulary = set()
+        self.files = 0
+
+    def train(self, examples: Iterable[Tuple[str, str]]) -> 'PageClassifier':
+        """Add (file path, label) examples"""
+        for path, label in examples:
+            self.files += 1
+            self.class_files[label] = self.class_files.get(label, 0) + 1
+            counts = self.feature_counts.setdefault(label, {})
+            for feature in path_features(path):
+                counts[feature] = counts.get(feature, 0) + 1
+                self.totals[label] = self.totals.get(label, 0) + 1
+                self.vocabulary.add(feature)
+        return self
+
+    def scores(self, path: str) -> Dict[str, float]:
+        """label -> log P(label | path) up to a shared constant"""
+        features = [f for f in path_features(path) if f in self.vocabulary]
+        denominator = self.alpha * len(self.vocabulary)
+        scores = {}
+        for label, n in self.class_files.items():
+            counts = self.feature_counts[label]
+            total = self.totals.get(label, 0) + denominator
+            score = math.log(n / self.files)
+            for feature in features:
+                score += math.log((counts.get(feature, 0) + self.alpha) / total)
+            scores[label] = score
+        return scores
+
+    def predict(self, path: str) -> Tuple[Optional[str], float]:
+        """
+        Most likely label and its posterior probability.
+
+        (None, 0.0) when there's too little training data or nothing about the
+        path was seen in training (the answer would just be the prior).
+        """
+        if self.files < MIN_TRAINING_FILES or not self.class_files:
+            return None, 0.0
+        if not any(f in self.vocabulary for f in path_features(path)):
+            return None, 0.0
+
+        scores = self.scores(path)
+        best = max(scores, key=lambda label: (scores[label], label))
+        top = scores[best]
+        normalizer = sum(math.exp(score - top) for score in scores.values())
+        return best, 1.0 / normalizer
+
+    def confident(self, path: str, threshold: float = CONFIDENCE_THRESHOLD) -> Optional[Tuple[str, float]]:
+        """(label, confidence) if the prediction clears the threshold, else None"""
+        label, confidence = self.predict(path)
+        if label is None or confidence < threshold:
+            return None
+        return label, confidence
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Page Index
+Persistent metadata index for docs-site markdown pages
+
+Holds path, frontmatter, title, headings, a short summary and the git blob id for
+every page so callers can reason about the site without reading page bodies.
+Entries are refreshed incrementally: one `git ls-files` lists the blob id of every
+tracked page, and only pages whose id changed, that the worktree modified, or that
+git doesn't track are read and re-parsed. Bodies are only loaded on demand via
+load_body(). The index is committed, so it holds nothing machine-specific: mtimes
+differ on every checkout, and keying on them would rewrite the whole index on every
+CI run. Outside a git checkout every page is read and compared by blob id.
+
+PageRetriever ranks indexed pages against a new doc with BM25 over titles,
+paths, headings and summaries, so placement prompts only carry relevant pages.
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import heapq
+import hashlib
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+from search_index import tokenize
+
+INDEX_VERSION = 3
+INDEX_FILE = Path('.github/pages-index.json')
+SUMMARY_LENGTH = 200
+
+# BM25 field weights: a term in the title says more about a page than one in a heading
+FIELD_WEIGHTS = {'title': 3, 'path': 2, 'headings': 1, 'summary': 1}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_FRONTMATTER = re.compile(r'\A---\s*\n(.*?)\n---\s*(?:\n|\Z)', re.S)
+_HEADING = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+_FENCE = re.compile(r'^\s*(`{3,}|~{3,})')
+
+
+def blob_id(data: bytes) -> str:
+    """Git blob id of file contents (what `git ls-files -s` reports)"""
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+
+def _git(cwd: Path, *args) -> Optional[str]:
+    try:
+        result = subprocess.run(['git', *args], cwd=cwd, capture_output=True, timeout=60)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.decode('utf-8', errors='replace') if result.returncode == 0 else None
+
+
+def tracked_blobs(pages_dir: Path) -> Optional[Dict[str, str]]:
+    """
+    Blob ids of the pages git tracks and the worktree hasn't modified, keyed by path
+    relative to pages_dir; None outside a git checkout
+    """
+    staged = _git(pages_dir, 'ls-files', '-s', '-z', '--', '.')
+    modified = _git(pages_dir, 'ls-files', '-m', '-z', '--', '.')
+    if staged is None or modified is None:
+        return None
+
+    modified = set(modified.split('\0'))
+    blobs = {}
+    for record in staged.split('\0'):
+        meta, sep, rel_path = record.partition('\t')
+        if sep and rel_path not in modified:
+            blobs[rel_path] = meta.split()[1]
+    return blobs
+
+
+def parse_frontmatter(content: str) -> Tuple[Dict[str, str], str]:
+    """Split simple `key: value` frontmatter from the body"""
+    match = _FRONTMATTER.match(content)
+    if not match:
+        return {}, content
+
+    frontmatter = {}
+    for line in match.group(1).splitlines():
+        key, sep, value = line.partition(':')
+        if sep and key.strip():
+            frontmatter[key.strip()] = value.strip().strip('"\'')
+    return frontmatter, content[match.end():]
+
+
+def parse_page(content: str, fallback_title: str = '') -> Dict:
+    """Extract index metadata from a page body"""
+    frontmatter, body = parse_frontmatter(content)
+
+    headings = []
+    paragraph = []
+    summary = ''
+    fence = None
+    for line in body.splitlines():
+        fence_match = _FENCE.match(line)
+        if fence_match:
+            marker = fence_match.group(1)
+            if fence is None:
+                fence = marker[0]
+            elif marker[0] == fence:
+                fence = None
+            continue
+        if fence is not None:
+            continue
+
+        heading = _HEADING.match(line)
+        if heading:
+            headings.append([len(heading.group(1)), heading.group(2)])
+            if paragraph and not summary:
+                summary = ' '.join(paragraph)
+            continue
+        if summary:
+            continue
+
+        # First prose paragraph becomes the summary
+        text = line.strip()
+        if text and not text.startswith(('|', '>', '<', '---', '*Auto-generated')):
+            paragraph.append(text)
+        elif paragraph:
+            summary = ' '.join(paragraph)
+    if not summary and paragraph:
+        summary = ' '.join(paragraph)
+
+    title = frontmatter.get('title')
+    if not title:
+        h1 = next((text for level, text in headings if level == 1), None)
+        title = h1 or fallback_title
+
+    return {
+        'frontmatter': frontmatter,
+        'title': title,
+        'headings': headings,
+        'summary': summary[:SUMMARY_LENGTH],
+    }
+
+
+class PageIndex:
+    def __init__(self, pages_dir: Path, index_file: Path = INDEX_FILE):
+        self.pages_dir = Path(pages_dir)
+        self.index_file = Path(index_file)
+        self.entries = {} # rel path (posix) -> entry
+        self.dirty = False
+        self._retriever = None
+        self._load()
+
+    def _load(self):
+        if not self.index_file.exists():
+            return
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION and data.get('pages_dir') == self.pages_dir.as_posix():
+                self.entries = data.get('pages', {})
+        except (OSError, ValueError):
+            print(f"⚠️  Page index {self.index_file} unreadable, rebuilding")
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.index_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': INDEX_VERSION,
+                'pages_dir': self.pages_dir.as_posix(),
+                'pages': self.entries
+            }, f, indent=2, sort_keys=True, ensure_ascii=False)
+        self.dirty = False
+
+    def _scan(self) -> List[str]:
+        found = []
+        stack = [str(self.pages_dir)]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith('.md'):
+                        rel_path = Path(entry.path).relative_to(self.pages_dir).as_posix()
+                        found.append(rel_path)
+        return found
+
+    def refresh(self) -> Dict[str, int]:
+        """
+        Bring the index in line with disk, re-parsing only pages whose content changed.
+        Pages git reports unchanged since they were indexed aren't read at all.
+
+        Returns:
+            {'indexed': n, 'updated': n, 'removed': n}
+        """
+        stats = {'indexed': 0, 'updated': 0, 'removed': 0}
+        on_disk = set(self._scan())
+        blobs = tracked_blobs(self.pages_dir) or {}
+
+        for rel_path in list(self.entries):
+            if rel_path not in on_disk:
+                del self.entries[rel_path]
+                stats['removed'] += 1
+                self.dirty = True
+                self._retriever = None
+
+        for rel_path in sorted(on_disk):
+            if self.refresh_page(rel_path, blob=blobs.get(rel_path)):
+                stats['updated'] += 1
+
+        stats['indexed'] = len(self.entries)
+        return stats
+
+    def refresh_page(self, rel_path: str, content: str = None, blob: str = None) -> bool:
+        """
+        Re-index one page after it was written; returns True if its content changed.
+        Pass the content just written to skip reading it back, or the blob id git
+        reports for it to skip reading it when that's the one already indexed.
+        """
+        entry = self.entries.get(rel_path)
+        if blob is not None and entry is not None and entry['blob'] == blob:
+            return False
+
+        try:
+            if content is None:
+                data = self._read(rel_path)
+                content = data.decode('utf-8')
+            else:
+                data = content.encode('utf-8')
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"⚠️  Could not read {rel_path}: {e}")
+            return False
+
+        digest = blob_id(data)
+        if entry is not None and entry['blob'] == digest:
+            return False
+
+        entry = {'path': rel_path, 'blob': digest}
+        entry.update(parse_page(content, Path(rel_path).stem.replace('-', ' ').title()))
+        self.entries[rel_path] = entry
+        self._retriever = None
+        self.dirty = True
+        return True
+
+    def _read(self, rel_path: str) -> bytes:
+        return (self.pages_dir / rel_path).read_bytes()
+
+    def pages(self, prefix: str = '') -> List[str]:
+        return sorted(p for p in self.entries if p.startswith(prefix))
+
+    def get(self, rel_path: str) -> Optional[Dict]:
+        return self.entries.get(rel_path)
+
+    def __contains__(self, rel_path: str) -> bool:
+        return rel_path in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def load_body(self, rel_path: str) -> str:
+        """Full page content, read from disk only when a caller actually needs it"""
+        return (self.pages_dir / rel_path).read_text(encoding='utf-8')
+
+    def describe(self, rel_path: str, max_headings: int = 8) -> str:
+        """One-line digest of a page for prompts: title, summary and section headings"""
+        entry = self.entries[rel_path]
+        sections = [text for level, text in entry['headings'] if level == 2][:max_headings]
+        line = f"{rel_path}: {entry['title']}"
+        if entry['summary']:
+            line += f" - {entry['summary']}"
+        if sections:
+            line += f" [sections: {'; '.join(sections)}]"
+        return line
+
+    def retriever(self) -> 'PageRetriever':
+        """BM25 ranker over the current entries (rebuilt only after pages change)"""
+        if self._retriever is None:
+            self._retriever = PageRetriever(self.entries)
+        return self._retriever
+
+
+def page_fields(entry: Dict) -> Dict[str, str]:
+    return {
+        'title': entry.get('title', ''),
+        'path': Path(entry.get('path', '')).stem.replace('-', ' ').replace('_', ' '),
+        'headings': ' '.join(text for _, text in entry.get('headings', [])),
+        'summary': entry.get('summary', ''),
+    }
+
+
+class PageRetriever:
+    """
+    Okapi BM25 over page metadata, stored as a sparse inverted index:
+    scoring a query touches only the postings of its terms, not every page.
+    """
+
+    def __init__(self, entries: Dict[str, Dict], k1: float = BM25_K1, b: float = BM25_B):
+        self.paths = sorted(entries)
+        self.postings = {} # term -> [(doc id, weighted tf)]
+        lengths = []
+
+        for doc, rel_path in enumerate(self.paths):
+            counts = {}
+            for field, text in page_fields(entries[rel_path]).items():
+                weight = FIELD_WEIGHTS[field]
+                for term in tokenize(text):
+                    counts[term] = counts.get(term, 0) + weight
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings.setdefault(term, []).append((doc, tf))
+
+        n = len(self.paths)
+        avg_length = (sum(lengths) / n) if n else 0.0
+        self.k1 = k1
+        # Per-document part of the BM25 denominator, computed once
+        self.norms = [k1 * (1 - b + b * length / avg_length) if avg_length else k1 for length in lengths]
+        self.idf = {term: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for term, p in self.postings.items()}
+
+    def scores(self, query: str) -> Dict[int, float]:
+        scores = {}
+        k1 = self.k1
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf[term]
+            for doc, tf in postings:
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (k1 + 1) / (tf + self.norms[doc])
+        return scores
+
+    def top_k(self, query: str, k: int = 10, prefix: str = '', exclude=()) -> List[Tuple[str, float]]:
+        """Best matching pages under prefix, highest score first (ties broken by path)"""
+        candidates = (
+            (score, self.paths[doc]) for doc, score in self.scores(query).items()
+            if self.paths[doc].startswith(prefix) and self.paths[doc] not in exclude
+        )
+        best = heapq.nsmallest(k, candidates, key=lambda item: (-item[0], item[1]))
+        return [(rel_path, score) for score, rel_path in best]
+
+
+def doc_query(doc_content: str, source_file: str = '') -> str:
+    """Query text for a generated doc: its title, headings and summary plus the source name"""
+    meta = parse_page(doc_content)
+    stem = Path(source_file).stem.replace('-', ' ').replace('_', ' ')
+    headings = ' '.join(text for _, text in meta['headings'])
+    return f"{stem} {meta['title']} {meta['title']} {headings} {meta['summary']}"
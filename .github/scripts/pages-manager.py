@@ -4,7 +4,9 @@ Intelligent GitHub Pages Documentation Manager
 
 Features:
 - LLM-powered agentic decision making
-- Reads ALL existing pages to understand structure
+- Knows existing pages through a persistent index (titles, headings, summaries)
+  that only re-reads pages git reports changed (see page_index.py)
+- Shows the LLM only the existing pages most relevant to each new doc
 - Decides: create new page, append to existing, or modify existing
 - Professional documentation website generation
 - Maintains consistent structure and navigation
@@ -21,276 +23,322 @@ from typing import Dict, List, Optional, Tuple
 # Import LLM wrapper
 sys.path.insert(0, str(Path(__file__).parent))
 from llm import get_client
+from page_index import PageIndex, doc_query
+from mapping_store import MappingStore
+from publisher import Doc, PublishingEngine, changed_docs
+from page_classifier import NO_PAGE, PageClassifier
+from markdown_sections import (MarkdownDocument, MergeConflict, first_heading, merge_token_budget,
+                               shift_headings, single_root, strip_fences, structural_merge)
 
 GROQ_API_KEY = os.environ.get('GROQ_API_KEY')
 MODEL = 'openai/gpt-oss-120b'  # Use more powerful model for better decisions
 
 PAGES_DIR = Path('docs-site')
 MAPPING_FILE = '.github/pages-mapping.json'
+PAGE_INDEX_FILE = '.github/pages-index.json'
+CANDIDATE_PAGES = 8  # most relevant existing pages shown to the LLM per decision
+MAX_MERGE_CONTENT = 6000  # new content sent with a section merge
+
+# Documentation perspectives and the site section each one is written to
+PERSPECTIVES = {'api': 'api/', 'module': 'modules/', 'feature': 'features/'}
+PERSPECTIVE_GUIDANCE = {
+    'api': 'Focus on technical API details, function signatures, parameters, returns, examples.',
+    'module': 'Focus on architecture, design patterns, how components interact, module boundaries.',
+    'feature': 'Focus on user guides, how to use features, configuration, real-world examples.'
+}
+ACTIONS = ('create', 'append', 'modify')
+
+# Section index pages; 'empty' is written when a section has no pages (None = skip the index)
+SECTION_INDEXES = {
+    'api': {
+        'title': 'API Reference',
+        'intro': 'Low-level API documentation for all functions, classes, and interfaces.',
+        'list_title': 'APIs',
+        'item': 'Technical API documentation',
+        'total': 'API pages',
+        'empty': None,
+    },
+    'modules': {
+        'title': 'Modules',
+        'intro': 'Module architecture and design documentation.',
+        'list_title': 'Modules',
+        'item': 'Module architecture and design',
+        'total': 'modules',
+        'empty': ("*No module documentation yet. Module-level docs will be auto-generated as the codebase evolves.*\n\n"
+                  "Modules provide architectural overview, design decisions, and how different components interact.\n\n"),
+    },
+    'features': {
+        'title': 'Features',
+        'intro': 'User-facing feature documentation and guides.',
+        'list_title': 'Features',
+        'item': 'Feature guide and tutorial',
+        'total': 'features',
+        'empty': ("*No feature documentation yet. Feature guides will be auto-generated as you develop.*\n\n"
+                  "Features provide user-facing documentation on how to use and configure the system.\n\n"),
+    },
+}
+
+
+DEFAULT_MAPPING = {
+    'version': '1.0',
+    'site_structure': {
+        'index.md': {'title': 'Home', 'category': 'root'},
+        'api/': {'title': 'API Reference', 'category': 'api'},
+        'modules/': {'title': 'Modules', 'category': 'modules'},
+        'features/': {'title': 'Features', 'category': 'features'}
+    }
+}
 
 
 class PagesManager:
     def __init__(self):
         self.mapping = self.load_mapping()
+        self.classifiers = self.train_classifiers()
+        self.page_index = PageIndex(PAGES_DIR, PAGE_INDEX_FILE)
+        # How merges were resolved: structural (no LLM), llm, or appended as a new section
+        self.merge_stats = {'structural': 0, 'llm': 0, 'appended': 0}
+        self.written_pages = set() # pages written this run
         self.existing_pages = self.scan_existing_pages()
         
-    def load_mapping(self) -> Dict:
-        """Load persistent pages mapping"""
-        if os.path.exists(MAPPING_FILE):
-            with open(MAPPING_FILE, 'r') as f:
-                return json.load(f)
-        return {
-            'version': '1.0',
-            'last_updated': datetime.now().isoformat(),
-            'file_to_page': {},
-            'page_metadata': {},
-            'site_structure': {
-                'index.md': {'title': 'Home', 'category': 'root'},
-                'api/': {'title': 'API Reference', 'category': 'api'},
-                'modules/': {'title': 'Modules', 'category': 'modules'},
-                'features/': {'title': 'Features', 'category': 'features'}
-            }
-        }
+    def load_mapping(self) -> MappingStore:
+        """Open the pages mapping store (synced from MAPPING_FILE if that changed)"""
+        return MappingStore(MAPPING_FILE, multi_page=True, files_key='sources', defaults=DEFAULT_MAPPING)
     
     def save_mapping(self):
-        """Save mapping to disk"""
-        self.mapping['last_updated'] = datetime.now().isoformat()
-        os.makedirs(os.path.dirname(MAPPING_FILE), exist_ok=True)
-        with open(MAPPING_FILE, 'w') as f:
-            json.dump(self.mapping, indent=2, fp=f)
+        """Export the mapping store back to MAPPING_FILE"""
+        self.mapping.export_json()
         print(f"✓ Saved mapping to {MAPPING_FILE}")
     
-    def scan_existing_pages(self) -> Dict[str, str]:
-        """Scan all existing documentation pages"""
-        pages = {}
-        
+    def train_classifiers(self) -> Dict[str, PageClassifier]:
+        """
+        One classifier per perspective, trained on past placements: label is the
+        section page a file went to, or NO_PAGE for files with no page in that section.
+        """
+        pages_by_file = {}
+        for file, page in self.mapping.mappings():
+            pages_by_file.setdefault(file, []).append(page)
+        
+        classifiers = {}
+        for perspective, prefix in PERSPECTIVES.items():
+            examples = []
+            for file, pages in pages_by_file.items():
+                in_section = [p for p in pages if p.startswith(prefix)]
+                examples.extend((file, p) for p in in_section or [NO_PAGE])
+            classifiers[perspective] = PageClassifier().train(examples)
+        return classifiers
+    
+    def scan_existing_pages(self) -> Dict[str, Dict]:
+        """
+        Refresh the page index (only new or changed files are read) and return its
+        entries: path -> {title, frontmatter, headings, summary, hash}. Page bodies
+        are loaded later, and only for pages a change actually touches.
+        """
         if not PAGES_DIR.exists():
             print("ℹ️  Pages directory doesn't exist yet, will create")
             PAGES_DIR.mkdir(parents=True, exist_ok=True)
-            return pages
-        
-        for md_file in PAGES_DIR.rglob('*.md'):
-            relative_path = md_file.relative_to(PAGES_DIR)
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    pages[str(relative_path)] = content
-            except Exception as e:
-                print(f"⚠️  Could not read {relative_path}: {e}")
-        
-        print(f"✓ Found {len(pages)} existing documentation pages")
-        for page in list(pages.keys())[:10]:
+
+        stats = self.page_index.refresh()
+        pages = self.page_index.entries
+
+        print(f"✓ Found {len(pages)} existing documentation pages "
+              f"({stats['updated']} re-indexed, {stats['removed']} removed)")
+        for page in self.page_index.pages()[:10]:
             print(f"  - {page}")
         if len(pages) > 10:
             print(f"  ... and {len(pages) - 10} more")
-        
-        return pages
-    
-    def generate_multi_perspective_docs(self, source_file: str, doc_content: str) -> List[Tuple[str, str, str]]:
-        """
-        Generate multiple documentation perspectives: API, Modules, Features
-        
-        Returns:
-            List of (page_path, action, reasoning) tuples
-        """
-        print(f"\n🔮 Generating multi-perspective docs for {source_file}...")
-        
-        perspectives = []
-        llm = get_client()
-        
-        # Analyze what documentation types to generate
-        analysis_prompt = f"""Analyze this code documentation and determine what types of documentation should be generated.
-
-**Source File:** {source_file}
-
-**Documentation Content:**
-```markdown
-{doc_content[:3000]}
-```
-
-**Documentation Types:**
-1. **API Reference** - Technical API docs (functions, classes, parameters, returns)
-2. **Module Architecture** - Design patterns, how components interact, architecture decisions
-3. **Feature Guide** - User-facing guides on how to use features, configuration, examples
-
-**Your Task:**
-Decide which documentation types are appropriate for this code. Return JSON array with perspectives to generate.
 
-**Output Format (JSON only):**
-{{
-  "perspectives": [
-    {{"type": "api|module|feature", "reason": "Why this perspective is needed"}},
-    ...
-  ]
-}}
+        return pages
 
-Be selective - only generate perspectives that add value. Most code needs API docs, fewer need module/feature docs.
-"""
-        
-        analysis_result = llm.call_chat(
-            model=MODEL,
-            messages=[
-                {'role': 'system', 'content': 'You are a documentation strategist. Return ONLY valid JSON.'},
-                {'role': 'user', 'content': analysis_prompt}
-            ],
-            temperature=0.2,
-            max_tokens=16000,  # High limit - never truncate JSON
-            response_format='json',
-            timeout=30,
-            use_cache=True
-        )
-        
-        if analysis_result:
-            try:
-                analysis = json.loads(analysis_result)
-                perspective_types = analysis.get('perspectives', [{'type': 'api'}])
-                print(f"  ✓ Generating {len(perspective_types)} perspectives")
-                
-                for perspective in perspective_types:
-                    ptype = perspective.get('type', 'api')
-                    decision = self.make_intelligent_decision(source_file, doc_content, ptype)
-                    perspectives.append(decision)
-                
-                return perspectives
-            except Exception as e:
-                print(f"  ⚠️  Analysis failed: {e}, using API only")
-                return [self.make_intelligent_decision(source_file, doc_content, 'api')]
-        else:
-            # Fallback to API only
-            return [self.make_intelligent_decision(source_file, doc_content, 'api')]
+    # -- publishing target (see publisher.py) --
+    
+    name = 'pages'
+    
+    def rule_route(self, doc: Doc, rule: Dict) -> Optional[List[Dict]]:
+        """A docs-routing.yml rule's page; merged into (or created) like an LLM 'append'"""
+        page_path = rule.get('pages')
+        if not isinstance(page_path, str) or not page_path.endswith('.md') or '..' in Path(page_path).parts:
+            return None
+        section = page_path.split('/', 1)[0] + '/'
+        perspective = next((p for p, prefix in PERSPECTIVES.items() if prefix == section), None)
+        print(f"  ✓ Rule: APPEND → {page_path}")
+        return [{'perspective': perspective, 'page_path': page_path, 'action': 'append',
+                 'section_title': None, 'reasoning': f"Routing rule {rule['glob']}"}]
     
-    def make_intelligent_decision(self, source_file: str, doc_content: str, perspective: str = 'api') -> Tuple[str, str, str]:
+    def known_route(self, doc: Doc) -> Optional[List[Dict]]:
         """
-        LLM makes agentic decision about documentation placement
-        
-        Args:
-            perspective: 'api', 'module', or 'feature'
-        
-        Returns:
-            (page_path, action, reasoning)
-            action: 'create', 'append', 'modify'
+        Placement predicted from past mappings, only if every perspective is confident
+        (a page, or confidently none); otherwise the doc goes to the LLM
         """
-        print(f"\n🤔 Making decision for {source_file} ({perspective} perspective)...")
-        
-        # Build context for LLM
-        prefix = {'api': 'api/', 'module': 'modules/', 'feature': 'features/'}[perspective]
-        relevant_pages = {k: v for k, v in self.existing_pages.items() if k.startswith(prefix)}
-        
-        existing_pages_summary = "\n".join([
-            f"  {path}: {content[:200]}..." 
-            for path, content in list(relevant_pages.items())[:10]
-        ]) if relevant_pages else "  (No pages in this section yet)"
-        
-        perspective_guidance = {
-            'api': 'Focus on technical API details, function signatures, parameters, returns, examples.',
-            'module': 'Focus on architecture, design patterns, how components interact, module boundaries.',
-            'feature': 'Focus on user guides, how to use features, configuration, real-world examples.'
-        }
+        routes = []
+        for perspective, classifier in self.classifiers.items():
+            prediction = classifier.confident(doc.source)
+            if prediction is None:
+                return None
+            page_path, confidence = prediction
+            if page_path != NO_PAGE:
+                routes.append({'perspective': perspective, 'page_path': page_path, 'action': 'append',
+                               'section_title': None,
+                               'reasoning': f"Predicted from past mappings ({confidence:.0%} confident)"})
+        for route in routes:
+            print(f"  🧠 Predicted: APPEND → {route['page_path']} ({route['reasoning']})")
+        return routes or None
+    
+    def routing_context(self) -> str:
+        """Perspective choice and placement rules, shared by every doc in a batch"""
+        guidance = "\n".join(f"**{perspective.upper()} ({prefix}):** {PERSPECTIVE_GUIDANCE[perspective]}"
+                             for perspective, prefix in PERSPECTIVES.items())
+        return f"""### Target "pages": GitHub Pages site
+For each doc, pick the documentation perspectives its code needs, then place each one.
+Be selective - most code needs API docs, fewer need module/feature docs.
+
+{guidance}
+
+Actions: CREATE a page for a new topic, APPEND to a related page, MODIFY existing content.
+Docs in the same request that belong together should name the same page."""
+    
+    def routing_prompt(self, doc: Doc) -> str:
+        """The existing pages of each section most related to this doc"""
+        query = doc_query(doc.content, doc.source)
+        sections = []
+        for perspective, prefix in PERSPECTIVES.items():
+            # Rank the section's pages against this doc instead of taking an arbitrary first few
+            section_pages = self.page_index.pages(prefix)
+            candidates = self.page_index.retriever().top_k(
+                query, k=CANDIDATE_PAGES, prefix=prefix, exclude={f"{prefix}index.md"}
+            )
+            if candidates:
+                listing = "\n".join(
+                    f"  {self.page_index.describe(path)} (relevance {score:.1f})" for path, score in candidates
+                )
+                if len(section_pages) > len(candidates):
+                    listing += f"\n  ({len(section_pages)} pages in this section; showing the most related)"
+            elif section_pages:
+                listing = f"  ({len(section_pages)} pages in this section, none related to this doc)"
+            else:
+                listing = "  (No pages in this section yet)"
+            sections.append(f"{prefix}\n{listing}")
+        
+        return "Existing pages (pages):\n" + "\n".join(sections)
+    
+    def routing_schema(self) -> str:
+        return ('[{"type": "api|module|feature", "action": "create|append|modify", '
+                '"page_path": "<section>/page-name.md", "section_title": "Section name (if append/modify)", '
+                '"reasoning": "Brief explanation"}]')
+    
+    def parse_route(self, doc: Doc, answer) -> List[Dict]:
+        """Validate each perspective on its own; malformed ones are dropped"""
+        if isinstance(answer, dict):
+            answer = answer.get('perspectives', [answer])
+        if not isinstance(answer, list):
+            raise ValueError("expected a list of perspectives")
+        
+        routes = []
+        for item in answer:
+            if not isinstance(item, dict) or item.get('type') not in PERSPECTIVES:
+                continue
+            prefix = PERSPECTIVES[item['type']]
+            action = str(item.get('action', 'create')).lower()
+            if action not in ACTIONS:
+                continue
+            page_path = str(item.get('page_path') or f"{prefix}{Path(doc.source).stem}.md")
+            # Ensure page_path is a markdown page directly under the section
+            page_path = prefix + Path(page_path).name
+            if not page_path.endswith('.md') or any(r['page_path'] == page_path for r in routes):
+                continue
+            routes.append({
+                'perspective': item['type'],
+                'page_path': page_path,
+                'action': action,
+                'section_title': item.get('section_title') or None,
+                'reasoning': item.get('reasoning', 'Auto-generated'),
+            })
+            print(f"  ✓ Decision: {action.upper()} → {page_path}")
+        
+        if not routes:
+            raise ValueError("no valid perspectives")
+        return routes
+    
+    def fallback_route(self, doc: Doc) -> List[Dict]:
+        page_path, action, reasoning = self._fallback_decision(doc.source, 'api')
+        return [{'perspective': 'api', 'page_path': page_path, 'action': action,
+                 'section_title': None, 'reasoning': reasoning}]
+    
+    def publish(self, doc: Doc, routes: List[Dict]) -> List[Dict]:
+        changes = []
+        for route in routes:
+            if route['action'] == 'create' and route['page_path'] in self.written_pages:
+                # Docs routed in the same batch can't see each other's new pages; merge, don't overwrite
+                route = dict(route, action='append')
+            if not self.apply_documentation_change(route['page_path'], route['action'], doc.content,
+                                                   route['section_title']):
+                continue
+            self.written_pages.add(route['page_path'])
+            # Record mapping (a file can feed several pages)
+            self.mapping.record(doc.source, route['page_path'], last_action=route['action'])
+            changes.append({
+                'source': doc.source,
+                'page': route['page_path'],
+                'action': route['action'],
+                'reasoning': route['reasoning']
+            })
+        return changes
+    
+    def finish(self, changes: List[Dict]):
+        """Rebuild index pages, persist the mapping and page index, write pages_summary.md"""
+        self.generate_index_page()
+        self.save_mapping()
+        self.page_index.save()
+        merges = self.merge_stats
         
-        prompt = f"""You are a professional documentation architect creating **{perspective.upper()}** documentation.
-
-**Source File:** {source_file}
-
-**Generated Documentation:**
-```markdown
-{doc_content[:2000]}
-```
+        summary = f"""# GitHub Pages Update Summary
 
-**Existing {perspective.upper()} Pages:**
-{existing_pages_summary}
+**Changes Made:** {len(changes)}
+**Merges:** {merges['structural']} structural (no LLM), {merges['llm']} via LLM, {merges['appended']} new sections
 
-**Perspective Guidance:**
-{perspective_guidance[perspective]}
-
-**Your Task:**
-Decide the BEST action for integrating this into {prefix} documentation:
-
-1. **CREATE** - New page for a completely new topic
-2. **APPEND** - Add to existing related page
-3. **MODIFY** - Update existing content
-
-**Output Format (JSON only):**
-{{
-  "action": "create|append|modify",
-  "page_path": "{prefix}page-name.md",
-  "reasoning": "Brief explanation",
-  "section_title": "Section name (if append/modify)"
-}}
 """
-
-        # Use LLM wrapper with proper JSON handling
-        llm = get_client()
-        result_text = llm.call_chat(
-            model=MODEL,
-            messages=[
-                {'role': 'system', 'content': 'You are a documentation architect. Return ONLY valid JSON.'},
-                {'role': 'user', 'content': prompt}
-            ],
-            temperature=0.2,
-            max_tokens=16000,  # High limit - never truncate JSON
-            response_format='json',
-            timeout=30,
-            use_cache=True
-        )
         
-        if result_text:
-            try:
-                decision = json.loads(result_text)
-                
-                action = decision.get('action', 'create')
-                page_path = decision.get('page_path', f"{prefix}{Path(source_file).stem}.md")
-                reasoning = decision.get('reasoning', 'Auto-generated')
-                
-                # Ensure page_path starts with correct prefix
-                if not page_path.startswith(prefix):
-                    page_path = prefix + Path(page_path).name
-                
-                print(f"  ✓ Decision: {action.upper()} → {page_path}")
-                print(f"  📝 Reasoning: {reasoning}")
-                
-                return (page_path, action, reasoning)
-            except Exception as e:
-                print(f"  ⚠️  JSON parse error: {e}, using fallback")
-                return self._fallback_decision(source_file, perspective)
-        else:
-            print(f"  ⚠️  LLM failed, using fallback")
-            return self._fallback_decision(source_file, perspective)
+        for change in changes:
+            summary += f"### {change['source']} -> {change['page']}\n"
+            summary += f"- **Action:** {change['action'].upper()}\n"
+            summary += f"- **Reasoning:** {change['reasoning']}\n\n"
+        
+        with open('pages_summary.md', 'w', encoding='utf-8') as f:
+            f.write(summary)
+        
+        print("\n" + "="*80)
+        print("GITHUB PAGES MANAGER COMPLETE")
+        print("="*80)
+        print(f"✓ {len(changes)} pages updated")
+        print(f"✓ {merges['structural']} of {sum(merges.values())} merges avoided an LLM call")
+        print(f"✓ Mapping saved to {MAPPING_FILE}")
+        print(f"✓ Site generated in {PAGES_DIR}")
     
     def _fallback_decision(self, source_file: str, perspective: str = 'api') -> Tuple[str, str, str]:
-        """Fallback decision if LLM fails"""
+        """Fallback decision if LLM fails (domain-specific pages come from docs-routing.yml rules)"""
         stem = Path(source_file).stem
-        prefix = {'api': 'api/', 'module': 'modules/', 'feature': 'features/'}[perspective]
-        
-        if 'auth' in source_file.lower():
-            name = 'authentication' if perspective == 'api' else 'auth-system'
-            return (f'{prefix}{name}.md', 'create', f'Authentication {perspective}')
-        elif 'database' in source_file.lower():
-            name = 'database' if perspective == 'api' else 'data-layer'
-            return (f'{prefix}{name}.md', 'create', f'Database {perspective}')
-        elif 'payment' in source_file.lower():
-            name = 'payments' if perspective == 'api' else 'payment-system'
-            return (f'{prefix}{name}.md', 'create', f'Payment {perspective}')
-        elif 'email' in source_file.lower():
-            name = 'notifications' if perspective == 'api' else 'notification-system'
-            return (f'{prefix}{name}.md', 'create', f'Email/notifications {perspective}')
-        else:
-            return (f'{prefix}{stem}.md', 'create', f'{stem} {perspective}')
+        prefix = PERSPECTIVES[perspective]
+        return (f'{prefix}{stem}.md', 'create', f'{stem} {perspective}')
     
     def apply_documentation_change(self, page_path: str, action: str, 
                                   doc_content: str, section_title: str = None) -> bool:
         """Apply documentation change based on action"""
         full_path = PAGES_DIR / page_path
+        doc_content = single_root(doc_content)
         full_path.parent.mkdir(parents=True, exist_ok=True)
         
         if action == 'create':
-            return self._create_page(full_path, doc_content)
+            success = self._create_page(full_path, doc_content)
         elif action == 'append':
-            return self._append_to_page(full_path, doc_content, section_title)
+            success = self._append_to_page(full_path, doc_content, section_title)
         elif action == 'modify':
-            return self._modify_page(full_path, doc_content, section_title)
+            success = self._modify_page(full_path, doc_content, section_title)
         else:
             print(f"⚠️  Unknown action: {action}")
             return False
+
+        if success:
+            self.page_index.refresh_page(Path(page_path).as_posix())
+        return success
     
     def _create_page(self, path: Path, content: str) -> bool:
         """Create a new documentation page"""
@@ -326,9 +374,9 @@ layout: default
             with open(path, 'r', encoding='utf-8') as f:
                 existing = f.read()
             
-            # Add new section
-            section_header = f"\n\n## {section_title}\n\n" if section_title else "\n\n"
-            updated = existing + section_header + content
+            # Deterministic, no LLM: update the doc's own block if it's already
+            # on the page and the structures line up, otherwise add it
+            updated = self._append_or_update(existing, content, section_title)
             
             with open(path, 'w', encoding='utf-8') as f:
                 f.write(updated)
@@ -365,36 +413,99 @@ layout: default
     
     def _intelligent_merge(self, existing: str, new_content: str, 
                           section_title: str, page_name: str) -> str:
-        """Use LLM to intelligently merge new content into existing page"""
-        print(f"    🧠 Using LLM to merge content...")
-        
-        prompt = f"""You are a documentation editor. Intelligently merge new documentation into an existing page.
+        """
+        Merge new content into the matching section of an existing page.
+
+        The target section is located by heading (section_title, or the new
+        content's own root heading); for a generated doc that is its whole block,
+        up to the next doc. Only that section goes to the LLM and the result is
+        spliced back in place; the rest of the page is untouched.
+        """
+        title = section_title or first_heading(new_content)
+        doc = MarkdownDocument(existing)
+        index = doc.find(title) if title else None
+
+        if index is None:
+            print(f"    ➕ No section matching '{title}', adding it as a new section")
+            self.merge_stats['appended'] += 1
+            return self._append_section(doc, new_content, section_title)
+
+        section = doc.block_text(index)
+        try:
+            merged, changes = structural_merge(single_root(section), new_content)
+            self.merge_stats['structural'] += 1
+            print(f"    ⚡ Structural merge, no LLM needed: {changes['added']} added, "
+                  f"{changes['replaced']} replaced, {changes['removed']} removed")
+            return doc.replace(index, merged, block=True)
+        except MergeConflict as e:
+            print(f"    ↪ Structural merge not possible ({e})")
+
+        self.merge_stats['llm'] += 1
+        print(f"    🧠 Using LLM to merge section '{doc.sections[index][1]}' "
+              f"({len(section)} of {len(existing)} chars)...")
+        merged = self._merge_section(section, new_content, page_name)
+
+        if merged:
+            print(f"    ✓ LLM merged section successfully")
+            return doc.replace(index, merged, block=True)
+        else:
+            print(f"    ⚠️  LLM merge failed, appending instead")
+            return self._append_section(doc, new_content, section_title or 'Update')
 
-**Existing Page ({page_name}):**
+    def _append_or_update(self, existing: str, content: str, section_title: Optional[str]) -> str:
+        doc = MarkdownDocument(existing)
+        title = first_heading(content)
+        index = doc.find(title) if title else None
+        if index is not None:
+            try:
+                merged, changes = structural_merge(single_root(doc.block_text(index)), content)
+                self.merge_stats['structural'] += 1
+                print(f"    ⚡ Updated '{title}' in place: {changes['added']} added, "
+                      f"{changes['replaced']} replaced, {changes['removed']} removed")
+                return doc.replace(index, merged, block=True)
+            except MergeConflict as e:
+                print(f"    ↪ Can't update '{title}' in place ({e}), appending")
+        self.merge_stats['appended'] += 1
+        return self._append_section(doc, content, section_title)
+
+    def _append_section(self, doc: MarkdownDocument, content: str, section_title: Optional[str]) -> str:
+        if not section_title:
+            return doc.append(content)
+        # Nest the doc under its section heading
+        root = MarkdownDocument(content).sections
+        if root:
+            content = shift_headings(content, 3 - root[0][0])
+        return doc.append(f"## {section_title}\n\n" + content)
+
+    def _merge_section(self, section: str, new_content: str, page_name: str) -> Optional[str]:
+        """Ask the LLM to update one section; returns the section markdown or None"""
+        heading = section.split('\n', 1)[0]
+        new_content = new_content[:MAX_MERGE_CONTENT]
+        prompt = f"""You are a documentation editor. Update ONE section of a documentation page with new documentation.
+
+**Page:** {page_name}
+
+**Current Section:**
 ```markdown
-{existing[:3000]}
+{section}
 ```
 
-**New Content to Integrate:**
+**New Documentation for this Section:**
 ```markdown
-{new_content[:2000]}
+{new_content}
 ```
 
-**Section Focus:** {section_title or 'General update'}
-
 **Your Task:**
-1. If content is about NEW functions/features → ADD new section
-2. If content UPDATES existing functions → REPLACE old section with new
-3. If content is SIMILAR to existing → MERGE intelligently
-4. Maintain existing frontmatter (---)
-5. Keep consistent formatting and structure
-6. Update "Last updated" timestamps
-
-**CRITICAL:** Return ONLY the raw markdown content. Do NOT wrap it in code fences or ```markdown blocks.
-Return the COMPLETE merged page content as plain markdown.
+1. If content is about NEW functions/features → ADD it to the section
+2. If content UPDATES existing functions → REPLACE the old text
+3. If content is SIMILAR to existing → MERGE and deduplicate
+4. Keep the heading line exactly as: {heading}
+5. Keep sub-headings deeper than the section heading; keep formatting consistent
+
+**CRITICAL:** Return ONLY the updated section as raw markdown, starting with its heading.
+Do NOT wrap it in code fences and do NOT include other parts of the page.
 """
 
-        # Use LLM wrapper
         llm = get_client()
         merged = llm.call_chat(
             model=MODEL,
@@ -403,131 +514,77 @@ Return the COMPLETE merged page content as plain markdown.
                 {'role': 'user', 'content': prompt}
             ],
             temperature=0.3,
-            max_tokens=4000,
+            max_tokens=merge_token_budget(section, new_content),
             response_format='text',
             timeout=45,
-            use_cache=False  # Don't cache merges (content changes)
+            use_cache=True  # Keyed on the exact section + new content
         )
-        
-        if merged:
-            print(f"    ✓ LLM merged content successfully")
-            # Remove any code fences the LLM might have added
-            merged = merged.strip()
-            if merged.startswith('```markdown'):
-                merged = merged[11:]  # Remove ```markdown
-            if merged.startswith('```'):
-                merged = merged[3:]
-            if merged.endswith('```'):
-                merged = merged[:-3]
-            return merged.strip()
-        else:
-            print(f"    ⚠️  LLM merge failed, appending instead")
-            return existing + f"\n\n## {section_title or 'Update'}\n\n" + new_content
+        return strip_fences(merged) if merged else None
     
     def generate_index_page(self):
-        """Generate/update main index.md and section index pages"""
+        """
+        Generate section index pages and the main index.md from the page index.
+
+        Only sections whose set of pages changed since the last run (or whose
+        index.md is missing) are rewritten; no page contents are read.
+        """
         print("\n📑 Generating index pages...")
         
-        # Collect all pages
-        all_pages = {}
-        for md_file in PAGES_DIR.rglob('*.md'):
-            if md_file.name == 'index.md':
-                continue
-            relative = md_file.relative_to(PAGES_DIR)
-            # Normalize path to forward slashes for cross-platform consistency
-            relative_str = str(relative).replace('\\', '/')
-            all_pages[relative_str] = md_file
+        membership = self.mapping.get('index_membership', {})
+        any_changed = False
         
-        # Generate API index
-        api_pages = [p for p in all_pages.keys() if p.startswith('api/')]
-        if api_pages:
-            api_index = f"""---
-title: API Reference
-layout: default
-category: API Reference
----
-
-# API Reference
-
-Low-level API documentation for all functions, classes, and interfaces.
-
-## Available APIs
-
-"""
-            for page in sorted(api_pages):
-                title = Path(page).stem.replace('-', ' ').title()
-                api_index += f"- **[{title}]({Path(page).name})** - Technical API documentation\n"
+        for section, config in SECTION_INDEXES.items():
+            pages = [p for p in self.page_index.pages(f"{section}/") if Path(p).name != 'index.md']
+            index_rel = f"{section}/index.md"
             
-            api_index += f"\n**Total:** {len(api_pages)} API pages\n\n"
-            api_index += "---\n\n*Auto-generated by CI/CD Documentation System*\n"
+            if not pages and config['empty'] is None:
+                continue
+            if membership.get(section) == pages and (PAGES_DIR / index_rel).exists():
+                print(f"  ✓ {index_rel} unchanged ({len(pages)} pages)")
+                continue
             
-            with open(PAGES_DIR / 'api' / 'index.md', 'w') as f:
-                f.write(api_index)
-            print(f"  ✓ Updated api/index.md with {len(api_pages)} pages")
-        
-        # Generate Modules index
-        module_pages = [p for p in all_pages.keys() if p.startswith('modules/')]
-        modules_index = f"""---
-title: Modules
-layout: default
-category: Modules
----
-
-# Modules
-
-Module architecture and design documentation.
-
-## Available Modules
-
-"""
-        if module_pages:
-            for page in sorted(module_pages):
-                title = Path(page).stem.replace('-', ' ').title()
-                modules_index += f"- **[{title}]({Path(page).name})** - Module architecture and design\n"
-            modules_index += f"\n**Total:** {len(module_pages)} modules\n\n"
-        else:
-            modules_index += "*No module documentation yet. Module-level docs will be auto-generated as the codebase evolves.*\n\n"
-            modules_index += "Modules provide architectural overview, design decisions, and how different components interact.\n\n"
-        
-        modules_index += "---\n\n*Auto-generated by CI/CD Documentation System*\n"
-        
-        (PAGES_DIR / 'modules').mkdir(exist_ok=True)
-        with open(PAGES_DIR / 'modules' / 'index.md', 'w') as f:
-            f.write(modules_index)
-        print(f"  ✓ Updated modules/index.md")
-        
-        # Generate Features index
-        feature_pages = [p for p in all_pages.keys() if p.startswith('features/')]
-        features_index = f"""---
-title: Features
+            content = self._render_section_index(config, pages)
+            (PAGES_DIR / section).mkdir(exist_ok=True)
+            with open(PAGES_DIR / index_rel, 'w') as f:
+                f.write(content)
+            self.page_index.refresh_page(index_rel, content=content)
+            membership[section] = pages
+            any_changed = True
+            print(f"  ✓ Updated {index_rel} with {len(pages)} pages")
+        
+        if not any_changed and (PAGES_DIR / 'index.md').exists():
+            print("  ✓ index.md unchanged")
+            return
+        
+        self.mapping.set('index_membership', membership)
+        self._write_main_index()
+    
+    def _render_section_index(self, config: Dict, pages: List[str]) -> str:
+        content = f"""---
+title: {config['title']}
 layout: default
-category: Features
+category: {config['title']}
 ---
 
-# Features
+# {config['title']}
 
-User-facing feature documentation and guides.
+{config['intro']}
 
-## Available Features
+## Available {config['list_title']}
 
 """
-        if feature_pages:
-            for page in sorted(feature_pages):
+        if pages:
+            for page in pages:
                 title = Path(page).stem.replace('-', ' ').title()
-                features_index += f"- **[{title}]({Path(page).name})** - Feature guide and tutorial\n"
-            features_index += f"\n**Total:** {len(feature_pages)} features\n\n"
+                content += f"- **[{title}]({Path(page).name})** - {config['item']}\n"
+            content += f"\n**Total:** {len(pages)} {config['total']}\n\n"
         else:
-            features_index += "*No feature documentation yet. Feature guides will be auto-generated as you develop.*\n\n"
-            features_index += "Features provide user-facing documentation on how to use and configure the system.\n\n"
-        
-        features_index += "---\n\n*Auto-generated by CI/CD Documentation System*\n"
-        
-        (PAGES_DIR / 'features').mkdir(exist_ok=True)
-        with open(PAGES_DIR / 'features' / 'index.md', 'w') as f:
-            f.write(features_index)
-        print(f"  ✓ Updated features/index.md")
+            content += config['empty']
         
-        # Generate main index  
+        content += "---\n\n*Auto-generated by CI/CD Documentation System*\n"
+        return content
+    
+    def _write_main_index(self):
         index_content = f"""---
 title: Home
 layout: default
@@ -561,6 +618,7 @@ This documentation is automatically generated and maintained by our intelligent
         index_path = PAGES_DIR / 'index.md'
         with open(index_path, 'w') as f:
             f.write(index_content)
+        self.page_index.refresh_page('index.md', content=index_content)
         
         print(f"  ✓ Generated main index.md")
 
@@ -571,112 +629,12 @@ def process_docs_to_pages(doc_files: List[str]):
     print("INTELLIGENT GITHUB PAGES MANAGER")
     print("="*80)
     
-    manager = PagesManager()
-    changes_made = []
-    
-    for doc_file in doc_files:
-        if not os.path.exists(doc_file):
-            continue
-        
-        print(f"\n📄 Processing: {doc_file}")
-        
-        # Read doc content
-        with open(doc_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Determine source file
-        doc_path = Path(doc_file)
-        source_file = doc_path.stem + '.ts'
-        
-        # Generate multi-perspective docs (API, Modules, Features)
-        perspectives = manager.generate_multi_perspective_docs(source_file, content)
-        
-        # Apply each perspective
-        for page_path, action, reasoning in perspectives:
-            success = manager.apply_documentation_change(page_path, action, content)
-            
-            if success:
-                changes_made.append({
-                    'source': source_file,
-                    'page': page_path,
-                    'action': action,
-                    'reasoning': reasoning
-                })
-                
-                # Record mapping (support multiple pages per file)
-                if source_file not in manager.mapping['file_to_page']:
-                    manager.mapping['file_to_page'][source_file] = [page_path]
-                elif isinstance(manager.mapping['file_to_page'][source_file], str):
-                    # Migrate old string format to list
-                    old_page = manager.mapping['file_to_page'][source_file]
-                    manager.mapping['file_to_page'][source_file] = [old_page, page_path]
-                elif page_path not in manager.mapping['file_to_page'][source_file]:
-                    manager.mapping['file_to_page'][source_file].append(page_path)
-                
-                if page_path not in manager.mapping['page_metadata']:
-                    manager.mapping['page_metadata'][page_path] = {
-                        'created': datetime.now().isoformat(),
-                        'sources': []
-                    }
-                if source_file not in manager.mapping['page_metadata'][page_path]['sources']:
-                    manager.mapping['page_metadata'][page_path]['sources'].append(source_file)
-                manager.mapping['page_metadata'][page_path]['last_updated'] = datetime.now().isoformat()
-                manager.mapping['page_metadata'][page_path]['last_action'] = action
-    
-    # Generate index page
-    manager.generate_index_page()
-    
-    # Save mapping
-    manager.save_mapping()
-    
-    # Generate summary
-    summary = f"""# GitHub Pages Update Summary
-
-**Changes Made:** {len(changes_made)}
-
-"""
-    
-    for change in changes_made:
-        summary += f"### {change['source']} -> {change['page']}\n"
-        summary += f"- **Action:** {change['action'].upper()}\n"
-        summary += f"- **Reasoning:** {change['reasoning']}\n\n"
-    
-    with open('pages_summary.md', 'w', encoding='utf-8') as f:
-        f.write(summary)
-    
-    print("\n" + "="*80)
-    print("GITHUB PAGES MANAGER COMPLETE")
-    print("="*80)
-    print(f"✓ {len(changes_made)} pages updated")
-    print(f"✓ Mapping saved to {MAPPING_FILE}")
-    print(f"✓ Site generated in {PAGES_DIR}")
+    PublishingEngine([PagesManager()]).publish(doc_files)
 
 
 if __name__ == '__main__':
-    # Get changed source files
-    changed_source_files = []
-    if os.path.exists('changed_files.txt'):
-        with open('changed_files.txt', 'r') as f:
-            changed_source_files = [line.strip() for line in f if line.strip()]
-    
-    if not changed_source_files:
-        print("No changed source files")
-        sys.exit(0)
-    
-    # Map to doc files
-    docs_dir = Path('docs')
-    if not docs_dir.exists():
-        print("No docs directory")
-        sys.exit(0)
-    
-    doc_files_to_process = []
-    for source_file in changed_source_files:
-        source_path = Path(source_file)
-        doc_filename = source_path.stem + '.md'
-        doc_path = docs_dir / doc_filename
-        
-        if doc_path.exists():
-            doc_files_to_process.append(str(doc_path))
+    # Only process docs for source files that actually changed
+    doc_files_to_process = changed_docs()
     
     if not doc_files_to_process:
         print("No documentation files for changed sources")
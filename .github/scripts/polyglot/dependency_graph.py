@@ -0,0 +1,291 @@
+"""
+Compact Dependency Graph
+Interned integer node IDs with CSR adjacency (forward and reverse)
+"""
+import sys
+import time
+import random
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+
+class DependencyGraph:
+    """
+    Immutable dependency graph.
+
+    Paths are interned to dense integer IDs. Edges are stored CSR-style:
+    the dependencies of node i are targets[offsets[i]:offsets[i + 1]], and the
+    same layout is kept for reverse edges so dependents are an O(degree) slice.
+    """
+
+    def __init__(self, paths: List[str], offsets: array, targets: array,
+                 rev_offsets: array, rev_targets: array):
+        self.paths = paths
+        self.ids = {p: i for i, p in enumerate(paths)}
+        self.offsets = offsets
+        self.targets = targets
+        self.rev_offsets = rev_offsets
+        self.rev_targets = rev_targets
+        self._sccs = None
+
+    @classmethod
+    def from_adjacency(cls, adjacency: Dict[str, Iterable[str]]) -> 'DependencyGraph':
+        """Build from a path -> [dependency paths] dict (DependencyMapper.dependency_graph)"""
+        ids = {}
+        paths = []
+
+        def intern(path):
+            node = ids.get(path)
+            if node is None:
+                node = ids[path] = len(paths)
+                paths.append(path)
+            return node
+
+        edges = []
+        for source, deps in adjacency.items():
+            src = intern(source)
+            # Duplicate imports of the same file collapse to one edge
+            for dst in dict.fromkeys(intern(d) for d in deps):
+                edges.append((src, dst))
+
+        return cls.from_edges(paths, edges)
+
+    @classmethod
+    def from_edges(cls, paths: List[str], edges) -> 'DependencyGraph':
+        """Build from interned paths and (src_id, dst_id) pairs"""
+        n = len(paths)
+        offsets = _counting_offsets(n, (src for src, _ in edges))
+        rev_offsets = _counting_offsets(n, (dst for _, dst in edges))
+
+        targets = array('i', bytes(4 * len(edges)))
+        rev_targets = array('i', bytes(4 * len(edges)))
+        fill = array('i', offsets[:-1])
+        rev_fill = array('i', rev_offsets[:-1])
+
+        for src, dst in edges:
+            targets[fill[src]] = dst
+            fill[src] += 1
+            rev_targets[rev_fill[dst]] = src
+            rev_fill[dst] += 1
+
+        return cls(list(paths), offsets, targets, rev_offsets, rev_targets)
+
+    def __len__(self):
+        return len(self.paths)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    def node_id(self, path: str) -> Optional[int]:
+        return self.ids.get(path)
+
+    def _out(self, node: int):
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def _in(self, node: int):
+        return self.rev_targets[self.rev_offsets[node]:self.rev_offsets[node + 1]]
+
+    def dependencies(self, path: str) -> List[str]:
+        """Files that `path` imports directly"""
+        node = self.ids.get(path)
+        return [] if node is None else [self.paths[d] for d in self._out(node)]
+
+    def dependents(self, path: str) -> List[str]:
+        """Files that import `path` directly (reverse lookup)"""
+        node = self.ids.get(path)
+        return [] if node is None else [self.paths[d] for d in self._in(node)]
+
+    def strongly_connected_components(self) -> List[List[int]]:
+        """
+        Iterative Tarjan. Components are returned in reverse topological order:
+        every component appears after all the components it depends on.
+        """
+        if self._sccs is not None:
+            return self._sccs
+
+        n = len(self.paths)
+        offsets, targets = self.offsets, self.targets
+        index = array('i', [-1]) * n
+        low = array('i', [0]) * n
+        on_stack = bytearray(n)
+        stack = []
+        sccs = []
+        counter = 0
+
+        for root in range(n):
+            if index[root] != -1:
+                continue
+
+            work = [(root, offsets[root])]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+
+            while work:
+                node, edge = work[-1]
+                if edge < offsets[node + 1]:
+                    work[-1] = (node, edge + 1)
+                    dep = targets[edge]
+                    if index[dep] == -1:
+                        index[dep] = low[dep] = counter
+                        counter += 1
+                        stack.append(dep)
+                        on_stack[dep] = 1
+                        work.append((dep, offsets[dep]))
+                    elif on_stack[dep] and index[dep] < low[node]:
+                        low[node] = index[dep]
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component.append(member)
+                        if member == node:
+                            break
+                    sccs.append(component)
+
+        self._sccs = sccs
+        return sccs
+
+    def cycles(self) -> List[List[str]]:
+        """Import cycles: components with more than one file, or a file importing itself"""
+        result = []
+        for component in self.strongly_connected_components():
+            node = component[0]
+            if len(component) > 1 or node in self._out(node):
+                result.append(sorted(self.paths[m] for m in component))
+        return result
+
+    def topological_layers(self) -> List[List[str]]:
+        """
+        Group files into layers: layer 0 has no dependencies, and each file sits one
+        layer above its deepest dependency. Files in a cycle share a layer.
+        """
+        sccs = self.strongly_connected_components()
+        component_of = array('i', bytes(4 * len(self.paths)))
+        for c, component in enumerate(sccs):
+            for member in component:
+                component_of[member] = c
+
+        # Tarjan order guarantees dependency components were already assigned
+        layer_of = array('i', bytes(4 * len(sccs)))
+        layers = []
+        for c, component in enumerate(sccs):
+            layer = 0
+            for member in component:
+                for dep in self._out(member):
+                    dc = component_of[dep]
+                    if dc != c and layer_of[dc] + 1 > layer:
+                        layer = layer_of[dc] + 1
+            layer_of[c] = layer
+            if layer == len(layers):
+                layers.append([])
+            layers[layer].extend(self.paths[m] for m in component)
+
+        return [sorted(layer) for layer in layers]
+
+    def transitive_dependencies(self, path: str, max_depth: int = None, limit: int = None) -> List[str]:
+        """Everything `path` depends on, breadth-first, bounded by depth and result count"""
+        return self._reach(path, self._out, max_depth, limit)
+
+    def transitive_dependents(self, path: str, max_depth: int = None, limit: int = None) -> List[str]:
+        """Everything that (transitively) depends on `path` - the impact set of a change"""
+        return self._reach(path, self._in, max_depth, limit)
+
+    def _reach(self, path, neighbours, max_depth, limit) -> List[str]:
+        start = self.ids.get(path)
+        if start is None:
+            return []
+
+        seen = bytearray(len(self.paths))
+        seen[start] = 1
+        queue = deque([(start, 0)])
+        found = []
+
+        while queue:
+            node, depth = queue.popleft()
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for dep in neighbours(node):
+                if seen[dep]:
+                    continue
+                seen[dep] = 1
+                found.append(self.paths[dep])
+                if limit is not None and len(found) >= limit:
+                    return found
+                queue.append((dep, depth + 1))
+
+        return found
+
+
+def _counting_offsets(n: int, sources) -> array:
+    """CSR offsets (length n + 1) from the source node of every edge"""
+    offsets = array('i', bytes(4 * (n + 1)))
+    for src in sources:
+        offsets[src + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    return offsets
+
+
+def benchmark(nodes: int = 100_000, avg_degree: int = 8, seed: int = 42):
+    """Time construction and queries on a synthetic graph (mostly layered, with some cycles)"""
+    rng = random.Random(seed)
+    paths = [f"pkg{i % 500}/module_{i}.py" for i in range(nodes)]
+    adjacency = {}
+    for i, path in enumerate(paths):
+        deps = []
+        for _ in range(rng.randint(0, 2 * avg_degree)):
+            # Mostly point "down" the layering; occasionally back up to create cycles
+            j = rng.randrange(nodes) if rng.random() < 0.01 else rng.randrange(max(1, i))
+            deps.append(paths[j])
+        adjacency[path] = deps
+
+    timings = {}
+
+    start = time.perf_counter()
+    graph = DependencyGraph.from_adjacency(adjacency)
+    timings['build'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for path in paths[:10_000]:
+        graph.dependents(path)
+    timings['10k reverse lookups'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cycles = graph.cycles()
+    timings['sccs + cycles'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    layers = graph.topological_layers()
+    timings['topological layers'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    impact = graph.transitive_dependents(paths[0], max_depth=3, limit=10_000)
+    timings['bounded closure (depth 3)'] = time.perf_counter() - start
+
+    memory = (graph.offsets.itemsize * (len(graph.offsets) + len(graph.rev_offsets))
+              + graph.targets.itemsize * (len(graph.targets) + len(graph.rev_targets)))
+
+    print(f"Synthetic graph: {len(graph)} nodes, {graph.edge_count} edges")
+    print(f"  adjacency arrays: {memory / 1024 / 1024:.1f} MB")
+    print(f"  cycles: {len(cycles)}, layers: {len(layers)}, impact set: {len(impact)}")
+    for name, seconds in timings.items():
+        print(f"  {name:<28} {seconds * 1000:9.1f} ms")
+
+    return timings
+
+
+if __name__ == '__main__':
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -1,6 +1,8 @@
 import os
 from pathlib import Path
 from .polyglot_analyzer import PolyglotAnalyzer
+from .dependency_graph import DependencyGraph
+from .workspace_scanner import WorkspaceScanner, analyze_content, MAX_FILE_SIZE
 
 class DependencyMapper:
     def __init__(self, workspace_root):
@@ -9,30 +11,24 @@ class DependencyMapper:
         self.file_map = {} # path -> symbols/imports
         self.dependency_graph = {} # path -> [dependencies]
 
-    def scan_workspace(self):
-        """Scan all supported files in workspace"""
-        for root, _, files in os.walk(self.root):
-            for file in files:
-                ext = os.path.splitext(file)[1]
-                if ext in ['.py', '.js', '.ts', '.tsx', '.go', '.rs', '.java']:
-                    full_path = Path(root) / file
-                    self.analyze_file(full_path)
+    def scan_workspace(self, workers: int = None, max_file_size: int = MAX_FILE_SIZE):
+        """
+        Scan all supported files in workspace.
+
+        Candidates come from `git ls-files` (or an ignore-aware walk outside git),
+        and parsing is fanned out to a process pool with one warm analyzer per worker.
+        """
+        scanner = WorkspaceScanner(self.root, max_file_size=max_file_size)
+        self.file_map.update(scanner.scan(workers=workers, analyzer=self.analyzer))
+        for rel_path, reason in scanner.skipped.items():
+            print(f"Skipping {rel_path}: {reason}")
 
     def analyze_file(self, file_path: Path):
         """Analyze a single file for content"""
         try:
             content = file_path.read_text(encoding='utf-8', errors='ignore')
             rel_path = file_path.relative_to(self.root).as_posix() # Normalize to forward slashes
-            ext = file_path.suffix
-            
-            imports = self.analyzer.extract_imports(content, ext)
-            symbols = self.analyzer.extract_symbols(content, ext)
-            
-            self.file_map[rel_path] = {
-                'imports': imports,
-                'symbols': [s['name'] for s in symbols],
-                'path': str(file_path)
-            }
+            self.file_map[rel_path] = analyze_content(self.analyzer, content, str(file_path))
         except Exception as e:
             print(f"Error analyzing {file_path}: {e}")
 
@@ -49,6 +45,12 @@ class DependencyMapper:
             
         return self.dependency_graph
 
+    def compact_graph(self) -> DependencyGraph:
+        """Integer-ID/CSR view of the dependency graph (reverse deps, cycles, layers, closure)"""
+        if not self.dependency_graph:
+            self.build_graph()
+        return DependencyGraph.from_adjacency(self.dependency_graph)
+
     def _resolve_import(self, import_str, source_file):
         """Try to resolve an import string to a file in file_map"""
         # source_file is a key in file_map (posix relative path)
@@ -62,10 +62,10 @@ class PolyglotAnalyzer:
         
         return parser.parse(bytes(content, "utf8"))
 
-    def extract_symbols(self, content: str, extension: str):
+    def extract_symbols(self, content: str, extension: str, tree=None):
         """Extract functions and classes using Tree-sitter queries"""
         ext = extension.lstrip('.').lower()
-        tree = self.parse(content, extension)
+        tree = tree or self.parse(content, extension)
         if not tree:
             return []
             
@@ -112,10 +112,10 @@ class PolyglotAnalyzer:
                 
         return symbols
 
-    def extract_imports(self, content: str, extension: str):
+    def extract_imports(self, content: str, extension: str, tree=None):
         """Extract imported modules/files"""
         ext = extension.lstrip('.').lower()
-        tree = self.parse(content, extension)
+        tree = tree or self.parse(content, extension)
         if not tree:
             return []
             
@@ -142,6 +142,188 @@ class PolyglotAnalyzer:
                  
         return imports
 
+    def extract_classes(self, content: str, extension: str, tree=None):
+        """
+        Extract class-like types with bases, methods and fields.
+
+        Returns a list of {name, bases, methods, fields, line}; methods and fields
+        are {name, visibility} with visibility 'public', 'protected' or 'private'.
+        Go/Rust methods are attached to their struct via the receiver/impl type.
+        """
+        ext = extension.lstrip('.').lower()
+        tree = tree or self.parse(content, extension)
+        if not tree:
+            return []
+
+        if ext in ('go', 'rs'):
+            return self._extract_structs(tree.root_node, ext)
+
+        class_types = {
+            'py': ('class_definition',),
+            'js': ('class_declaration', 'class'),
+            'jsx': ('class_declaration', 'class'),
+            'ts': ('class_declaration', 'abstract_class_declaration'),
+            'tsx': ('class_declaration', 'abstract_class_declaration'),
+            'java': ('class_declaration',),
+        }.get(ext)
+        if not class_types:
+            return []
+
+        classes = []
+        stack = [tree.root_node]
+        while stack:
+            node = stack.pop()
+            stack.extend(reversed(node.children))
+            if node.type not in class_types:
+                continue
+            name_node = node.child_by_field_name('name')
+            body = node.child_by_field_name('body')
+            if not name_node or not body:
+                continue
+
+            cls = {
+                'name': _text(name_node),
+                'bases': self._class_bases(node, ext),
+                'methods': [],
+                'fields': [],
+                'line': node.start_point[0] + 1
+            }
+            for member in body.named_children:
+                self._add_class_member(cls, member, ext)
+            classes.append(cls)
+
+        return classes
+
+    def _class_bases(self, node, ext):
+        bases = []
+        if ext == 'py':
+            superclasses = node.child_by_field_name('superclasses')
+            if superclasses:
+                bases = [_text(c) for c in superclasses.named_children if c.type in ('identifier', 'attribute')]
+        elif ext == 'java':
+            superclass = node.child_by_field_name('superclass')
+            if superclass:
+                bases += [_text(t) for t in superclass.named_children]
+            interfaces = node.child_by_field_name('interfaces')
+            for type_list in (interfaces.named_children if interfaces else []):
+                bases += [_text(t) for t in type_list.named_children]
+        else:
+            for child in node.children:
+                if child.type != 'class_heritage':
+                    continue
+                for clause in child.named_children:
+                    if clause.type in ('extends_clause', 'implements_clause'):
+                        bases += [_text(c) for c in clause.named_children if c.type != 'type_arguments']
+                    else:
+                        bases.append(_text(clause)) # JS: class_heritage holds the expression directly
+        # Strip generic arguments (Base<T> -> Base) so edges point at the class node
+        return [b.split('<')[0] for b in bases]
+
+    def _add_class_member(self, cls, member, ext):
+        if ext == 'py':
+            if member.type == 'decorated_definition':
+                member = member.child_by_field_name('definition') or member
+            if member.type == 'function_definition':
+                name = _text(member.child_by_field_name('name'))
+                cls['methods'].append({'name': name, 'visibility': 'private' if name.startswith('_') else 'public'})
+            elif member.type == 'expression_statement':
+                assign = member.named_children[0] if member.named_children else None
+                if assign is not None and assign.type == 'assignment' and assign.child_by_field_name('type'):
+                    left = assign.child_by_field_name('left')
+                    if left is not None and left.type == 'identifier':
+                        name = _text(left)
+                        cls['fields'].append({'name': name, 'visibility': 'private' if name.startswith('_') else 'public'})
+
+        elif ext == 'java':
+            visibility = _modifier_visibility(member, 'modifiers', default='public')
+            if member.type in ('method_declaration', 'constructor_declaration'):
+                cls['methods'].append({'name': _text(member.child_by_field_name('name')), 'visibility': visibility})
+            elif member.type == 'field_declaration':
+                for declarator in member.children_by_field_name('declarator'):
+                    cls['fields'].append({'name': _text(declarator.child_by_field_name('name')), 'visibility': visibility})
+
+        else: # JS / TS
+            name_node = member.child_by_field_name('name') or member.child_by_field_name('property')
+            if name_node is None:
+                return
+            name = _text(name_node)
+            if name_node.type == 'private_property_identifier':
+                visibility = 'private'
+            else:
+                visibility = _modifier_visibility(member, 'accessibility_modifier', default='public')
+            if member.type in ('method_definition', 'abstract_method_signature', 'method_signature'):
+                cls['methods'].append({'name': name, 'visibility': visibility})
+            elif member.type in ('public_field_definition', 'field_definition'):
+                cls['fields'].append({'name': name, 'visibility': visibility})
+
+    def _extract_structs(self, root, ext):
+        structs = {}
+        pending_methods = [] # (type_name, method) - methods may precede their struct
+        stack = [root]
+
+        while stack:
+            node = stack.pop()
+            stack.extend(reversed(node.children))
+
+            if ext == 'go' and node.type == 'type_spec':
+                type_node = node.child_by_field_name('type')
+                if type_node is None or type_node.type != 'struct_type':
+                    continue
+                cls = _new_struct(node)
+                for field in _descendants(type_node):
+                    if field.type != 'field_declaration':
+                        continue
+                    names = field.children_by_field_name('name')
+                    if not names:
+                        # Embedded struct: Go's form of inheritance
+                        cls['bases'].append(_text(field.child_by_field_name('type')).lstrip('*'))
+                    for name in names:
+                        cls['fields'].append({'name': _text(name), 'visibility': _go_visibility(_text(name))})
+                structs[cls['name']] = cls
+
+            elif ext == 'go' and node.type == 'method_declaration':
+                receiver = node.child_by_field_name('receiver')
+                types = [t for t in _descendants(receiver) if t.type == 'type_identifier'] if receiver else []
+                if types:
+                    name = _text(node.child_by_field_name('name'))
+                    pending_methods.append((_text(types[0]), {'name': name, 'visibility': _go_visibility(name)}, None))
+
+            elif ext == 'rs' and node.type == 'struct_item':
+                cls = _new_struct(node)
+                body = node.child_by_field_name('body')
+                for field in (body.named_children if body else []):
+                    if field.type == 'field_declaration':
+                        cls['fields'].append({'name': _text(field.child_by_field_name('name')), 'visibility': _rust_visibility(field)})
+                structs[cls['name']] = cls
+
+            elif ext == 'rs' and node.type == 'impl_item':
+                type_node = node.child_by_field_name('type')
+                trait = node.child_by_field_name('trait')
+                body = node.child_by_field_name('body')
+                if type_node is None:
+                    continue
+                type_name = _text(type_node).split('<')[0]
+                trait_name = _text(trait).split('<')[0] if trait else None
+                for item in (body.named_children if body else []):
+                    if item.type == 'function_item':
+                        name = _text(item.child_by_field_name('name'))
+                        # Trait methods are public through the trait
+                        visibility = 'public' if trait_name else _rust_visibility(item)
+                        pending_methods.append((type_name, {'name': name, 'visibility': visibility}, trait_name))
+                if trait_name:
+                    pending_methods.append((type_name, None, trait_name))
+
+        for type_name, method, trait_name in pending_methods:
+            cls = structs.get(type_name)
+            if cls is None:
+                continue
+            if method:
+                cls['methods'].append(method)
+            if trait_name and trait_name not in cls['bases']:
+                cls['bases'].append(trait_name)
+
+        return list(structs.values())
+
     def _get_query_for_lang(self, ext):
         """Return Tree-sitter mapping query for symbols"""
         # Generic-ish queries
@@ -192,3 +374,43 @@ class PolyglotAnalyzer:
             (import_spec path: (_) @import)
             """
         return None
+
+
+def _text(node) -> str:
+    return node.text.decode('utf8', errors='replace') if node is not None else ''
+
+
+def _descendants(node):
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(reversed(current.children))
+
+
+def _new_struct(node):
+    return {
+        'name': _text(node.child_by_field_name('name')),
+        'bases': [],
+        'methods': [],
+        'fields': [],
+        'line': node.start_point[0] + 1
+    }
+
+
+def _modifier_visibility(node, modifier_type, default):
+    for child in node.children:
+        if child.type == modifier_type:
+            text = _text(child)
+            for visibility in ('private', 'protected', 'public'):
+                if visibility in text.split():
+                    return visibility
+    return default
+
+
+def _go_visibility(name):
+    return 'public' if name[:1].isupper() else 'private'
+
+
+def _rust_visibility(node):
+    return 'public' if any(c.type == 'visibility_modifier' for c in node.children) else 'private'
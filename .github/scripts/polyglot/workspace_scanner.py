@@ -0,0 +1,232 @@
+"""
+Workspace Scanner
+Ignore-aware file enumeration and parallel Tree-sitter analysis
+"""
+import os
+import fnmatch
+import subprocess
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .polyglot_analyzer import PolyglotAnalyzer
+
+SUPPORTED_EXTENSIONS = {'.py', '.js', '.ts', '.tsx', '.go', '.rs', '.java'}
+
+# Directories the os.walk fallback never descends into, even without a .gitignore
+# (in a git checkout, git's tracked/ignored status decides instead)
+DEFAULT_EXCLUDE_DIRS = {
+    '.git', '.hg', '.svn', 'node_modules', '.venv', 'venv', 'env',
+    '__pycache__', '.mypy_cache', '.pytest_cache', '.ruff_cache', '.tox', '.nox',
+    '.llm-cache', 'dist', 'build', 'target', 'out', '.next', 'coverage',
+}
+
+MAX_FILE_SIZE = 1024 * 1024  # 1 MB - larger files are almost always generated/vendored
+
+# Below this many files a process pool costs more than it saves
+PARALLEL_THRESHOLD = 64
+
+
+class IgnoreRules:
+    """Minimal .gitignore matcher (globs, anchors, dir-only and negation)"""
+
+    def __init__(self):
+        self.rules = []  # (base_dir, pattern, negate, dir_only, anchored)
+
+    def add_file(self, gitignore: Path, base_dir: str):
+        """Load rules from a .gitignore located at base_dir (posix, relative to root)"""
+        try:
+            lines = gitignore.read_text(encoding='utf-8', errors='ignore').splitlines()
+        except OSError:
+            return
+
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            anchored = '/' in line
+            line = line.lstrip('/')
+            if line:
+                self.rules.append((base_dir, line, negate, dir_only, anchored))
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """Return True if rel_path (posix, relative to root) is ignored; last match wins"""
+        ignored = False
+        name = rel_path.rsplit('/', 1)[-1]
+
+        for base_dir, pattern, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if base_dir:
+                if not rel_path.startswith(base_dir + '/'):
+                    continue
+                local = rel_path[len(base_dir) + 1:]
+            else:
+                local = rel_path
+
+            if anchored:
+                matched = fnmatch.fnmatchcase(local, pattern) or fnmatch.fnmatchcase(local, pattern.replace('**/', ''))
+            else:
+                matched = fnmatch.fnmatchcase(name, pattern)
+
+            if matched:
+                ignored = not negate
+
+        return ignored
+
+
+# --- Process pool workers -------------------------------------------------
+# Each worker builds its PolyglotAnalyzer once (parsers stay warm across files)
+
+_worker_analyzer = None
+
+
+def _init_worker():
+    global _worker_analyzer
+    _worker_analyzer = PolyglotAnalyzer()
+
+
+def _analyze_batch(batch: List[Tuple[str, str]], analyzer: PolyglotAnalyzer = None) -> List[Tuple[str, Optional[Dict], Optional[str]]]:
+    """Analyze (rel_path, abs_path) pairs; returns (rel_path, data, error) triples"""
+    if analyzer is None:
+        if _worker_analyzer is None:
+            _init_worker()
+        analyzer = _worker_analyzer
+
+    results = []
+    for rel_path, abs_path in batch:
+        try:
+            content = Path(abs_path).read_text(encoding='utf-8', errors='ignore')
+            results.append((rel_path, analyze_content(analyzer, content, abs_path), None))
+        except Exception as e:
+            results.append((rel_path, None, str(e)))
+    return results
+
+
+def analyze_content(analyzer: PolyglotAnalyzer, content: str, path: str) -> Dict:
+    """Build a file_map entry for already-loaded content"""
+    ext = os.path.splitext(path)[1]
+    imports = analyzer.extract_imports(content, ext)
+    symbols = analyzer.extract_symbols(content, ext)
+    return {
+        'imports': imports,
+        'symbols': [s['name'] for s in symbols],
+        'path': str(path)
+    }
+
+
+class WorkspaceScanner:
+    def __init__(self, workspace_root, extensions: Iterable[str] = None,
+                 max_file_size: int = MAX_FILE_SIZE, exclude_dirs: Iterable[str] = None):
+        self.root = Path(workspace_root)
+        self.extensions = set(extensions or SUPPORTED_EXTENSIONS)
+        self.max_file_size = max_file_size
+        self.exclude_dirs = set(DEFAULT_EXCLUDE_DIRS if exclude_dirs is None else exclude_dirs)
+        self.skipped = {}  # rel_path -> reason
+
+    def list_files(self) -> List[str]:
+        """Return candidate files (posix, relative to root), sorted"""
+        candidates = self._git_ls_files()
+        if candidates is None:
+            candidates = self._walk_files()
+
+        files = []
+        for rel_path in candidates:
+            if os.path.splitext(rel_path)[1] not in self.extensions:
+                continue
+            try:
+                size = (self.root / rel_path).stat().st_size
+            except OSError:
+                continue  # deleted but still in the index
+            if size > self.max_file_size:
+                self.skipped[rel_path] = f"too large ({size} bytes)"
+                continue
+            files.append(rel_path)
+
+        return sorted(files)
+
+    def _git_ls_files(self) -> Optional[List[str]]:
+        """Tracked + untracked-but-not-ignored files via git, or None if not a git checkout"""
+        try:
+            result = subprocess.run(
+                ['git', 'ls-files', '-z', '--cached', '--others', '--exclude-standard'],
+                cwd=self.root,
+                capture_output=True,
+                timeout=60
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+        if result.returncode != 0:
+            return None
+
+        paths = result.stdout.decode('utf-8', errors='ignore').split('\0')
+        return list(dict.fromkeys(p for p in paths if p))
+
+    def _walk_files(self) -> List[str]:
+        """os.walk fallback that prunes excluded directories and honours .gitignore files"""
+        rules = IgnoreRules()
+        files = []
+
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            rel_dir = Path(dirpath).relative_to(self.root).as_posix()
+            rel_dir = '' if rel_dir == '.' else rel_dir
+
+            if '.gitignore' in filenames:
+                rules.add_file(Path(dirpath) / '.gitignore', rel_dir)
+
+            def rel(name):
+                return f"{rel_dir}/{name}" if rel_dir else name
+
+            # Prune in place so os.walk never descends into ignored trees
+            dirnames[:] = sorted(
+                d for d in dirnames
+                if d not in self.exclude_dirs and not rules.is_ignored(rel(d), True)
+            )
+
+            for name in filenames:
+                rel_path = rel(name)
+                if not rules.is_ignored(rel_path, False):
+                    files.append(rel_path)
+
+        return files
+
+    def scan(self, workers: int = None, analyzer: PolyglotAnalyzer = None) -> Dict[str, Dict]:
+        """
+        Analyze every candidate file.
+
+        Args:
+            workers: process count (None = cpu count, 1 = in-process)
+            analyzer: analyzer to reuse for in-process scans
+
+        Returns:
+            rel_path -> {imports, symbols, path}
+        """
+        files = self.list_files()
+        pairs = [(rel_path, str(self.root / rel_path)) for rel_path in files]
+        workers = workers or os.cpu_count() or 1
+
+        if workers <= 1 or len(pairs) < PARALLEL_THRESHOLD:
+            results = _analyze_batch(pairs, analyzer)
+        else:
+            # A few batches per worker keeps the pool busy without per-file IPC overhead
+            batch_size = max(1, len(pairs) // (workers * 4))
+            batches = [pairs[i:i + batch_size] for i in range(0, len(pairs), batch_size)]
+            results = []
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                for batch_result in pool.map(_analyze_batch, batches):
+                    results.extend(batch_result)
+
+        file_map = {}
+        for rel_path, data, error in results:
+            if error:
+                print(f"Error analyzing {rel_path}: {error}")
+                continue
+            file_map[rel_path] = data
+        return file_map
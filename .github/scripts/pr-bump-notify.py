@@ -7,12 +7,11 @@ Detects keywords like 'bump', 'attention', 'review needed', etc.
 import os
 import re
 import sys
-import requests
+from pathlib import Path
 from datetime import datetime
 
-# Webhook URLs
-DISCORD_WEBHOOK = os.environ.get('DISCORD_WEBHOOK_URL')
-SLACK_WEBHOOK = os.environ.get('SLACK_WEBHOOK_URL')
+sys.path.insert(0, str(Path(__file__).parent))
+from notifier import Notifier, configured_sinks, report
 
 # PR/Comment info
 COMMENT_BODY = os.environ.get('COMMENT_BODY', '')
@@ -58,11 +57,8 @@ def truncate(text: str, limit: int) -> str:
     return text[:limit-3] + "..."
 
 
-def send_discord_notification(comment: str, user: str) -> bool:
-    """Send PR bump notification to Discord"""
-    if not DISCORD_WEBHOOK:
-        return False
-    
+def discord_payload(comment: str, user: str) -> dict:
+    """PR bump notification for Discord"""
     # Determine urgency color
     urgent_keywords = ['urgent', 'blocked', 'priority', 'critical']
     is_urgent = any(kw in comment.lower() for kw in urgent_keywords)
@@ -112,32 +108,11 @@ def send_discord_notification(comment: str, user: str) -> bool:
     }
     
     # Remove None values
-    payload = {k: v for k, v in payload.items() if v is not None}
-    
-    try:
-        response = requests.post(
-            DISCORD_WEBHOOK,
-            json=payload,
-            timeout=10
-        )
-        
-        if response.status_code == 204:
-            print(f"✓ Discord notification sent for PR #{PR_NUMBER}")
-            return True
-        else:
-            print(f"⚠️  Discord notification failed: {response.status_code}")
-            print(f"Response: {response.text}")
-            return False
-    except Exception as e:
-        print(f"❌ Error sending Discord notification: {e}")
-        return False
+    return {k: v for k, v in payload.items() if v is not None}
 
 
-def send_slack_notification(comment: str, user: str) -> bool:
-    """Send PR bump notification to Slack"""
-    if not SLACK_WEBHOOK:
-        return False
-    
+def slack_payload(comment: str, user: str) -> dict:
+    """PR bump notification for Slack"""
     # Determine urgency
     urgent_keywords = ['urgent', 'blocked', 'priority', 'critical']
     is_urgent = any(kw in comment.lower() for kw in urgent_keywords)
@@ -200,22 +175,7 @@ def send_slack_notification(comment: str, user: str) -> bool:
     if is_urgent:
         payload["text"] = f"<!here> Urgent PR Review: {PR_TITLE}"
     
-    try:
-        response = requests.post(
-            SLACK_WEBHOOK,
-            json=payload,
-            timeout=10
-        )
-        
-        if response.status_code == 200:
-            print(f"✓ Slack notification sent for PR #{PR_NUMBER}")
-            return True
-        else:
-            print(f"⚠️  Slack notification failed: {response.status_code}")
-            return False
-    except Exception as e:
-        print(f"❌ Error sending Slack notification: {e}")
-        return False
+    return payload
 
 
 def main():
@@ -233,30 +193,22 @@ def main():
     
     print("\n✓ Bump keywords detected!")
     
-    # Send notifications
-    results = []
-    
-    if DISCORD_WEBHOOK:
-        print("\n📢 Sending Discord notification...")
-        success = send_discord_notification(COMMENT_BODY, COMMENT_USER)
-        results.append(('Discord', success))
-    
-    if SLACK_WEBHOOK:
-        print("\n📢 Sending Slack notification...")
-        success = send_slack_notification(COMMENT_BODY, COMMENT_USER)
-        results.append(('Slack', success))
+    # Send notifications (Discord and Slack only; Pushbullet is for pushes)
+    builders = {'discord': discord_payload, 'slack': slack_payload}
+    messages = [(sink, builders[key](COMMENT_BODY, COMMENT_USER))
+                for key, sink in configured_sinks().items() if key in builders]
+    if messages:
+        print(f"\n📢 Sending {', '.join(sink.name for sink, _ in messages)} notifications for PR #{PR_NUMBER}...")
+    deliveries = Notifier().dispatch(messages)
     
     # Summary
     print("\n" + "="*80)
     print("NOTIFICATION SUMMARY")
     print("="*80)
-    for platform, success in results:
-        status = "✓" if success else "❌"
-        print(f"{status} {platform}: {'Sent' if success else 'Failed'}")
+    report(deliveries)
     
-    if not results:
+    if not deliveries:
         print("ℹ️  No webhooks configured")
 
-
 if __name__ == '__main__':
     main()
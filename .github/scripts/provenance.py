@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Doc Provenance Index
+Which source file every generated doc came from
+
+generate-docs records doc path -> {source, hash, language} as it writes each doc,
+so the Pages and Wiki managers resolve a doc's source with a dict lookup instead
+of probing the filesystem for <stem>.<ext> candidates. Docs written before the
+index existed are resolved from their "*Auto-generated from `path`*" line.
+"""
+
+import re
+import json
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Optional
+
+PROVENANCE_VERSION = 1
+PROVENANCE_FILE = Path('.github/docs-provenance.json')
+LANGUAGES_CONFIG = Path(__file__).parent.parent / 'config' / 'languages.json'
+
+_GENERATED_FROM = re.compile(r'^\*Auto-generated from `([^`]+)`\*\s*$', re.M)
+
+
+def load_extension_languages(config_path: Path = LANGUAGES_CONFIG) -> Dict[str, str]:
+    """'.py' -> 'python', ... from .github/config/languages.json"""
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            languages = json.load(f).get('languages', {})
+    except (OSError, ValueError):
+        return {}
+    return {ext: name for name, conf in languages.items() for ext in conf.get('extensions', [])}
+
+
+def normalize_path(path: str) -> str:
+    """One spelling per file, so mapping keys match: './src\\auth.ts' -> 'src/auth.ts'"""
+    # pathlib drops '.' segments, including a leading './'
+    return Path(str(path).replace('\\', '/')).as_posix()
+
+
+def source_from_doc(content: str) -> Optional[str]:
+    """Source path from a generated doc's "*Auto-generated from `path`*" line"""
+    match = _GENERATED_FROM.search(content[:2000])
+    return match.group(1) if match else None
+
+
+class ProvenanceIndex:
+    def __init__(self, index_file: Path = PROVENANCE_FILE):
+        self.index_file = Path(index_file)
+        self.docs = {} # doc path (posix) -> {source, hash, language, generated}
+        self.dirty = False
+        self._languages = None
+        self._load()
+
+    def _load(self):
+        if not self.index_file.exists():
+            return
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == PROVENANCE_VERSION:
+                self.docs = data.get('docs', {})
+        except (OSError, ValueError):
+            print(f"⚠️  Provenance index {self.index_file} unreadable, starting empty")
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.index_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': PROVENANCE_VERSION, 'docs': self.docs}, f, indent=2, sort_keys=True)
+        self.dirty = False
+
+    def language_for(self, source_path: str) -> Optional[str]:
+        if self._languages is None:
+            self._languages = load_extension_languages()
+        return self._languages.get(Path(source_path).suffix)
+
+    def record(self, doc_path: str, source_path: str, source_hash: str, language: str = None):
+        """Note that doc_path was just generated from source_path (whose content hashes to source_hash)"""
+        self.docs[normalize_path(doc_path)] = {
+            'source': normalize_path(source_path),
+            'hash': source_hash,
+            'language': language or self.language_for(source_path),
+            'generated': datetime.now().isoformat(),
+        }
+        self.dirty = True
+
+    def get(self, doc_path: str) -> Optional[Dict]:
+        return self.docs.get(normalize_path(doc_path))
+
+    def resolve(self, doc_path: str, content: str = None) -> Optional[Dict]:
+        """
+        Provenance for a doc: the recorded entry, else one read off the doc's own
+        "generated from" line (hash unknown). None if neither says where it came from.
+        """
+        entry = self.get(doc_path)
+        if entry:
+            return entry
+        source = source_from_doc(content) if content else None
+        if not source:
+            return None
+        source = normalize_path(source)
+        return {'source': source, 'hash': None, 'language': self.language_for(source)}
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Unified Docs Publisher
+Routes docs generated for changed files to GitHub Pages and the Wiki in one pass
+
+Each doc is read once and routed for every target in one decision, with many
+docs sharing each LLM call (see publisher.py); pages-manager.py and wiki-manager.py still work on their
+own and run the same engine with one target.
+"""
+
+import sys
+import argparse
+import importlib.util
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from publisher import PublishingEngine, changed_docs
+
+SCRIPTS_DIR = Path(__file__).parent
+TARGET_SCRIPTS = {
+    'pages': ('pages-manager.py', 'PagesManager'),
+    'wiki': ('wiki-manager.py', 'WikiManager'),
+}
+
+
+def load_target(name: str):
+    """Instantiate a target's manager from its (hyphenated, so not importable) script"""
+    script, class_name = TARGET_SCRIPTS[name]
+    spec = importlib.util.spec_from_file_location(script[:-3].replace('-', '_'), SCRIPTS_DIR / script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, class_name)()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish generated docs to GitHub Pages and the Wiki")
+    parser.add_argument('--targets', default='pages,wiki',
+                        help="Comma-separated targets to publish to (pages, wiki)")
+    parser.add_argument('docs', nargs='*', help="Doc files to publish (default: docs for changed_files.txt)")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.targets.split(',') if name.strip()]
+    unknown = [name for name in names if name not in TARGET_SCRIPTS]
+    if unknown or not names:
+        parser.error(f"unknown target(s): {', '.join(unknown) or '(none)'}")
+
+    doc_files = args.docs or changed_docs()
+    if not doc_files:
+        print("No documentation files found for changed source files")
+        sys.exit(0)
+
+    print("="*80)
+    print(f"DOCS PUBLISHER ({', '.join(names)})")
+    print("="*80)
+    print(f"Found {len(doc_files)} documentation files")
+
+    PublishingEngine([load_target(name) for name in names]).publish(doc_files)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Publishing Engine
+Routes each generated doc once and fans the writes out to every publishing target
+
+A target (PagesManager, WikiManager) supplies its part of the routing decision
+and applies the result; the engine owns everything shared between them:
+
+  - each doc and its source file are read once (sources resolved via provenance)
+  - each source path is matched once against the docs-routing.yml rules
+  - targets that can route a doc without the LLM (a rule, an existing mapping) do so
+  - the rest are decided in batched JSON-mode LLM calls: up to ROUTING_BATCH_SIZE
+    docs per call, every pending target of each doc answered together
+  - each item's answer is validated per target; only the items that failed are
+    re-asked, one doc per call, and a target that fails again falls back alone
+
+Target interface:
+  name                          key of the target's answer in the routing JSON
+  rule_route(doc, rule)         routes from a matched docs-routing.yml rule, or None
+  known_route(doc)              routes without the LLM, or None
+  routing_context()             this target's instructions, shared by every doc in a batch
+  routing_prompt(doc)           doc-specific context for this target ('' if none)
+  routing_schema()              JSON shape of its answer (shown to the LLM)
+  parse_route(doc, answer)      validated routes; raises ValueError on bad output
+  fallback_route(doc)           routes when the LLM fails
+  publish(doc, routes)          apply the routes; returns change records
+  finish(changes)               save mappings/indexes, write the target's summary
+"""
+
+import os
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from llm import get_client
+from provenance import ProvenanceIndex
+from docs_router import DocsRouter
+
+MODEL = os.environ.get('LLM_MODEL', 'openai/gpt-oss-120b')
+SOURCE_PREVIEW = 1000  # chars of source shown to the router
+DOC_PREVIEW = 3000  # chars of the doc shown to the router
+ROUTING_BATCH_SIZE = 10  # docs routed per LLM call
+# Previews per doc when several share one prompt
+BATCH_SOURCE_PREVIEW = 400
+BATCH_DOC_PREVIEW = 1500
+
+
+class Doc:
+    """A generated doc and the source it documents, each read from disk once"""
+
+    def __init__(self, path: str, content: str, source: str, provenance: Optional[Dict] = None):
+        self.path = path
+        self.content = content
+        self.source = source
+        self.provenance = provenance
+        self.rule = None # matched docs-routing.yml route, set by the engine
+        self._source_content = None
+
+    @property
+    def source_content(self) -> str:
+        """Source file text ('' if it can't be read); loaded on first use"""
+        if self._source_content is None:
+            self._source_content = ''
+            if self.provenance:
+                try:
+                    with open(self.source, 'r', encoding='utf-8') as f:
+                        self._source_content = f.read()
+                except (OSError, UnicodeDecodeError):
+                    pass # source deleted since; route on the doc instead
+        return self._source_content
+
+
+def changed_docs(changed_files_path: str = 'changed_files.txt', docs_dir: Path = Path('docs')) -> List[str]:
+    """Docs generate-docs wrote for the files listed in changed_files.txt (docs/<stem>.md)"""
+    if not os.path.exists(changed_files_path):
+        return []
+    with open(changed_files_path, 'r') as f:
+        changed_source_files = [line.strip() for line in f if line.strip()]
+
+    doc_files = []
+    for source_file in changed_source_files:
+        doc_path = docs_dir / (Path(source_file).stem + '.md')
+        if doc_path.exists() and str(doc_path) not in doc_files:
+            doc_files.append(str(doc_path))
+    return doc_files
+
+
+def load_doc(doc_file: str, provenance: ProvenanceIndex) -> Optional[Doc]:
+    if not os.path.exists(doc_file):
+        print(f"⚠️  {doc_file} not found")
+        return None
+    with open(doc_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    entry = provenance.resolve(doc_file, content)
+    if entry:
+        return Doc(doc_file, content, entry['source'], entry)
+    print(f"  ⚠️  No provenance for {doc_file}, mapping the doc itself")
+    return Doc(doc_file, content, Path(doc_file).as_posix())
+
+
+def routing_prompt(items: List[Tuple[Doc, List]]) -> str:
+    """One prompt routing every (doc, pending targets) item; items are answered by their 1-based id"""
+    targets = []
+    for _, item_targets in items:
+        targets.extend(t for t in item_targets if t not in targets)
+    batched = len(items) > 1
+    source_limit = BATCH_SOURCE_PREVIEW if batched else SOURCE_PREVIEW
+    doc_limit = BATCH_DOC_PREVIEW if batched else DOC_PREVIEW
+
+    blocks = []
+    for n, (doc, item_targets) in enumerate(items, 1):
+        source = doc.source_content
+        source_preview = f"**Source Preview:**\n```\n{source[:source_limit]}\n```\n" if source else ""
+        notes = "\n\n".join(filter(None, (t.routing_prompt(doc).strip() for t in item_targets)))
+        blocks.append(f"""## Item "{n}": {doc.source}
+Decide for: {', '.join(t.name for t in item_targets)}
+{source_preview}
+**Generated Documentation:**
+```markdown
+{doc.content[:doc_limit]}
+```
+
+{notes}""".rstrip())
+
+    context = "\n\n".join(target.routing_context().strip() for target in targets)
+    schema = ",\n".join(f'    "{target.name}": {target.routing_schema()}' for target in targets)
+    return f"""You are a documentation architect. Decide where each generated doc below goes, for every target listed under it.
+
+{context}
+
+{chr(10).join(blocks)}
+
+**Output Format (JSON only, one entry per item id with a decision for each target the item lists):**
+{{
+  "1": {{
+{schema}
+  }}
+}}
+"""
+
+
+class PublishingEngine:
+    def __init__(self, targets: List, provenance: ProvenanceIndex = None, router: DocsRouter = None,
+                 model: str = MODEL):
+        self.targets = targets
+        self.provenance = provenance or ProvenanceIndex()
+        self.router = router or DocsRouter.from_file()
+        self.model = model
+        # LLM round trips made for routing, and routes served without one
+        self.stats = {'llm_calls': 0, 'retries': 0, 'rule_routes': 0, 'known_routes': 0, 'fallbacks': 0}
+
+    def route(self, doc: Doc) -> Dict[str, object]:
+        """target name -> routes for this doc"""
+        return self.route_batch([doc])[0]
+
+    def route_batch(self, docs: List[Doc]) -> List[Dict[str, object]]:
+        """target name -> routes for each doc, with one LLM call for all of them plus retries"""
+        routes = [{} for _ in docs]
+        pending = [] # (doc index, targets still to decide)
+        for i, doc in enumerate(docs):
+            targets = self._route_locally(doc, routes[i])
+            if targets:
+                pending.append((i, targets))
+        if not pending:
+            return routes
+
+        failed = pending
+        if self.router.strategy['llm_fallback']:
+            failed, answered = self._decide(docs, pending, routes)
+            if failed and answered and len(pending) > 1:
+                # Retry only what failed, one doc per call, so one bad item can't sink the rest.
+                # (No answer at all means the client already gave up retrying; don't repeat that per doc.)
+                retry, failed = failed, []
+                for item in retry:
+                    self.stats['retries'] += 1
+                    failed.extend(self._decide(docs, [item], routes)[0])
+
+        for i, targets in failed:
+            doc = docs[i]
+            for target in targets:
+                ruled = target.rule_route(doc, doc.rule) if doc.rule else None
+                routes[i][target.name] = ruled if ruled is not None else target.fallback_route(doc)
+                self.stats['fallbacks'] += 1
+        return routes
+
+    def _route_locally(self, doc: Doc, routes: Dict[str, object]) -> List:
+        """Fill in rule and known routes; returns the targets left for the LLM"""
+        pending = []
+        for target in self.targets:
+            if doc.rule and self.router.strategy['prefer_rules']:
+                ruled = target.rule_route(doc, doc.rule)
+                if ruled is not None:
+                    routes[target.name] = ruled
+                    self.stats['rule_routes'] += 1
+                    continue
+            known = target.known_route(doc)
+            if known is not None:
+                routes[target.name] = known
+                self.stats['known_routes'] += 1
+            else:
+                pending.append(target)
+        return pending
+
+    def _decide(self, docs: List[Doc], items: List[Tuple[int, List]],
+                routes: List[Dict[str, object]]) -> Tuple[List[Tuple[int, List]], bool]:
+        """
+        Ask once for every item and validate each answer.
+
+        Returns the (item, targets) that failed and whether the LLM answered at all.
+        """
+        answer = self._ask([(docs[i], targets) for i, targets in items])
+        if isinstance(answer, dict) and len(items) == 1 and '1' not in answer:
+            answer = {'1': answer} # a single item answered without its id
+
+        failed = []
+        for n, (i, targets) in enumerate(items, 1):
+            item_answer = answer.get(str(n)) if isinstance(answer, dict) else None
+            bad = []
+            for target in targets:
+                try:
+                    if not isinstance(item_answer, dict) or target.name not in item_answer:
+                        raise ValueError(f"no '{target.name}' decision")
+                    routes[i][target.name] = target.parse_route(docs[i], item_answer[target.name])
+                except (ValueError, TypeError, KeyError, AttributeError) as e:
+                    print(f"  ⚠️  Invalid {target.name} routing for {docs[i].source} ({e})")
+                    bad.append(target)
+            if bad:
+                failed.append((i, bad))
+        return failed, isinstance(answer, dict)
+
+    def _ask(self, items: List[Tuple[Doc, List]]) -> Optional[Dict]:
+        if len(items) == 1:
+            doc, targets = items[0]
+            print(f"  🤔 Routing {doc.source} for {', '.join(t.name for t in targets)}...")
+        else:
+            print(f"  🤔 Routing {len(items)} docs in one call...")
+        self.stats['llm_calls'] += 1
+        result = get_client().call_chat(
+            model=self.model,
+            messages=[
+                {'role': 'system', 'content': 'You are a documentation architect. Return ONLY valid JSON.'},
+                {'role': 'user', 'content': routing_prompt(items)}
+            ],
+            temperature=0.2,
+            max_tokens=16000,  # High limit - never truncate JSON
+            response_format='json',
+            timeout=60 + 15 * (len(items) - 1),
+            use_cache=True
+        )
+        if not result:
+            return None
+        try:
+            return json.loads(result)
+        except ValueError:
+            return None
+
+    def publish(self, doc_files: List[str]) -> Dict[str, List[Dict]]:
+        """Route and write every doc; returns target name -> change records"""
+        changes = {target.name: [] for target in self.targets}
+
+        docs = []
+        for doc_file in doc_files:
+            doc = load_doc(doc_file, self.provenance)
+            if doc is None:
+                continue
+            # One pass over all routing globs serves every target
+            doc.rule = self.router.match(doc.source)
+            if doc.rule:
+                print(f"  📐 Routing rule {doc.rule['glob']} matches {doc.source}")
+            docs.append(doc)
+
+        for start in range(0, len(docs), ROUTING_BATCH_SIZE):
+            batch = docs[start:start + ROUTING_BATCH_SIZE]
+            print(f"\n🧭 Routing docs {start + 1}-{start + len(batch)} of {len(docs)}")
+            for doc, routes in zip(batch, self.route_batch(batch)):
+                print(f"\n📄 Publishing: {doc.path}")
+                for target in self.targets:
+                    changes[target.name].extend(target.publish(doc, routes[target.name]))
+
+        for target in self.targets:
+            target.finish(changes[target.name])
+
+        calls = self.stats['llm_calls']
+        print(f"\n✓ {len(docs)} docs routed with {calls} LLM call(s), {self.stats['retries']} of them retries "
+              f"({self.stats['rule_routes']} rule routes, "
+              f"{self.stats['known_routes']} known routes, {self.stats['fallbacks']} fallbacks)")
+        print(f"✓ Routing rules: {self.router.report()}")
+        return changes
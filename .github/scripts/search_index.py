@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Search Index Builder
+Prebuilt, sharded inverted index for client-side docs search (no server needed)
+
+Layout written under search/:
+  meta.json          - doc count, shard list, block size
+  t/<prefix>.json    - {term: postings} for terms sharing a 2-char prefix
+  d/<block>.json     - [[url, title, summary], ...] for DOC_BLOCK consecutive doc ids
+
+Postings are flat integer lists [doc_delta, tf, doc_delta, tf, ...] where each
+doc id is stored as the difference from the previous one. The client fetches
+meta.json, then only the term shards and doc blocks a query actually needs.
+"""
+
+import re
+import json
+from typing import Dict, List, Tuple
+
+INDEX_VERSION = 1
+PREFIX_LEN = 2
+DOC_BLOCK = 500
+TITLE_WEIGHT = 5
+SUMMARY_LENGTH = 160
+
+STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'if', 'in',
+    'into', 'is', 'it', 'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was',
+    'will', 'with', 'you', 'your', 'we', 'can', 'not', 'all', 'any',
+}
+
+# Light suffix stripping; mirrored exactly by SEARCH_SCRIPT so queries stem the same way
+SUFFIXES = [
+    ('ational', 'ate'), ('ization', 'ize'), ('fulness', 'ful'), ('iveness', 'ive'),
+    ('ements', ''), ('ement', ''), ('ments', ''), ('ment', ''), ('ness', ''),
+    ('ings', ''), ('ing', ''), ('ies', 'y'), ('ied', 'y'), ('ers', ''), ('er', ''),
+    ('ed', ''), ('ly', ''), ('es', ''), ('s', ''),
+]
+MIN_STEM = 3
+
+
+def stem(word: str) -> str:
+    for suffix, replacement in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+            return word[:-len(suffix)] + replacement
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Split camelCase and snake_case, lowercase, drop stop words, stem"""
+    text = re.sub(r'([a-z0-9])([A-Z])', r'\1 \2', text).lower()
+    return [stem(w) for w in re.findall(r'[a-z0-9]+', text) if len(w) > 1 and w not in STOP_WORDS]
+
+
+def plain_text(markdown_text: str) -> str:
+    """Rough markdown -> text for summaries (drops fences, links, markup)"""
+    text = re.sub(r'```.*?```', ' ', markdown_text, flags=re.S)
+    text = re.sub(r'!?\[([^\]]*)\]\([^)]*\)', r'\1', text)
+    text = re.sub(r'[#>*_`|\-]+', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def encode_postings(postings: List[Tuple[int, int]]) -> List[int]:
+    """[(doc_id, tf), ...] sorted by doc_id -> delta-encoded flat list"""
+    encoded = []
+    previous = 0
+    for doc_id, tf in postings:
+        encoded.append(doc_id - previous)
+        encoded.append(tf)
+        previous = doc_id
+    return encoded
+
+
+def decode_postings(encoded: List[int]) -> List[Tuple[int, int]]:
+    postings = []
+    doc_id = 0
+    for i in range(0, len(encoded), 2):
+        doc_id += encoded[i]
+        postings.append((doc_id, encoded[i + 1]))
+    return postings
+
+
+class SearchIndexBuilder:
+    def __init__(self):
+        self.docs = [] # (url, title, summary)
+        self.postings = {} # term -> [(doc_id, tf)], doc ids ascending
+
+    def add(self, url: str, title: str, markdown_text: str):
+        doc_id = len(self.docs)
+        text = plain_text(markdown_text)
+        self.docs.append((url, title, text[:SUMMARY_LENGTH]))
+
+        counts = {}
+        for term in tokenize(text):
+            counts[term] = counts.get(term, 0) + 1
+        for term in tokenize(title):
+            counts[term] = counts.get(term, 0) + TITLE_WEIGHT
+
+        for term, tf in counts.items():
+            self.postings.setdefault(term, []).append((doc_id, tf))
+
+    def build(self) -> Dict[str, str]:
+        """Return {relative path under search/: file content}"""
+        files = {}
+        shards = {}
+        for term in sorted(self.postings):
+            shards.setdefault(term[:PREFIX_LEN], {})[term] = encode_postings(self.postings[term])
+
+        for prefix, terms in shards.items():
+            files[f"t/{prefix}.json"] = json.dumps(terms, separators=(',', ':'))
+
+        for block in range(0, len(self.docs), DOC_BLOCK):
+            files[f"d/{block // DOC_BLOCK}.json"] = json.dumps(
+                [list(doc) for doc in self.docs[block:block + DOC_BLOCK]],
+                separators=(',', ':'), ensure_ascii=False
+            )
+
+        files['meta.json'] = json.dumps({
+            'version': INDEX_VERSION,
+            'docs': len(self.docs),
+            'block': DOC_BLOCK,
+            'prefix': PREFIX_LEN,
+            'shards': sorted(shards),
+        }, separators=(',', ':'))
+        return files
+
+
+SEARCH_SCRIPT = """
+(function () {
+    var input = document.getElementById('search-input');
+    var results = document.getElementById('search-results');
+    if (!input || !results) return;
+
+    var STOP = %(stop_words)s;
+    var SUFFIXES = %(suffixes)s;
+    var meta = null, shards = {}, blocks = {};
+
+    function get(url, cache, key) {
+        if (!cache[key]) cache[key] = fetch(url).then(function (r) { return r.ok ? r.json() : {}; });
+        return cache[key];
+    }
+
+    function stem(word) {
+        for (var i = 0; i < SUFFIXES.length; i++) {
+            var s = SUFFIXES[i][0];
+            if (word.length - s.length >= %(min_stem)d && word.slice(-s.length) === s) {
+                return word.slice(0, -s.length) + SUFFIXES[i][1];
+            }
+        }
+        return word;
+    }
+
+    function tokenize(text) {
+        var words = text.replace(/([a-z0-9])([A-Z])/g, '$1 $2').toLowerCase().match(/[a-z0-9]+/g) || [];
+        return words.filter(function (w) { return w.length > 1 && STOP.indexOf(w) === -1; }).map(stem);
+    }
+
+    function decode(encoded) {
+        var out = [], doc = 0;
+        for (var i = 0; i < encoded.length; i += 2) { doc += encoded[i]; out.push([doc, encoded[i + 1]]); }
+        return out;
+    }
+
+    function search(query) {
+        var terms = tokenize(query);
+        if (!terms.length) { results.innerHTML = ''; return; }
+
+        var metaReady = meta ? Promise.resolve(meta) : fetch('search/meta.json').then(function (r) { return r.json(); });
+        metaReady.then(function (m) {
+            meta = m;
+            return Promise.all(terms.map(function (t) {
+                var prefix = t.slice(0, m.prefix);
+                if (m.shards.indexOf(prefix) === -1) return Promise.resolve([]);
+                return get('search/t/' + prefix + '.json', shards, prefix).then(function (shard) {
+                    return decode(shard[t] || []);
+                });
+            }));
+        }).then(function (lists) {
+            // AND semantics with tf-idf scoring
+            var scores = null;
+            lists.forEach(function (postings) {
+                var idf = Math.log(1 + meta.docs / (postings.length || 1));
+                var next = {};
+                postings.forEach(function (p) {
+                    if (scores === null || p[0] in scores) next[p[0]] = (scores ? scores[p[0]] : 0) + p[1] * idf;
+                });
+                scores = next;
+            });
+            var ranked = Object.keys(scores || {}).map(Number)
+                .sort(function (a, b) { return scores[b] - scores[a] || a - b; }).slice(0, 20);
+            return Promise.all(ranked.map(function (id) {
+                var block = Math.floor(id / meta.block);
+                return get('search/d/' + block + '.json', blocks, block).then(function (docs) {
+                    return docs[id - block * meta.block];
+                });
+            }));
+        }).then(function (docs) {
+            results.innerHTML = '';
+            docs.forEach(function (doc) {
+                var li = document.createElement('li');
+                var a = document.createElement('a');
+                a.href = doc[0];
+                a.textContent = doc[1];
+                var p = document.createElement('p');
+                p.textContent = doc[2];
+                li.appendChild(a);
+                li.appendChild(p);
+                results.appendChild(li);
+            });
+            if (!docs.length) results.innerHTML = '<li class="empty">No results</li>';
+        });
+    }
+
+    var timer = null;
+    input.addEventListener('input', function () {
+        clearTimeout(timer);
+        timer = setTimeout(function () { search(input.value); }, 120);
+    });
+})();
+""" % {
+    'stop_words': json.dumps(sorted(STOP_WORDS)),
+    'suffixes': json.dumps([list(pair) for pair in SUFFIXES]),
+    'min_stem': MIN_STEM,
+}
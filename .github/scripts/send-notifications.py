@@ -2,20 +2,34 @@
 """
 Notification Service - Send updates to Discord/Slack
 Handles character limits and formats messages beautifully
+Notifications go through a persistent outbox that coalesces bursts into digests
+and retries failures (see outbox.py); sinks are posted to concurrently (notifier.py)
+
+Usage:
+  send-notifications.py           queue this push's notification and send what's due
+  send-notifications.py --flush   only send what's due (held digests, retries)
+  add --force to send held notifications now instead of waiting out the window
+
+Either way, commits since the outbox's head that were never queued (their run was
+cancelled while waiting for the outbox) are queued too, summarized from git. A
+commit whose own auto-docs run is still going is left for that run to queue with
+its full notification, and only summarized once the run has ended without doing so.
 """
 
 import os
 import sys
 import re
 import json
-import requests
+import argparse
+import subprocess
+import time
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Optional
 
-DISCORD_WEBHOOK = os.environ.get('DISCORD_WEBHOOK_URL')
-SLACK_WEBHOOK = os.environ.get('SLACK_WEBHOOK_URL')
-PUSHBULLET_TOKEN = os.environ.get('PUSHBULLET')
+sys.path.insert(0, str(Path(__file__).parent))
+from notifier import configured_sinks, report
+from outbox import Outbox
 
 # Discord limits
 DISCORD_CONTENT_LIMIT = 2000
@@ -23,6 +37,18 @@ DISCORD_EMBED_DESC_LIMIT = 4096
 DISCORD_EMBED_FIELD_LIMIT = 1024
 DISCORD_EMBED_TOTAL_LIMIT = 6000
 
+# Commits listed in a digest before "... and N more"
+DIGEST_LIMIT = 15
+
+# Most commits queued at once when catching up on runs that never queued their own
+CATCH_UP_LIMIT = 20
+
+# The workflow whose notify job queues a push's full notification
+AUTO_DOCS_WORKFLOW = 'auto-docs.yml'
+# Without the run status (no gh), a commit's run is assumed over this long after the
+# commit: the auto-document job's 60 minute timeout plus the notify job
+SETTLE_AFTER = 2 * 3600  # seconds
+
 class NotificationService:
     def __init__(self):
         self.repo = os.environ.get('GITHUB_REPOSITORY', 'Unknown Repo')
@@ -148,17 +174,13 @@ class NotificationService:
             "inline": False
         })
     
-    def send_discord(self, 
-                     changed_files: List[str], 
-                     breaking_changes: List[Dict],
-                     changelog_entries: List[Dict],
-                     wiki_pages: List[str],
-                     analysis_summary: Optional[Dict] = None) -> bool:
-        """Send formatted notification to Discord"""
-        if not DISCORD_WEBHOOK:
-            print("⚠️  No Discord webhook URL configured")
-            return False
-        
+    def discord_payload(self, 
+                        changed_files: List[str], 
+                        breaking_changes: List[Dict],
+                        changelog_entries: List[Dict],
+                        wiki_pages: List[str],
+                        analysis_summary: Optional[Dict] = None) -> Dict:
+        """Formatted Discord webhook payload"""
         # Build embed
         emoji = self._get_commit_emoji(breaking_changes)
         embed = self._build_discord_embed_base(emoji)
@@ -176,38 +198,19 @@ class NotificationService:
             "inline": False
         })
         
-        # Build and send payload
-        payload = {
+        return {
             "username": "CI/CD Bot",
             "avatar_url": "https://github.githubassets.com/images/modules/logos_page/GitHub-Mark.png",
             "embeds": [embed]
         }
-        
-        try:
-            response = requests.post(DISCORD_WEBHOOK, json=payload, timeout=10)
-            
-            if response.status_code == 204:
-                print("✓ Discord notification sent successfully")
-                return True
-            else:
-                print(f"⚠️  Discord notification failed: {response.status_code}")
-                print(f"Response: {response.text}")
-                return False
-        except Exception as e:
-            print(f"❌ Error sending Discord notification: {e}")
-            return False
-    
-    def send_slack(self,
-                   changed_files: List[str],
-                   breaking_changes: List[Dict],
-                   changelog_entries: List[Dict],
-                   wiki_pages: List[str],
-                   analysis_summary: Optional[Dict] = None) -> bool:
-        """Send formatted notification to Slack"""
-        if not SLACK_WEBHOOK:
-            print("⚠️  No Slack webhook URL configured")
-            return False
-        
+    
+    def slack_payload(self,
+                      changed_files: List[str],
+                      breaking_changes: List[Dict],
+                      changelog_entries: List[Dict],
+                      wiki_pages: List[str],
+                      analysis_summary: Optional[Dict] = None) -> Dict:
+        """Formatted Slack webhook payload"""
         emoji = self._get_commit_emoji(breaking_changes)
         commit_title = self.commit_message.split('\n')[0][:100]
         
@@ -216,20 +219,7 @@ class NotificationService:
             wiki_pages, analysis_summary
         )
         
-        payload = {"blocks": blocks}
-        
-        try:
-            response = requests.post(SLACK_WEBHOOK, json=payload, timeout=10)
-            
-            if response.status_code == 200:
-                print("✓ Slack notification sent successfully")
-                return True
-            else:
-                print(f"⚠️  Slack notification failed: {response.status_code}")
-                return False
-        except Exception as e:
-            print(f"❌ Error sending Slack notification: {e}")
-            return False
+        return {"blocks": blocks}
     
     def _build_slack_blocks(self, emoji: str, commit_title: str, 
                            breaking_changes: List[Dict], changed_files: List[str],
@@ -297,17 +287,13 @@ class NotificationService:
         
         return blocks
     
-    def send_pushbullet(self,
-                        changed_files: List[str],
-                        breaking_changes: List[Dict],
-                        changelog_entries: List[Dict],
-                        wiki_pages: List[str],
-                        analysis_summary: Optional[Dict] = None) -> bool:
-        """Send push notification via Pushbullet"""
-        if not PUSHBULLET_TOKEN:
-            print("⚠️  No Pushbullet token configured")
-            return False
-        
+    def pushbullet_payload(self,
+                           changed_files: List[str],
+                           breaking_changes: List[Dict],
+                           changelog_entries: List[Dict],
+                           wiki_pages: List[str],
+                           analysis_summary: Optional[Dict] = None) -> Dict:
+        """Pushbullet link push (the token goes in the sink's headers)"""
         # Generate dynamic title
         commit_title = self.commit_message.split('\n')[0][:100]
         
@@ -351,39 +337,202 @@ class NotificationService:
         
         body = '\n'.join(body_parts)
         
-        # Pushbullet API
-        url = "https://api.pushbullet.com/v2/pushes"
-        headers = {
-            "Access-Token": PUSHBULLET_TOKEN,
-            "Content-Type": "application/json"
-        }
-        
         # Create link push for better interaction
-        payload = {
+        return {
             "type": "link",
             "title": f"{emoji} {commit_title}",
             "body": body,
             "url": self.run_url
         }
+    
+    def payloads(self, sinks: Dict, data: Dict) -> Dict[str, Dict]:
+        """sink key -> payload, for every configured sink"""
+        builders = {
+            'discord': self.discord_payload,
+            'slack': self.slack_payload,
+            'pushbullet': self.pushbullet_payload,
+        }
+        return {
+            key: builders[key](data['changed_files'], data['breaking_changes'], data['changelog_entries'],
+                               data['wiki_pages'], data.get('analysis_summary'))
+            for key in sinks if key in builders
+        }
+    
+    def event(self, data: Dict) -> Dict:
+        """This push, summarized for a digest"""
+        return {
+            'id': os.environ.get('GITHUB_SHA', self.commit_sha),
+            'sha': self.commit_sha,
+            'title': self.commit_message.split('\n')[0][:100],
+            'actor': self.actor,
+            'url': self.run_url,
+            'files': len(data['changed_files']),
+            'breaking': len(data['breaking_changes']),
+            'wiki_pages': len(data['wiki_pages']),
+        }
+    
+    def commit_event(self, sha: str) -> Dict:
+        """A commit without workflow data of its own, summarized from git"""
+        short, author, message = ((git('show', '-s', '--format=%h%n%an%n%B', sha) or '').split('\n', 2) + ['', ''])[:3]
+        files = git('diff-tree', '--no-commit-id', '--name-only', '-r', '--root', sha) or ''
+        return {
+            'id': sha,
+            'sha': short or sha[:7],
+            'title': self._clean_commit_message(message).split('\n')[0][:100],
+            'actor': author or 'Unknown',
+            'url': f"https://github.com/{self.repo}/commit/{sha}",
+            'files': len(files.split()),
+            'breaking': 0,
+            'wiki_pages': 0,
+        }
+    
+    def digest_payload(self, sink_key: str, events: List[Dict]) -> Dict:
+        """One message for several queued pushes"""
+        shown = events[-DIGEST_LIMIT:]
+        more = len(events) - len(shown)
+        title = f"📦 {len(events)} pushes to {self.repo.split('/')[-1]}"
+        files = sum(e.get('files', 0) for e in events)
+        breaking = sum(e.get('breaking', 0) for e in events)
+        latest_url = events[-1].get('url', self.run_url)
+        
+        if sink_key == 'discord':
+            lines = [f"`{e['sha']}` {e['title']} — {e['actor']}" for e in shown]
+            if more:
+                lines.insert(0, f"... and {more} earlier")
+            embed = {
+                "title": title,
+                "description": self.truncate("\n".join(lines), DISCORD_EMBED_DESC_LIMIT),
+                "color": 0xFF6B35 if breaking else 0x4CAF50,
+                "timestamp": datetime.utcnow().isoformat(),
+                "fields": [{"name": f"📄 Files Changed ({files})", "value": f"across {len(events)} pushes", "inline": True}]
+            }
+            if breaking:
+                embed["fields"].append({"name": "🚨 Breaking Changes", "value": f"{breaking} detected", "inline": True})
+            embed["fields"].append({
+                "name": "🔗 Links",
+                "value": f"[Latest Workflow Run]({latest_url}) • [View Wiki](https://github.com/{self.repo}/wiki)",
+                "inline": False
+            })
+            return {
+                "username": "CI/CD Bot",
+                "avatar_url": "https://github.githubassets.com/images/modules/logos_page/GitHub-Mark.png",
+                "embeds": [embed]
+            }
         
+        if sink_key == 'slack':
+            lines = [f"`{e['sha']}` {e['title']} ({e['actor']})" for e in shown]
+            if more:
+                lines.insert(0, f"... and {more} earlier")
+            summary = f"*Files:* {files}" + (f" | ⚠️ {breaking} breaking change(s)" if breaking else "")
+            return {"blocks": [
+                {"type": "header", "text": {"type": "plain_text", "text": title}},
+                {"type": "section", "text": {"type": "mrkdwn", "text": "\n".join(lines)[:3000]}},
+                {"type": "context", "elements": [{"type": "mrkdwn", "text": summary}]},
+                {"type": "actions", "elements": [
+                    {"type": "button", "text": {"type": "plain_text", "text": "Latest Workflow"}, "url": latest_url}
+                ]}
+            ]}
+        
+        body = "\n".join(f"{e['sha']} {e['title']}" for e in shown)
+        if breaking:
+            body += f"\n\n⚠️ {breaking} BREAKING CHANGE(S)"
+        return {"type": "link", "title": title, "body": body, "url": latest_url}
+
+
+def command(*args) -> Optional[str]:
+    """Output of a command, or None if it failed"""
+    try:
+        result = subprocess.run(list(args), capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def git(*args) -> Optional[str]:
+    return command('git', *args)
+
+
+def run_in_flight(sha: str) -> bool:
+    """
+    Whether the auto-docs run for `sha` may still queue its own notification. Asks the
+    Actions API through gh; without it, a run is assumed going until SETTLE_AFTER.
+    """
+    runs = command('gh', 'run', 'list', '--commit', sha, '--workflow', AUTO_DOCS_WORKFLOW, '--json', 'status')
+    if runs is not None:
         try:
-            response = requests.post(
-                url,
-                headers=headers,
-                json=payload,
-                timeout=10
-            )
-            
-            if response.status_code in [200, 201]:
-                print("✓ Pushbullet notification sent successfully")
-                return True
-            else:
-                print(f"⚠️  Pushbullet notification failed: {response.status_code}")
-                print(f"Response: {response.text}")
-                return False
-        except Exception as e:
-            print(f"❌ Error sending Pushbullet notification: {e}")
-            return False
+            return any(run.get('status') != 'completed' for run in json.loads(runs or '[]'))
+        except ValueError:
+            pass
+    committed = git('show', '-s', '--format=%ct', sha)
+    return committed is not None and time.time() - int(committed) < SETTLE_AFTER
+
+
+def commits_since(since: Optional[str]) -> Optional[List[str]]:
+    """
+    Commits after `since` up to HEAD, oldest first: at most CATCH_UP_LIMIT, without
+    the bot's [skip ci] commits. None if `since` isn't in this history.
+    """
+    if not since or git('cat-file', '-e', f"{since}^{{commit}}") is None:
+        return None
+    commits = git('rev-list', '--reverse', f"--max-count={CATCH_UP_LIMIT}",
+                  '--fixed-strings', '--invert-grep', '--grep=[skip ci]', f"{since}..HEAD")
+    return commits.split() if commits is not None else None
+
+
+def queue_new_commits(outbox: Outbox, sinks: Dict, service: NotificationService,
+                      current: Optional[Dict] = None, in_flight=run_in_flight) -> int:
+    """
+    Queue the commits after the outbox's head up to HEAD, and return how many were queued.
+    `current` is HEAD's own notification ({'event', 'payloads'}) when this run has
+    its workflow data; other commits are summarized from git, unless in_flight(sha)
+    says their own run may still queue them: those are deferred until it has.
+    """
+    def queue(event, payloads):
+        for key in sinks:
+            outbox.enqueue(key, payloads.get(key), event)
+    
+    head = git('rev-parse', 'HEAD')
+    commits = commits_since(outbox.head)
+    if head is None:
+        commits = []
+    elif commits is None:
+        # First run, or history was rewritten: start from this push
+        commits = [head] if current else []
+    current_id = current['event']['id'] if current else None
+    queued = 0
+    
+    if current and current_id not in commits:
+        # A later run got the outbox first: a deferred commit is queued now, one
+        # summarized from git gets the full message if it's still waiting, but one
+        # already sent is never sent twice
+        if outbox.undefer(current_id):
+            queue(current['event'], current['payloads'])
+            queued += 1
+        elif any(item['event'].get('id') == current_id for key in sinks for item in outbox.queued(key)):
+            queue(current['event'], current['payloads'])
+    
+    # Deferred commits whose run ended without queuing them (cancelled, or failed early)
+    for sha in list(outbox.deferred):
+        if git('cat-file', '-e', f"{sha}^{{commit}}") is None:
+            outbox.undefer(sha)  # no longer in this history
+        elif not in_flight(sha):
+            outbox.undefer(sha)
+            queue(service.commit_event(sha), {})
+            queued += 1
+    
+    for sha in commits:
+        if sha == current_id:
+            queue(current['event'], current['payloads'])
+        elif in_flight(sha):
+            outbox.defer(sha)
+            continue
+        else:
+            queue(service.commit_event(sha), {})
+        queued += 1
+    
+    if head and (commits or outbox.head is None):
+        outbox.advance(head)
+    return queued
 
 
 def load_workflow_data():
@@ -476,22 +625,48 @@ def load_workflow_data():
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Send push notifications through the notification outbox")
+    parser.add_argument('--flush', action='store_true', help="Only send what's already queued")
+    parser.add_argument('--force', action='store_true', help="Send held notifications now, ignoring the coalescing window")
+    args = parser.parse_args()
+    
     print("="*80)
     print("NOTIFICATION SERVICE")
     print("="*80)
     
+    sinks = configured_sinks()
+    if not sinks:
+        print("ℹ️  No webhooks configured")
+        return
+    
+    outbox = Outbox()
+    if args.flush:
+        caught_up = queue_new_commits(outbox, sinks, NotificationService())
+        if caught_up:
+            print(f"📥 Queued {caught_up} commit(s) that were never notified")
+        if outbox.deferred:
+            print(f"⏳ {len(outbox.deferred)} commit(s) left for their own run to notify")
+    else:
+        queue_push_notification(outbox, sinks)
+    
+    # Send what's due
+    deliveries = outbox.flush(sinks, NotificationService().digest_payload, force=args.force)
+    outbox.save()
+    
+    # Summary
+    print("\n" + "="*80)
+    print("NOTIFICATION SUMMARY")
+    print("="*80)
+    report(deliveries)
+    print(f"📬 {len(outbox.pending)} notification(s) still queued")
+
+
+def queue_push_notification(outbox: Outbox, sinks: Dict):
+    """Build this push's notification from the workflow artifacts and queue it per sink"""
     # Get commit message from git
-    try:
-        import subprocess
-        result = subprocess.run(
-            ['git', 'log', '-1', '--pretty=%B'],
-            capture_output=True,
-            text=True
-        )
-        if result.returncode == 0:
-            os.environ['COMMIT_MESSAGE'] = result.stdout.strip()
-    except:
-        pass
+    message = git('log', '-1', '--pretty=%B')
+    if message is not None:
+        os.environ['COMMIT_MESSAGE'] = message
     
     # Load workflow data
     data = load_workflow_data()
@@ -512,52 +687,10 @@ def main():
         print(f"   Security Issues: {summary['total_vulnerabilities']}")
         print(f"   Performance Issues: {summary['total_performance_issues']}")
     
-    # Send notifications
-    results = []
-    
-    if DISCORD_WEBHOOK:
-        print("\n📢 Sending Discord notification...")
-        success = service.send_discord(
-            data['changed_files'],
-            data['breaking_changes'],
-            data['changelog_entries'],
-            data['wiki_pages'],
-            data.get('analysis_summary')
-        )
-        results.append(('Discord', success))
-    
-    if SLACK_WEBHOOK:
-        print("\n📢 Sending Slack notification...")
-        success = service.send_slack(
-            data['changed_files'],
-            data['breaking_changes'],
-            data['changelog_entries'],
-            data['wiki_pages'],
-            data.get('analysis_summary')
-        )
-        results.append(('Slack', success))
-    
-    if PUSHBULLET_TOKEN:
-        print("\n📢 Sending Pushbullet notification...")
-        success = service.send_pushbullet(
-            data['changed_files'],
-            data['breaking_changes'],
-            data['changelog_entries'],
-            data['wiki_pages'],
-            data.get('analysis_summary')
-        )
-        results.append(('Pushbullet', success))
-    
-    # Summary
-    print("\n" + "="*80)
-    print("NOTIFICATION SUMMARY")
-    print("="*80)
-    for platform, success in results:
-        status = "✓" if success else "❌"
-        print(f"{status} {platform}: {'Sent' if success else 'Failed'}")
-    
-    if not results:
-        print("ℹ️  No webhooks configured")
+    # Queue for every configured sink, with any commits whose runs never got here
+    current = {'event': service.event(data), 'payloads': service.payloads(sinks, data)}
+    queued = queue_new_commits(outbox, sinks, service, current)
+    print(f"\n📥 Queued {queued} commit(s) for {', '.join(sink.name for sink in sinks.values())}")
 
 
 if __name__ == '__main__':
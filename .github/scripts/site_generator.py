@@ -4,15 +4,87 @@ Static Site Generator for Documentation
 """
 
 import os
+import re
 import sys
+import json
+import html
 import shutil
+import gzip
+import string
+import time
+import hashlib
 import markdown
+from html.parser import HTMLParser
+from markdown.extensions import Extension
+from markdown.preprocessors import Preprocessor
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+from search_index import SearchIndexBuilder, SEARCH_SCRIPT
+
+try:
+    from pygments.formatters import HtmlFormatter
+except ImportError:
+    HtmlFormatter = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 DOCS_DIR = Path('docs')
 SITE_DIR = Path('docs-site')
 
+# Build manifest lives next to the output so incremental state travels with the site
+MANIFEST_NAME = '.build-manifest.json'
+MANIFEST_VERSION = 1
+
+MARKDOWN_EXTENSIONS = ['fenced_code', 'tables', 'codehilite']
+MARKDOWN_EXTENSION_CONFIGS = {
+    # Highlight at build time with Pygments; no client-side highlighter needed
+    'codehilite': {'css_class': 'highlight', 'guess_lang': False},
+}
+PYGMENTS_STYLE = 'github-dark'
+
+# Fingerprinted static files live here; names change whenever content does,
+# so they can be cached forever
+ASSETS_DIR = 'assets'
+
+# Third-party assets are committed in VENDOR_DIR and copied into the site; builds
+# never download them. The CDN URL (same version) is only linked if a file is missing
+VENDOR_DIR = Path(__file__).parent.parent / 'vendor'
+VENDOR_ASSETS = {
+    'mermaid.min.js': 'https://cdn.jsdelivr.net/npm/mermaid@11.12.0/dist/mermaid.min.js',
+}
+
+HEADERS_FILE = """/assets/*
+  Cache-Control: public, max-age=31536000, immutable
+/search/*
+  Cache-Control: public, max-age=300
+/*.html
+  Cache-Control: public, max-age=0, must-revalidate
+"""
+
+# Below this many dirty pages a process pool costs more than it saves
+PARALLEL_THRESHOLD = 32
+
+# Above this many pages the sidebar is loaded lazily from nav JSON instead of
+# being inlined into every page (which makes total output size O(N^2))
+NAV_INLINE_LIMIT = 500
+
+# Precompressed .gz/.br siblings are written for these once they're big enough to benefit
+COMPRESS_EXTENSIONS = {'.html', '.css', '.js', '.json', '.svg'}
+MIN_COMPRESS_SIZE = 512
+SIZE_REPORT_NAME = '.size-report.json'
+
+# Pages whose rendered body exceeds SPLIT_PAGE_SIZE are split at <h2> boundaries
+# into sub-pages of roughly SPLIT_PART_SIZE, each with a table of contents
+SPLIT_PAGE_SIZE = 256 * 1024
+SPLIT_PART_SIZE = 96 * 1024
+
 HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="en">
@@ -20,14 +92,8 @@ HTML_TEMPLATE = """
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>{title} - CI/CD Docs</title>
-    <link rel="stylesheet" href="styles.css">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.7.0/styles/github-dark.min.css">
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.7.0/highlight.min.js"></script>
-    <script src="https://cdn.jsdelivr.net/npm/mermaid/dist/mermaid.min.js"></script>
-    <script>
-        hljs.highlightAll();
-        mermaid.initialize({ startOnLoad: true, theme: 'dark' });
-    </script>
+    <link rel="stylesheet" href="{styles_href}">
+    {diagram_script}
 </head>
 <body class="dark-mode">
     <div class="app-container">
@@ -35,12 +101,18 @@ HTML_TEMPLATE = """
             <div class="logo">
                 <h2>📚 Docs</h2>
             </div>
-            <nav>
-                <ul>
+            <div class="search">
+                <input id="search-input" type="search" placeholder="Search docs..." autocomplete="off">
+                <ul id="search-results"></ul>
+            </div>
+            <nav data-page="{page}" data-group="{nav_group}">
+                <ul id="nav-list">
                     <li><a href="index.html" class="{active_index}">Home</a></li>
                     {nav_links}
                 </ul>
             </nav>
+            {nav_script}
+            <script src="{search_src}" defer></script>
         </aside>
         <main class="content">
             <header>
@@ -146,6 +218,29 @@ header {
 .markdown-body th, .markdown-body td { border: 1px solid var(--border); padding: 6px 13px; }
 .markdown-body tr:nth-child(2n) { background-color: #161b22; }
 
+/* Search */
+.search input {
+    width: 100%;
+    box-sizing: border-box;
+    padding: 0.5rem;
+    border-radius: 6px;
+    border: 1px solid var(--border);
+    background-color: var(--bg-primary);
+    color: var(--text-primary);
+}
+
+#search-results {
+    list-style: none;
+    padding: 0;
+    margin: 0.5rem 0 1rem;
+}
+
+#search-results p {
+    margin: 0 0.5rem 0.5rem;
+    font-size: 0.8rem;
+    color: var(--text-secondary);
+}
+
 /* Mermaid */
 .mermaid {
     background-color: #161b22;
@@ -153,90 +248,844 @@ header {
     border-radius: 6px;
     display: flex;
     justify-content: center;
+    min-height: 4rem;
+}
+
+/* Split pages */
+.page-toc {
+    background-color: var(--bg-secondary);
+    border: 1px solid var(--border);
+    border-radius: 6px;
+    padding: 0.5rem 1rem;
+    margin-bottom: 2rem;
+}
+
+.page-toc ol {
+    margin: 0;
+}
+
+.page-toc .current > a {
+    color: var(--text-primary);
+    font-weight: 600;
+}
+
+.pager {
+    display: flex;
+    justify-content: space-between;
+    border-top: 1px solid var(--border);
+    margin-top: 2rem;
+    padding-top: 1rem;
 }
 """
 
-def build_site():
-    if not DOCS_DIR.exists():
+# Loads mermaid on demand and renders each diagram as it scrolls into view,
+# so pages without diagrams never fetch it and long pages don't render them all up front
+DIAGRAM_SCRIPT = """
+(function () {
+    var nodes = Array.prototype.slice.call(document.querySelectorAll('pre.mermaid'));
+    var script = document.currentScript;
+    if (!nodes.length || !script) return;
+    var loading = null;
+
+    function load() {
+        if (!loading) loading = new Promise(function (resolve, reject) {
+            var s = document.createElement('script');
+            s.src = script.getAttribute('data-mermaid');
+            s.onload = function () {
+                window.mermaid.initialize({ startOnLoad: false, theme: 'dark' });
+                resolve(window.mermaid);
+            };
+            s.onerror = reject;
+            document.head.appendChild(s);
+        });
+        return loading;
+    }
+
+    function render(node) {
+        load().then(function (mermaid) { return mermaid.run({ nodes: [node] }); });
+    }
+
+    if (!('IntersectionObserver' in window)) { nodes.forEach(render); return; }
+    var observer = new IntersectionObserver(function (entries) {
+        entries.forEach(function (entry) {
+            if (!entry.isIntersecting) return;
+            observer.unobserve(entry.target);
+            render(entry.target);
+        });
+    }, { rootMargin: '200px 0px' });
+    nodes.forEach(function (node) { observer.observe(node); });
+})();
+"""
+
+NAV_SCRIPT = """
+(function () {
+    var nav = document.querySelector('nav[data-page]');
+    var list = document.getElementById('nav-list');
+    if (!nav || !list) return;
+    var page = nav.getAttribute('data-page');
+    var currentGroup = nav.getAttribute('data-group');
+
+    function link(name) {
+        var li = document.createElement('li');
+        var a = document.createElement('a');
+        a.href = name + '.html';
+        a.textContent = name;
+        if (name === page) a.className = 'active';
+        li.appendChild(a);
+        return li;
+    }
+
+    fetch('nav.json').then(function (r) { return r.json(); }).then(function (tree) {
+        tree.groups.forEach(function (group) {
+            var li = document.createElement('li');
+            var details = document.createElement('details');
+            var summary = document.createElement('summary');
+            var ul = document.createElement('ul');
+            summary.textContent = group.name + ' (' + group.count + ')';
+            details.appendChild(summary);
+            details.appendChild(ul);
+            li.appendChild(details);
+            list.appendChild(li);
+
+            var loaded = false;
+            details.addEventListener('toggle', function () {
+                if (!details.open || loaded) return;
+                loaded = true;
+                fetch(group.src).then(function (r) { return r.json(); }).then(function (pages) {
+                    pages.forEach(function (name) { ul.appendChild(link(name)); });
+                });
+            });
+            if (group.name === currentGroup) details.open = true;
+        });
+    });
+})();
+"""
+
+
+class CompiledTemplate:
+    """
+    str.format-style template parsed once into literal/field parts.
+    Rendering is a single join instead of re-parsing the template per page.
+    """
+
+    def __init__(self, template: str):
+        self.parts = [
+            (literal, field)
+            for literal, field, _, _ in string.Formatter().parse(template)
+        ]
+        self.fields = {field for _, field in self.parts if field is not None}
+
+    def render(self, **values) -> str:
+        out = []
+        for literal, field in self.parts:
+            out.append(literal)
+            if field is not None:
+                out.append(str(values[field]))
+        return ''.join(out)
+
+
+PAGE_TEMPLATE = CompiledTemplate(HTML_TEMPLATE)
+
+
+class Navigation:
+    """
+    Sidebar links rendered once per build. Each page gets the shared HTML with
+    only its own link spliced to the active state.
+    """
+
+    def __init__(self, names: List[str]):
+        self.names = list(names)
+        self.spans = {}
+        items = []
+        pos = 0
+        for name in self.names:
+            item = self._item(name, '')
+            self.spans[name] = (pos, pos + len(item))
+            items.append(item)
+            pos += len(item)
+        self.html = ''.join(items)
+
+    @staticmethod
+    def _item(name: str, css_class: str) -> str:
+        label = html.escape(name)
+        return f'<li><a href="{label}.html" class="{css_class}">{label}</a></li>'
+
+    def for_page(self, name: str) -> str:
+        span = self.spans.get(name)
+        if span is None:
+            return self.html
+        start, end = span
+        return self.html[:start] + self._item(name, 'active') + self.html[end:]
+
+
+def nav_group(name: str) -> str:
+    """Sidebar group for a page: its leading name segment (debug_api -> debug)"""
+    return re.split(r'[-_.]', name, maxsplit=1)[0].lower() or name
+
+
+def build_nav_tree(names: List[str]) -> Dict[str, List[str]]:
+    tree = {}
+    for name in names:
+        tree.setdefault(nav_group(name), []).append(name)
+    return dict(sorted(tree.items()))
+
+
+def nav_json_files(names: List[str]) -> Dict[str, str]:
+    """
+    Hierarchical nav for lazy loading: nav.json lists groups, and each group's
+    pages live in nav/<group>.json, fetched only when the group is expanded.
+    """
+    tree = build_nav_tree(names)
+    files = {}
+    groups = []
+    for group, pages in tree.items():
+        src = f"nav/{re.sub(r'[^a-z0-9]+', '-', group).strip('-') or 'misc'}.json"
+        files[src] = json.dumps(pages, separators=(',', ':'))
+        groups.append({'name': group, 'count': len(pages), 'src': src})
+    files['nav.json'] = json.dumps({'groups': groups}, separators=(',', ':'))
+    return files
+
+
+class MermaidPreprocessor(Preprocessor):
+    """Turn ```mermaid fences into raw <pre class="mermaid"> blocks before code highlighting sees them"""
+
+    FENCE = re.compile(r'^(?P<fence>`{3,}|~{3,})[ \t]*mermaid[ \t]*\n(?P<code>.*?)\n(?P=fence)[ \t]*$', re.M | re.S)
+
+    def run(self, lines):
+        text = '\n'.join(lines)
+
+        def replace(match):
+            placeholder = self.md.htmlStash.store(f'<pre class="mermaid">{html.escape(match.group("code"))}</pre>')
+            return f"\n\n{placeholder}\n\n"
+
+        return self.FENCE.sub(replace, text).split('\n')
+
+
+class MermaidExtension(Extension):
+    def extendMarkdown(self, md):
+        # Before fenced_code (25), after whitespace normalization (30)
+        md.preprocessors.register(MermaidPreprocessor(md), 'mermaid', 28)
+
+
+def file_hash(data) -> str:
+    """SHA256 of text or bytes"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def load_manifest(site_dir: Path) -> Dict:
+    """
+    Load the build manifest.
+
+    pages: source path -> {output, source_hash, output_hash, deps}
+    outputs: generated file -> hash, for files not tied to one source (css, index)
+    """
+    manifest_path = site_dir / MANIFEST_NAME
+    if manifest_path.exists():
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == MANIFEST_VERSION:
+                return manifest
+        except (OSError, ValueError):
+            print("Warning: build manifest unreadable, doing a full rebuild")
+    return {'version': MANIFEST_VERSION, 'template_hash': None, 'nav': [], 'pages': {}, 'outputs': {}}
+
+
+def save_manifest(site_dir: Path, manifest: Dict):
+    with open(site_dir / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def write_output(path: Path, content) -> str:
+    """Write a generated file (text or bytes) and return its hash"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(content)
+    return file_hash(content)
+
+
+_PRESERVE_TAGS = re.compile(r'<(pre|textarea|script|style)\b.*?</\1\s*>', re.S | re.I)
+_HTML_COMMENT = re.compile(r'<!--(?!\[if).*?-->', re.S)
+# Whitespace before these tags never renders, so it can go entirely
+_BLOCK_GAP = re.compile(
+    r'\s+(?=<(?:\x00|!DOCTYPE|/?(?:html|head|body|meta|link|title|div|aside|main|header|footer|nav|article|section'
+    r'|ul|ol|li|p|h[1-6]|table|thead|tbody|tr|th|td|blockquote|hr|br)\b))', re.I
+)
+
+
+def minify_html(text: str) -> str:
+    """Collapse whitespace and drop comments, leaving <pre>/<script>/<style> bodies untouched"""
+    kept = []
+
+    def keep(match):
+        kept.append(match.group(0))
+        return f"<\x00{len(kept) - 1}>"
+
+    text = _PRESERVE_TAGS.sub(keep, text)
+    text = _HTML_COMMENT.sub('', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = _BLOCK_GAP.sub('', text).strip()
+    return re.sub(r'<\x00(\d+)>', lambda m: kept[int(m.group(1))], text)
+
+
+def minify_css(css: str) -> str:
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+
+def precompress(path: Path) -> Dict[str, int]:
+    """
+    Write .gz (and .br if brotli is installed) next to a generated file.
+
+    Returns:
+        byte sizes by encoding, e.g. {'raw': 9100, 'gzip': 2300, 'br': 1900}
+    """
+    data = path.read_bytes()
+    sizes = {'raw': len(data)}
+    if len(data) < MIN_COMPRESS_SIZE:
+        return sizes
+
+    # mtime=0 keeps the .gz byte-identical across builds
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    sizes['gzip'] = len(compressed)
+    write_output(path.with_name(path.name + '.gz'), compressed)
+    if brotli is not None:
+        compressed = brotli.compress(data, quality=11)
+        sizes['br'] = len(compressed)
+        write_output(path.with_name(path.name + '.br'), compressed)
+    return sizes
+
+
+def compressed_siblings(rel_path: str, sizes: Dict[str, int]) -> List[str]:
+    return [rel_path + {'gzip': '.gz', 'br': '.br'}[encoding] for encoding in sizes if encoding != 'raw']
+
+
+def precompress_outputs(site_dir: Path, generated: Dict[str, str], previous: Dict[str, Dict],
+                        reuse: bool = True) -> Dict[str, Dict]:
+    """
+    Refresh compressed siblings for generated files whose content changed.
+
+    Args:
+        generated: rel_path -> output hash for everything this build produced
+        previous: the manifest's last {rel_path: {'hash', 'sizes'}}
+        reuse: keep siblings whose source hash is unchanged (False recompresses everything)
+
+    Returns:
+        the new {rel_path: {'hash', 'sizes'}}; siblings of files no longer produced are deleted
+    """
+    encodings = {'raw', 'gzip'} | ({'br'} if brotli is not None else set())
+    compressed = {}
+    for rel_path, output_hash in generated.items():
+        if os.path.splitext(rel_path)[1] not in COMPRESS_EXTENSIONS:
+            continue
+        entry = previous.get(rel_path)
+        if (reuse and entry and entry['hash'] == output_hash
+                and (entry['sizes']['raw'] < MIN_COMPRESS_SIZE or set(entry['sizes']) == encodings)
+                and all((site_dir / sibling).exists() for sibling in compressed_siblings(rel_path, entry['sizes']))):
+            compressed[rel_path] = entry
+        else:
+            compressed[rel_path] = {'hash': output_hash, 'sizes': precompress(site_dir / rel_path)}
+
+    for rel_path, entry in previous.items():
+        current = compressed_siblings(rel_path, compressed[rel_path]['sizes']) if rel_path in compressed else []
+        for sibling in compressed_siblings(rel_path, entry['sizes']):
+            if sibling not in current and (site_dir / sibling).exists():
+                (site_dir / sibling).unlink()
+
+    return compressed
+
+
+def size_report(site_dir: Path, compressed: Dict[str, Dict], top: int = 10) -> Dict:
+    """Write per-page transfer sizes to SIZE_REPORT_NAME and print the totals and heaviest pages"""
+    pages = {rel_path: entry['sizes'] for rel_path, entry in sorted(compressed.items())}
+    totals = {}
+    encodings = ('raw', 'gzip', 'br') if brotli is not None else ('raw', 'gzip')
+    for sizes in pages.values():
+        for encoding in encodings:
+            # Files too small to compress are served raw
+            totals[encoding] = totals.get(encoding, 0) + sizes.get(encoding, sizes['raw'])
+
+    with open(site_dir / SIZE_REPORT_NAME, 'w', encoding='utf-8') as f:
+        json.dump({'totals': totals, 'files': pages}, f, indent=2)
+
+    def kb(n):
+        return f"{n / 1024:.1f} KB"
+
+    print(f"Output size: {kb(totals.get('raw', 0))} raw, {kb(totals.get('gzip', 0))} gzip"
+          + (f", {kb(totals['br'])} brotli" if 'br' in totals else ""))
+    heaviest = sorted(pages.items(), key=lambda item: item[1].get('gzip', item[1]['raw']), reverse=True)[:top]
+    for rel_path, sizes in heaviest:
+        print(f"  {rel_path:<40} {kb(sizes['raw']):>10} -> {kb(sizes.get('gzip', sizes['raw'])):>10} gz")
+    return totals
+
+
+def output_is_current(path: Path, expected_hash: Optional[str]) -> bool:
+    """True if a generated file still exists with the content we last wrote"""
+    if not expected_hash or not path.exists():
+        return False
+    return file_hash(path.read_bytes()) == expected_hash
+
+
+_md = None
+
+
+def _init_renderer():
+    """Build this process's Markdown instance once; extensions are loaded a single time"""
+    global _md
+    _md = markdown.Markdown(
+        extensions=MARKDOWN_EXTENSIONS + [MermaidExtension()],
+        extension_configs=MARKDOWN_EXTENSION_CONFIGS
+    )
+
+
+def markdown_to_html(content: str) -> str:
+    """Convert markdown with the reusable per-process Markdown instance"""
+    if _md is None:
+        _init_renderer()
+    try:
+        return _md.reset().convert(content)
+    except Exception as e:
+        # Simple fallback
+        print(f"Warning: markdown conversion failed ({e}), using raw text")
+        return f"<pre>{content}</pre>"
+
+
+def render_markdown_batch(contents: List[str], workers: int = None) -> List[str]:
+    """
+    Convert many documents, fanning out to a process pool for large batches.
+    Results keep input order, so output is identical to a serial run.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(contents) < PARALLEL_THRESHOLD:
+        return [markdown_to_html(content) for content in contents]
+
+    chunksize = max(1, len(contents) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_renderer) as pool:
+        return list(pool.map(markdown_to_html, contents, chunksize=chunksize))
+
+
+def fingerprinted_name(name: str, content: bytes) -> str:
+    """styles.css -> styles.<hash8>.css"""
+    base, ext = name.rsplit('.', 1)
+    return f"{base}.{file_hash(content)[:8]}.{ext}"
+
+
+def load_vendor_asset(name: str, vendor_dir: Path = None) -> Optional[bytes]:
+    """Committed copy of a third-party asset, or None if it's missing"""
+    vendored = Path(vendor_dir or VENDOR_DIR) / name
+    if not vendored.exists():
+        print(f"⚠️  {vendored} is missing: pages will load {name} from its CDN")
+        return None
+    return vendored.read_bytes()
+
+
+def pygments_css() -> str:
+    if HtmlFormatter is None:
+        print("⚠️  Pygments is not installed: code blocks will not be highlighted (pip install Pygments)")
+        return ""
+    return HtmlFormatter(style=PYGMENTS_STYLE).get_style_defs('.highlight')
+
+
+def site_assets(vendor_dir: Path = None, minify: bool = True) -> Dict[str, tuple]:
+    """
+    Static assets for this build.
+
+    Returns:
+        logical name -> (href used in pages, content bytes or None if served from a CDN)
+    """
+    styles = CSS_STYLES + "\n/* Pygments */\n" + pygments_css()
+    own = {
+        'styles.css': minify_css(styles) if minify else styles,
+        'search.js': SEARCH_SCRIPT,
+        'nav.js': NAV_SCRIPT,
+        'diagrams.js': DIAGRAM_SCRIPT,
+    }
+    assets = {}
+    for name, content in own.items():
+        data = content.encode('utf-8')
+        assets[name] = (f"{ASSETS_DIR}/{fingerprinted_name(name, data)}", data)
+
+    for name, url in VENDOR_ASSETS.items():
+        data = load_vendor_asset(name, vendor_dir)
+        assets[name] = (f"{ASSETS_DIR}/{fingerprinted_name(name, data)}", data) if data else (url, None)
+
+    return assets
+
+
+def heading_slug(text: str) -> str:
+    text = re.sub(r'<[^>]+>', '', html.unescape(text)).lower()
+    return re.sub(r'[^a-z0-9]+', '-', text).strip('-') or 'section'
+
+
+class SectionBoundaries(HTMLParser):
+    """Offsets of the <h2> tags at the top level of a body (not inside raw-HTML blocks)"""
+
+    VOID = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+    def __init__(self, html_content: str):
+        super().__init__(convert_charrefs=False)
+        self.line_starts = [0] + [m.end() for m in re.finditer(r'\n', html_content)]
+        self.open = []
+        self.offsets = []
+        self.feed(html_content)
+        self.close()
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'h2' and not self.open:
+            line, column = self.getpos()
+            self.offsets.append(self.line_starts[line - 1] + column)
+        if tag not in self.VOID:
+            self.open.append(tag)
+
+    def handle_endtag(self, tag):
+        # Unmatched end tags are ignored; an unclosed tag only means fewer split points
+        if tag in self.open:
+            del self.open[len(self.open) - 1 - self.open[::-1].index(tag):]
+
+
+def split_sections(html_content: str, max_size: int = None, part_size: int = None) -> List[str]:
+    """
+    Split a rendered body at its top-level <h2> boundaries, packing sections into
+    parts of about part_size. Bodies under max_size (or without any <h2>) come back whole.
+    """
+    max_size = max_size or SPLIT_PAGE_SIZE
+    part_size = part_size or SPLIT_PART_SIZE
+    if len(html_content) <= max_size:
+        return [html_content]
+
+    # Parsed, so an <h2> inside a raw-HTML block (<details>, <div>, ...) never cuts it in two
+    bounds = [0] + SectionBoundaries(html_content).offsets + [len(html_content)]
+    sections = [html_content[a:b] for a, b in zip(bounds, bounds[1:]) if a < b]
+
+    parts = []
+    current = ''
+    for section in sections:
+        if current and len(current) + len(section) > part_size:
+            parts.append(current)
+            current = ''
+        current += section
+    parts.append(current)
+    return parts
+
+
+def part_filename(name: str, index: int) -> str:
+    """First part keeps the page's own URL; the rest are name--2.html, name--3.html, ..."""
+    return f"{name}.html" if index == 0 else f"{name}--{index + 1}.html"
+
+
+def paginate(name: str, html_content: str, max_size: int = None, part_size: int = None) -> List[tuple]:
+    """
+    Returns:
+        [(filename, body html)] - a single entry unless the page was split, in which
+        case every part gets anchored <h2>s, a table of contents and prev/next links
+    """
+    parts = split_sections(html_content, max_size, part_size)
+    if len(parts) == 1:
+        return [(f"{name}.html", html_content)]
+
+    used = set()
+    anchored = []
+    toc = [] # per part: [(anchor, heading html)]
+
+    def anchor(match):
+        slug = base = heading_slug(match.group(2))
+        n = 2
+        while slug in used:
+            slug = f"{base}-{n}"
+            n += 1
+        used.add(slug)
+        toc[-1].append((slug, match.group(2)))
+        return f'<h2{match.group(1)} id="{slug}">{match.group(2)}</h2>'
+
+    for part in parts:
+        toc.append([])
+        anchored.append(re.sub(r'<h2([^>]*)>(.*?)</h2>', anchor, part, flags=re.S))
+
+    pages = []
+    for index, body in enumerate(anchored):
+        items = []
+        for i, headings in enumerate(toc):
+            filename = part_filename(name, i)
+            links = ''.join(f'<li><a href="{filename}#{slug}">{text}</a></li>' for slug, text in headings)
+            css_class = ' class="current"' if i == index else ''
+            items.append(f'<li{css_class}><a href="{filename}">Part {i + 1}</a><ol>{links}</ol></li>')
+        toc_html = f'<nav class="page-toc"><strong>Contents</strong><ol>{"".join(items)}</ol></nav>'
+
+        prev_link = f'<a href="{part_filename(name, index - 1)}">&larr; Part {index}</a>' if index > 0 else '<span></span>'
+        next_link = (f'<a href="{part_filename(name, index + 1)}">Part {index + 2} &rarr;</a>'
+                     if index + 1 < len(anchored) else '<span></span>')
+        pages.append((part_filename(name, index),
+                      f'{toc_html}\n{body}\n<nav class="pager">{prev_link}{next_link}</nav>'))
+    return pages
+
+
+def render_page(name: str, html_content: str, nav: Optional[Navigation], updated: str,
+                asset_urls: Dict[str, str], title: str = None) -> str:
+    """Wrap converted markdown in the full HTML page (nav=None -> lazily loaded sidebar)"""
+    diagram_script = ""
+    if 'class="mermaid"' in html_content:
+        diagram_script = (f'<script src="{asset_urls["diagrams.js"]}" '
+                          f'data-mermaid="{asset_urls["mermaid.min.js"]}" defer></script>')
+
+    return PAGE_TEMPLATE.render(
+        title=title or name,
+        page=name,
+        nav_group=nav_group(name),
+        styles_href=asset_urls['styles.css'],
+        diagram_script=diagram_script,
+        search_src=asset_urls['search.js'],
+        active_index="",
+        nav_links=nav.for_page(name) if nav else "",
+        nav_script="" if nav else f'<script src="{asset_urls["nav.js"]}" defer></script>',
+        breadcrumbs=f"Docs > {title or name}",
+        date=updated,
+        content=html_content
+    )
+
+
+def html_text(fragment: str) -> str:
+    """Text of a rendered body for the search index (code blocks left out, as for markdown)"""
+    text = re.sub(r'<pre[\s>].*?</pre>', ' ', fragment, flags=re.S)
+    return html.unescape(re.sub(r'<[^>]+>', ' ', text))
+
+
+def build_search_index(site_dir: Path, sources: Dict[str, str], split: Dict[str, List[str]] = None) -> Dict[str, str]:
+    """
+    Write the sharded search index for all pages; returns {output path: hash}.
+    Pages in `split` (name -> part bodies) are indexed part by part, each under its own URL.
+    """
+    split = split or {}
+    builder = SearchIndexBuilder()
+    for name, content in sources.items():
+        parts = split.get(name)
+        if not parts:
+            builder.add(f"{name}.html", name, content)
+            continue
+        for index, part in enumerate(parts):
+            builder.add(part_filename(name, index), f"{name} ({index + 1}/{len(parts)})", html_text(part))
+
+    files = {f"search/{rel_path}": content for rel_path, content in builder.build().items()}
+
+    hashes = {}
+    for rel_path, content in files.items():
+        hashes[rel_path] = file_hash(content)
+        if not output_is_current(site_dir / rel_path, hashes[rel_path]):
+            (site_dir / rel_path).parent.mkdir(parents=True, exist_ok=True)
+            write_output(site_dir / rel_path, content)
+    return hashes
+
+
+def build_site(docs_dir: Path = None, site_dir: Path = None, force: bool = False, workers: int = None,
+               lazy_nav: Optional[bool] = None, search: bool = True, minify: bool = True,
+               compress: bool = True) -> Dict:
+    """
+    Incrementally build the HTML site.
+
+    Only pages whose source, nav membership or template changed are re-rendered,
+    and only files recorded in the manifest are ever deleted - everything else in
+    site_dir (e.g. markdown written by pages-manager) is left alone.
+
+    Args:
+        workers: processes used for markdown conversion (None = cpu count, 1 = serial)
+        lazy_nav: load the sidebar from nav JSON (None = only above NAV_INLINE_LIMIT pages)
+        search: emit the client-side search index
+        minify: minify page HTML and the stylesheet
+        compress: write .gz/.br siblings and a size report
+
+    Returns:
+        {'rendered': [...], 'unchanged': [...], 'removed': [...], 'pages_per_sec': float,
+         'bytes': {'raw', 'gzip', 'br'} totals when compressing}
+    """
+    docs_dir = Path(docs_dir or DOCS_DIR)
+    site_dir = Path(site_dir or SITE_DIR)
+    stats = {'rendered': [], 'unchanged': [], 'removed': [], 'pages_per_sec': 0.0, 'bytes': {}}
+
+    if not docs_dir.exists():
         print("No docs directory found")
-        return
+        return stats
 
-    # Clean output
-    if SITE_DIR.exists():
-        shutil.rmtree(SITE_DIR)
-    SITE_DIR.mkdir()
+    site_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(site_dir)
+    old_pages = manifest.get('pages', {})
 
-    # Write CSS
-    with open(SITE_DIR / 'styles.css', 'w', encoding='utf-8') as f:
-        f.write(CSS_STYLES)
+    # Fingerprinted assets (content-hash filenames) + cache headers
+    outputs = {}
+    asset_urls = {}
+    for name, (href, data) in site_assets(minify=minify).items():
+        asset_urls[name] = href
+        if data is None:
+            continue
+        outputs[href] = file_hash(data)
+        if not output_is_current(site_dir / href, outputs[href]):
+            (site_dir / href).parent.mkdir(parents=True, exist_ok=True)
+            write_output(site_dir / href, data)
+    outputs['_headers'] = file_hash(HEADERS_FILE)
+    if not output_is_current(site_dir / '_headers', outputs['_headers']):
+        write_output(site_dir / '_headers', HEADERS_FILE)
 
     # Get Markdown files
-    md_files = sorted(list(DOCS_DIR.glob('*.md')))
-    
-    # Generate Nav
-    nav_links = ""
-    for md_file in md_files:
-        name = md_file.stem
-        nav_links += f'<li><a href="{name}.html" class="{{active_{name}}}">{name}</a></li>'
+    md_files = sorted(list(docs_dir.glob('*.md')))
+
+    # Every page embeds the nav, so a change in the page set (or template) invalidates all pages
+    nav = [md_file.stem for md_file in md_files]
+    if lazy_nav is None:
+        lazy_nav = len(nav) > NAV_INLINE_LIMIT
+    # Asset URLs are baked into pages, so a new fingerprint re-renders them too
+    template_hash = file_hash(f"{HTML_TEMPLATE}:lazy_nav={lazy_nav}:minify={minify}:{json.dumps(asset_urls, sort_keys=True)}"
+                              f":{json.dumps(MARKDOWN_EXTENSION_CONFIGS, sort_keys=True)}"
+                              f":split={SPLIT_PAGE_SIZE}/{SPLIT_PART_SIZE}")
+    nav_changed = force or nav != manifest.get('nav') or template_hash != manifest.get('template_hash')
+    if nav_changed and old_pages and not force:
+        print("Page set or template changed, re-emitting navigation on all pages")
+
+    navigation = None
+    if lazy_nav:
+        for rel_path, content in nav_json_files(nav).items():
+            outputs[rel_path] = file_hash(content)
+            if nav_changed or not output_is_current(site_dir / rel_path, outputs[rel_path]):
+                (site_dir / rel_path).parent.mkdir(parents=True, exist_ok=True)
+                write_output(site_dir / rel_path, content)
+    else:
+        navigation = Navigation(nav)
 
-    # Process files
+    pages = {}
+    sources = {} # name -> markdown, for the search index
+    split = {} # name -> part bodies of pages rendered as several files
+    dirty = [] # (md_file, source_key, content, source_hash)
     for md_file in md_files:
         name = md_file.stem
+        source_key = md_file.as_posix()
+
         with open(md_file, 'r', encoding='utf-8') as f:
             content = f.read()
+        source_hash = file_hash(content)
+        sources[name] = content
 
-        # Convert MD to HTML (using basic parsing or library if available)
-        # Using markdown library if installed, else fallback to basic replacement
-        try:
-            html_content = markdown.markdown(content, extensions=['fenced_code', 'tables'])
-        except:
-            # Simple fallback
-            html_content = f"<pre>{content}</pre>"
-            print("Warning: 'markdown' lib not found, using raw text")
-
-        # HTML Template
-        final_html = HTML_TEMPLATE.format(
-            title=name,
-            active_index="",
-            nav_links=nav_links.format(**{f"active_{name}": "active", **{f"active_{o.stem}": "" for o in md_files if o != md_file}}),
-            breadcrumbs=f"Docs > {name}",
-            date=datetime.now().strftime('%Y-%m-%d'),
-            content=html_content
-        )
-        
-        # Clean up format strings for other inactive links (hacky but works for simple case)
-        # Actually the f-string approach above is complex. Let's simplify.
-        
-        # Simpler Nav Generation per page
-        page_nav = ""
-        for n in md_files:
-            active = "active" if n.stem == name else ""
-            page_nav += f'<li><a href="{n.stem}.html" class="{active}">{n.stem}</a></li>'
-            
-        final_html = HTML_TEMPLATE.format(
-            title=name,
-            active_index="",
-            nav_links=page_nav,
-            breadcrumbs=f"Docs > {name}",
-            date=datetime.now().strftime('%Y-%m-%d'),
-            content=html_content
-        )
-
-        with open(SITE_DIR / f"{name}.html", 'w', encoding='utf-8') as f:
-            f.write(final_html)
-            
+        previous = old_pages.get(source_key)
+        if (previous and not nav_changed
+                and previous['source_hash'] == source_hash
+                and output_is_current(site_dir / f"{name}.html", previous['output_hash'])
+                and all(output_is_current(site_dir / part, part_hash)
+                        for part, part_hash in previous.get('parts', {}).items())):
+            pages[source_key] = previous
+            stats['unchanged'].append(name)
+            continue
+
+        dirty.append((md_file, source_key, content, source_hash))
+
+    start = time.perf_counter()
+    rendered_bodies = render_markdown_batch([content for _, _, content, _ in dirty], workers)
+
+    for (md_file, source_key, _, source_hash), html_content in zip(dirty, rendered_bodies):
+        name = md_file.stem
+        output_path = site_dir / f"{name}.html"
+
+        # Date from the source itself so unchanged pages render identically
+        updated = datetime.fromtimestamp(md_file.stat().st_mtime).strftime('%Y-%m-%d')
+        parts = paginate(name, html_content)
+        if len(parts) > 1:
+            split[name] = split_sections(html_content)
+        hashes = {}
+        for index, (filename, body) in enumerate(parts):
+            title = f"{name} ({index + 1}/{len(parts)})" if len(parts) > 1 else name
+            final_html = render_page(name, body, navigation, updated, asset_urls, title=title)
+            if minify:
+                final_html = minify_html(final_html)
+            hashes[filename] = write_output(site_dir / filename, final_html)
+
+        # Sub-pages from a previous, longer version of this page
+        for stale in set(old_pages.get(source_key, {}).get('parts', {})) - set(hashes):
+            if (site_dir / stale).exists():
+                (site_dir / stale).unlink()
+            stats['removed'].append(stale)
+
+        pages[source_key] = {
+            'output': output_path.name,
+            'source_hash': source_hash,
+            'output_hash': hashes.pop(output_path.name),
+            'parts': hashes,
+            'deps': ['nav']
+        }
+        stats['rendered'].append(name)
         print(f"Generated {name}.html")
 
+    elapsed = time.perf_counter() - start
+    stats['pages_per_sec'] = len(dirty) / elapsed if dirty and elapsed > 0 else 0.0
+
+    # Remove outputs for sources that disappeared (never touch files we didn't generate)
+    for source_key, previous in old_pages.items():
+        if source_key not in pages:
+            for output in [previous['output']] + list(previous.get('parts', {})):
+                stale = site_dir / output
+                if stale.exists():
+                    stale.unlink()
+                stats['removed'].append(output)
+                print(f"Removed {output}")
+
+    # Search index only changes when some page did
+    if search:
+        old_search = {k: v for k, v in manifest.get('outputs', {}).items() if k.startswith('search/')}
+        if stats['rendered'] or stats['removed'] or not old_search or not (site_dir / 'search' / 'meta.json').exists():
+            # Unchanged split pages weren't rendered this build: re-render just those
+            for source_key, page in pages.items():
+                name = Path(source_key).stem
+                if page.get('parts') and name not in split:
+                    split[name] = split_sections(markdown_to_html(sources[name]))
+            outputs.update(build_search_index(site_dir, sources, split))
+        else:
+            outputs.update(old_search)
+
     # Generate Index (Copy README or first doc)
-    index_content = "<h1>Welcome to CI/CD Docs</h1><p>Select a page from the sidebar.</p>"
-    if (DOCS_DIR / 'README.md').exists(): # If docs has readme
+    index_path = site_dir / "index.html"
+    if (docs_dir / 'README.md').exists(): # If docs has readme
         # Use that
         pass
     elif len(md_files) > 0:
         # Use first file
-         shutil.copy(SITE_DIR / f"{md_files[0].stem}.html", SITE_DIR / "index.html")
+        first_hash = pages[md_files[0].as_posix()]['output_hash']
+        if not output_is_current(index_path, first_hash):
+            shutil.copy(site_dir / f"{md_files[0].stem}.html", index_path)
+        outputs['index.html'] = first_hash
+
+    # Drop generated extras that this build no longer produces (e.g. nav JSON after switching to inline nav)
+    for rel_path in manifest.get('outputs', {}):
+        if rel_path not in outputs and (site_dir / rel_path).exists():
+            (site_dir / rel_path).unlink()
+            stats['removed'].append(rel_path)
 
-    print(f"Site built in {SITE_DIR}")
+    compressed = {}
+    if compress:
+        generated = {}
+        for page in pages.values():
+            generated[page['output']] = page['output_hash']
+            generated.update(page.get('parts', {}))
+        generated.update(outputs)
+        compressed = precompress_outputs(site_dir, generated, manifest.get('compressed', {}), reuse=not force)
+        stats['bytes'] = size_report(site_dir, compressed)
+    else:
+        precompress_outputs(site_dir, {}, manifest.get('compressed', {}))
+
+    manifest.update({
+        'version': MANIFEST_VERSION,
+        'template_hash': template_hash,
+        'nav': nav,
+        'pages': pages,
+        'outputs': outputs,
+        'compressed': compressed
+    })
+    save_manifest(site_dir, manifest)
+
+    print(f"Site built in {site_dir}: {len(stats['rendered'])} rendered, "
+          f"{len(stats['unchanged'])} unchanged, {len(stats['removed'])} removed")
+    if stats['rendered']:
+        print(f"Rendered {len(stats['rendered'])} pages in {elapsed:.2f}s ({stats['pages_per_sec']:.0f} pages/sec)")
+    return stats
 
 if __name__ == '__main__':
     # Need markdown package
@@ -246,4 +1095,16 @@ if __name__ == '__main__':
         os.system('pip install markdown')
         import markdown
         
-    build_site()
+    import argparse
+    parser = argparse.ArgumentParser(description="Build the static documentation site")
+    parser.add_argument('--force', action='store_true', help='Re-render every page')
+    parser.add_argument('--workers', type=int, default=None, help='Render processes (1 = serial)')
+    parser.add_argument('--nav', choices=['auto', 'inline', 'lazy'], default='auto',
+                        help=f'Sidebar mode (auto = lazy above {NAV_INLINE_LIMIT} pages)')
+    parser.add_argument('--no-minify', action='store_true', help='Keep HTML/CSS whitespace as generated')
+    parser.add_argument('--no-compress', action='store_true', help='Skip .gz/.br siblings and the size report')
+    args = parser.parse_args()
+
+    build_site(force=args.force, workers=args.workers,
+               lazy_nav={'auto': None, 'inline': False, 'lazy': True}[args.nav],
+               minify=not args.no_minify, compress=not args.no_compress)
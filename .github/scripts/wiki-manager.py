@@ -17,6 +17,11 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
 from llm import get_client
+from mapping_store import MappingStore
+from publisher import Doc, PublishingEngine, changed_docs
+from page_classifier import PageClassifier
+from markdown_sections import (MarkdownDocument, MergeConflict, first_heading, merge_token_budget,
+                               single_root, strip_fences, structural_merge)
 
 GROQ_API_KEY = os.environ.get('GROQ_API_KEY')
 GITHUB_TOKEN = os.environ.get('GITHUB_TOKEN')
@@ -26,30 +31,28 @@ MODEL = os.environ.get('LLM_MODEL', 'openai/gpt-oss-120b')
 
 # Persistent mapping file (committed to repo)
 MAPPING_FILE = '.github/wiki-mapping.json'
+MAX_MERGE_CONTENT = 6000  # new content sent with a section merge
 
 class WikiManager:
     def __init__(self):
         self.mapping = self.load_mapping()
+        # Learned from past routing decisions; confident predictions skip the LLM
+        self.classifier = PageClassifier().train(self.mapping.mappings())
         self.existing_pages = self.fetch_wiki_pages()
+        # How merges were resolved: structural (no LLM), llm, or appended as a new section
+        self.merge_stats = {'structural': 0, 'llm': 0, 'appended': 0}
         
-    def load_mapping(self) -> Dict:
-        """Load persistent wiki mapping"""
-        if os.path.exists(MAPPING_FILE):
-            with open(MAPPING_FILE, 'r') as f:
-                return json.load(f)
-        return {
+    def load_mapping(self) -> MappingStore:
+        """Open the wiki mapping store (synced from MAPPING_FILE if that changed)"""
+        return MappingStore(MAPPING_FILE, files_key='files', defaults={
             'version': '1.0',
-            'last_updated': datetime.now().isoformat(),
-            'file_to_page': {},  # file_path -> wiki_page_name
-            'page_metadata': {}  # wiki_page_name -> {category, description, files}
-        }
+            'description': ("Persistent mapping of source files to Wiki pages. "
+                            "DO NOT DELETE - used by wiki-manager.py to ensure consistency."),
+        })
     
     def save_mapping(self):
-        """Save mapping to disk"""
-        self.mapping['last_updated'] = datetime.now().isoformat()
-        os.makedirs(os.path.dirname(MAPPING_FILE), exist_ok=True)
-        with open(MAPPING_FILE, 'w') as f:
-            json.dump(self.mapping, indent=2, fp=f)
+        """Export the mapping store back to MAPPING_FILE"""
+        self.mapping.export_json()
         print(f"✓ Saved mapping to {MAPPING_FILE}")
     
     def fetch_wiki_pages(self) -> List[str]:
@@ -89,35 +92,47 @@ class WikiManager:
             print(f"⚠️  Error fetching wiki pages: {e}")
             return []
     
-    def determine_wiki_page(self, file_path: str, file_content: str) -> str:
+    # -- publishing target (see publisher.py) --
+    
+    name = 'wiki'
+    
+    def rule_route(self, doc: Doc, rule: Dict) -> Optional[str]:
+        """A docs-routing.yml rule's wiki page"""
+        page_name = rule.get('wiki')
+        if not isinstance(page_name, str) or not page_name.strip() or '/' in page_name:
+            return None
+        print(f"  ✓ Rule: {doc.source} → {page_name.strip()}")
+        return page_name.strip()
+    
+    def known_route(self, doc: Doc) -> Optional[str]:
         """
-        Intelligently determine which wiki page this file should go to.
-        Uses LLM with context of existing pages and previous mappings.
+        The page this source already maps to (a file never moves between wiki pages),
+        else the classifier's prediction if it is confident enough
         """
-        # Check if we already have a mapping
-        if file_path in self.mapping['file_to_page']:
-            existing = self.mapping['file_to_page'][file_path]
-            print(f"  📌 Using existing mapping: {file_path} → {existing}")
+        # Mappings recorded before provenance existed are keyed <stem>.ts
+        existing = self.mapping.page_for(doc.source) or self.mapping.page_for(Path(doc.source).stem + '.ts')
+        if existing:
+            print(f"  📌 Using existing mapping: {doc.source} → {existing}")
             return existing
         
-        # Use LLM to make intelligent decision
-        print(f"  🤔 Determining wiki page for {file_path}...")
-        
+        prediction = self.classifier.confident(doc.source)
+        if prediction:
+            page_name, confidence = prediction
+            print(f"  🧠 Predicted: {doc.source} → {page_name} ({confidence:.0%} confident)")
+            return page_name
+        return None
+    
+    def routing_context(self) -> str:
+        """Wiki page choice, with the existing pages and previous mappings as context"""
         existing_pages_text = "\n".join([f"  - {p}" for p in self.existing_pages]) if self.existing_pages else "  (No pages yet)"
         
         previous_mappings_text = ""
-        if self.mapping['file_to_page']:
-            examples = list(self.mapping['file_to_page'].items())[:10]
+        examples = self.mapping.mappings(limit=10)
+        if examples:
             previous_mappings_text = "Previous mappings:\n" + "\n".join([f"  - {f} → {p}" for f, p in examples])
         
-        prompt = f"""You are a documentation organizer. Determine the BEST wiki page name for this code file.
-
-File: {file_path}
-
-File content preview:
-```
-{file_content[:1000]}
-```
+        return f"""### Target "wiki": GitHub Wiki
+Determine the BEST wiki page name for each code file.
 
 Existing wiki pages:
 {existing_pages_text}
@@ -129,7 +144,7 @@ RULES:
 2. Create new pages for distinct modules/domains
 3. Group related functionality together
 4. Use clear, descriptive names (e.g., "Authentication-API", "Database-Layer")
-5. For files in same directory/domain, use same page
+5. For files in same directory/domain, use same page (including files in this same request)
 6. Use Title-Case-With-Dashes format
 
 Examples:
@@ -138,39 +153,53 @@ Examples:
 - api/users.ts → "API-Users"
 - utils/format.ts → "Utilities"
 - test files → "Testing-Guide"
-
-Return ONLY the wiki page name, nothing else."""
-
-        try:
-            response = get_client().call_chat(
-                model=MODEL,
-                messages=[
-                    {'role': 'system', 'content': 'You are a documentation expert. Return only the wiki page name.'},
-                    {'role': 'user', 'content': prompt}
-                ],
-                temperature=0.1,
-                max_tokens=50
-            )
-            
-            if response:
-                page_name = response.strip()
-                # Clean up response (remove quotes, extra text)
-                page_name = page_name.strip('"\'`').split('\n')[0].strip()
-                print(f"  ✓ LLM decision: {file_path} → {page_name}")
-                
-                # Verify it's a valid page name
-                if not page_name or len(page_name) > 100 or '/' in page_name:
-                    # Fallback to simple naming
-                    page_name = self._fallback_page_name(file_path)
-                    print(f"  ⚠️  Invalid LLM response, using fallback: {page_name}")
-                
-                return page_name
-            else:
-                print(f"  ⚠️  LLM failed ({response.status_code}), using fallback")
-                return self._fallback_page_name(file_path)
-        except Exception as e:
-            print(f"  ⚠️  Error calling LLM: {e}, using fallback")
-            return self._fallback_page_name(file_path)
+"""
+    
+    def routing_prompt(self, doc: Doc) -> str:
+        """Nothing doc-specific: the item's path and doc are all the wiki choice needs"""
+        return ''
+    
+    def routing_schema(self) -> str:
+        return '{"page": "Wiki-Page-Name"}'
+    
+    def parse_route(self, doc: Doc, answer) -> str:
+        page_name = answer.get('page') if isinstance(answer, dict) else answer
+        if not isinstance(page_name, str):
+            raise ValueError("no page name")
+        # Clean up response (remove quotes, extra text)
+        page_name = page_name.strip().strip('"\'`').split('\n')[0].strip()
+        if not page_name or len(page_name) > 100 or '/' in page_name:
+            raise ValueError(f"invalid page name {page_name!r}")
+        print(f"  ✓ LLM decision: {doc.source} → {page_name}")
+        return page_name
+    
+    def fallback_route(self, doc: Doc) -> str:
+        return self._fallback_page_name(doc.source)
+    
+    def publish(self, doc: Doc, page_name: str) -> List[Dict]:
+        if not self.update_wiki_page(page_name, doc.content):
+            return []
+        self.record_mapping(doc.source, page_name)
+        return [{'file': doc.source, 'page': page_name}]
+    
+    def finish(self, updates_made: List[Dict]):
+        """Persist and verify the mapping, write wiki_summary.md"""
+        self.save_mapping()
+        self.verify_consistency()
+        summary = self.generate_summary()
+        
+        with open('wiki_summary.md', 'w') as f:
+            f.write(summary)
+            f.write("\n## Updates Made\n\n")
+            for update in updates_made:
+                f.write(f"- `{update['file']}` → [{update['page']}]\n")
+        
+        print("\n" + "="*80)
+        print("WIKI MANAGER COMPLETE")
+        print("="*80)
+        print(f"✓ {len(updates_made)} wiki pages updated")
+        print(f"✓ Mapping saved to {MAPPING_FILE}")
+        print(f"✓ Summary saved to wiki_summary.md")
     
     def _fallback_page_name(self, file_path: str) -> str:
         """Fallback logic if LLM fails"""
@@ -233,37 +262,61 @@ Return ONLY the wiki page name, nothing else."""
             return False
     
     def _merge_wiki_content(self, existing: str, new: str, page_name: str) -> str:
-        """Intelligently merge new content into existing wiki page using LLM"""
+        """Merge new docs into the matching doc block of a wiki page; only that block goes to the LLM"""
+        new = single_root(new)
         if not existing:
             # New page
             header = f"# {page_name.replace('-', ' ')}\n\n"
             header += f"*Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n\n"
             return header + new
         
-        # Use LLM to intelligently merge
-        print(f"    🧠 Using LLM to intelligently merge content...")
+        # Each doc is added under its own heading (e.g. "# auth.ts"); find that section
+        title = first_heading(new)
+        doc = MarkdownDocument(existing)
+        index = doc.find(title) if title else None
+        if index is None:
+            print(f"    ➕ No section for '{title}' yet, appending")
+            self.merge_stats['appended'] += 1
+            return self._simple_merge(existing, new)
+
+        # The doc's whole block, up to the next doc (older docs have several top-level headings)
+        section = doc.block_text(index)
+        try:
+            merged, changes = structural_merge(single_root(section), new)
+            self.merge_stats['structural'] += 1
+            print(f"    ⚡ Structural merge, no LLM needed: {changes['added']} added, "
+                  f"{changes['replaced']} replaced, {changes['removed']} removed")
+            return self._update_timestamp(doc.replace(index, merged, block=True))
+        except MergeConflict as e:
+            print(f"    ↪ Structural merge not possible ({e})")
+
+        self.merge_stats['llm'] += 1
+        print(f"    🧠 Using LLM to merge section '{doc.sections[index][1]}' "
+              f"({len(section)} of {len(existing)} chars)...")
+        new = new[:MAX_MERGE_CONTENT]
         
-        prompt = f"""You are a wiki editor. Intelligently merge new documentation into existing wiki page.
+        prompt = f"""You are a wiki editor. Update ONE section of a wiki page with new documentation.
 
-**Existing Wiki Page:**
+**Current Wiki Section:**
 ```markdown
-{existing[:3000]}
+{section}
 ```
 
 **New Documentation:**
 ```markdown
-{new[:2000]}
+{new}
 ```
 
 **Task:**
-2. If UPDATING existing functions → REPLACE that section
+1. If ADDING new functions → ADD them to the section
+2. If UPDATING existing functions → REPLACE that part
 3. If similar content exists → MERGE and deduplicate
-4. Update "Last updated" timestamp to: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+4. Keep the heading line exactly as: {section.split(chr(10), 1)[0]}
 5. Maintain wiki structure and formatting
 6. ALWAYS USE METADATA (Author, Version) FROM THE NEW DOCUMENTATION
 7. REPLACE "Amp Team" with "Kynlo Akari" if found anywhere
 
-Return the COMPLETE merged wiki page.
+Return ONLY the updated section, starting with its heading.
 """
 
         try:
@@ -274,22 +327,12 @@ Return the COMPLETE merged wiki page.
                     {'role': 'user', 'content': prompt}
                 ],
                 temperature=0.3,
-                max_tokens=4000
+                max_tokens=merge_token_budget(section, new)
             )
             
             if response:
-                merged = response.strip()
-                
-                # Clean up if LLM wrapped in code fences
-                if merged.startswith('```markdown'):
-                    merged = merged[11:]
-                if merged.startswith('```'):
-                    merged = merged[3:]
-                if merged.endswith('```'):
-                    merged = merged[:-3]
-                
-                print(f"    ✓ LLM merged content intelligently")
-                return merged.strip()
+                print(f"    ✓ LLM merged section intelligently")
+                return self._update_timestamp(doc.replace(index, strip_fences(response), block=True))
             else:
                 print(f"    ⚠️  LLM merge failed, using simple append")
                 return self._simple_merge(existing, new)
@@ -297,33 +340,21 @@ Return the COMPLETE merged wiki page.
             print(f"    ⚠️  Error in LLM merge: {e}, using simple append")
             return self._simple_merge(existing, new)
     
-    def _simple_merge(self, existing: str, new: str) -> str:
-        """Simple merge fallback"""
-        lines = existing.split('\n')
-        
-        # Update timestamp
+    def _update_timestamp(self, content: str) -> str:
+        lines = content.split('\n')
         for i, line in enumerate(lines):
             if line.startswith('*Last updated:'):
                 lines[i] = f"*Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*"
                 break
-        
-        return '\n'.join(lines) + '\n\n---\n\n' + new
+        return '\n'.join(lines)
+    
+    def _simple_merge(self, existing: str, new: str) -> str:
+        """Simple merge fallback"""
+        return self._update_timestamp(existing) + '\n\n---\n\n' + new
     
     def record_mapping(self, file_path: str, page_name: str):
-        """Record the file-to-page mapping"""
-        self.mapping['file_to_page'][file_path] = page_name
-        
-        # Update page metadata
-        if page_name not in self.mapping['page_metadata']:
-            self.mapping['page_metadata'][page_name] = {
-                'created': datetime.now().isoformat(),
-                'files': []
-            }
-        
-        if file_path not in self.mapping['page_metadata'][page_name]['files']:
-            self.mapping['page_metadata'][page_name]['files'].append(file_path)
-        
-        self.mapping['page_metadata'][page_name]['last_updated'] = datetime.now().isoformat()
+        """Record the file-to-page mapping (replaces any earlier page for the file)"""
+        self.mapping.record(file_path, page_name)
     
     def verify_consistency(self) -> bool:
         """Verify mapping is consistent and valid"""
@@ -331,22 +362,15 @@ Return the COMPLETE merged wiki page.
         
         issues = []
         
-        # Check for duplicate mappings
-        page_files = {}
-        for file_path, page_name in self.mapping['file_to_page'].items():
-            if page_name not in page_files:
-                page_files[page_name] = []
-            page_files[page_name].append(file_path)
-        
-        # Verify metadata matches mappings
-        for page_name, metadata in self.mapping['page_metadata'].items():
-            if page_name not in page_files:
+        # file -> page and page -> files are one table, so they can't disagree;
+        # what can drift is page metadata without files, or files without metadata
+        for page_name in self.mapping.pages():
+            if not self.mapping.files_for(page_name):
                 issues.append(f"Metadata exists for {page_name} but no files mapped")
-            else:
-                mapped = set(page_files[page_name])
-                recorded = set(metadata['files'])
-                if mapped != recorded:
-                    issues.append(f"Mismatch in {page_name}: mapped={len(mapped)}, recorded={len(recorded)}")
+        
+        for file_path, page_name in self.mapping.mappings():
+            if self.mapping.page_metadata(page_name) is None:
+                issues.append(f"{file_path} is mapped to {page_name}, which has no metadata")
         
         if issues:
             print("⚠️  Consistency issues found:")
@@ -360,9 +384,14 @@ Return the COMPLETE merged wiki page.
     def generate_summary(self) -> str:
         """Generate a summary of wiki organization"""
         summary = "## 📚 Wiki Organization Summary\n\n"
-        summary += f"**Total Pages:** {len(self.mapping['page_metadata'])}\n\n"
-        
-        for page_name, metadata in sorted(self.mapping['page_metadata'].items()):
+        summary += f"**Total Pages:** {self.mapping.page_count()}\n\n"
+        merges = self.merge_stats
+        if sum(merges.values()):
+            summary += (f"**Merges:** {merges['structural']} structural (no LLM), {merges['llm']} via LLM, "
+                        f"{merges['appended']} new sections\n\n")
+        
+        for page_name in self.mapping.pages():
+            metadata = self.mapping.page_metadata(page_name)
             file_count = len(metadata['files'])
             summary += f"### {page_name}\n"
             summary += f"- **Files:** {file_count}\n"
@@ -388,125 +417,12 @@ def process_documentation_to_wiki(doc_files: List[str]):
     print("SMART WIKI MANAGER")
     print("="*80)
     
-    manager = WikiManager()
-    
-    # Process each documentation file
-    updates_made = []
-    
-    for doc_file in doc_files:
-        if not os.path.exists(doc_file):
-            print(f"⚠️  {doc_file} not found")
-            continue
-        
-        print(f"\n📄 Processing: {doc_file}")
-        
-        # Read doc content
-        with open(doc_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Determine source file (doc filename is based on source)
-        # e.g., docs/auth.md → auth.ts
-        doc_path = Path(doc_file)
-        # Try to find actual source file
-        search_paths = [
-            Path('.'),
-            Path('src'),
-            Path('.github/scripts'),
-            Path('scripts'),
-            Path('.github/workflows') 
-        ]
-        
-        extensions = ['.ts', '.py', '.js', '.go', '.rs', '.java']
-        
-        actual_source = None
-        source_content = ""
-        
-        # Check all combinations
-        for search_path in search_paths:
-            if actual_source: break
-            
-            for ext in extensions:
-                possible = search_path / (doc_path.stem + ext)
-                if possible.exists():
-                    actual_source = str(possible)
-                    with open(actual_source, 'r', encoding='utf-8') as f:
-                        source_content = f.read()
-                    break
-        
-        if not actual_source:
-             # Fallback: use doc filename but try to guess original if possible from file content?
-             # For now, default to .ts if unknown
-             actual_source = doc_path.stem + '.ts'
-             print(f"  ⚠️  Source file not found, using: {actual_source}")
-        
-        # Determine wiki page
-        # Use source content for context, but fallback to doc content if source not found
-        context_content = source_content if source_content else content
-        page_name = manager.determine_wiki_page(actual_source, context_content)
-        
-        # Update wiki page
-        success = manager.update_wiki_page(page_name, content)
-        
-        if success:
-            # Record mapping
-            manager.record_mapping(actual_source, page_name)
-            updates_made.append({
-                'file': actual_source,
-                'page': page_name
-            })
-    
-    # Save mapping
-    manager.save_mapping()
-    
-    # Verify consistency
-    manager.verify_consistency()
-    
-    # Generate summary
-    summary = manager.generate_summary()
-    
-    # Save summary to output
-    with open('wiki_summary.md', 'w') as f:
-        f.write(summary)
-        f.write("\n## Updates Made\n\n")
-        for update in updates_made:
-            f.write(f"- `{update['file']}` → [{update['page']}]\n")
-    
-    print("\n" + "="*80)
-    print("WIKI MANAGER COMPLETE")
-    print("="*80)
-    print(f"✓ {len(updates_made)} wiki pages updated")
-    print(f"✓ Mapping saved to {MAPPING_FILE}")
-    print(f"✓ Summary saved to wiki_summary.md")
-    
-    return updates_made
+    return PublishingEngine([WikiManager()]).publish(doc_files)['wiki']
 
 
 if __name__ == '__main__':
-    # Get list of CHANGED source files to determine which docs to process
-    changed_source_files = []
-    if os.path.exists('changed_files.txt'):
-        with open('changed_files.txt', 'r') as f:
-            changed_source_files = [line.strip() for line in f if line.strip()]
-    
-    if not changed_source_files:
-        print("No changed source files detected")
-        sys.exit(0)
-    
-    # Map source files to their doc files
-    docs_dir = Path('docs')
-    if not docs_dir.exists():
-        print("No docs directory found")
-        sys.exit(0)
-    
-    # Only process docs for files that actually changed
-    doc_files_to_process = []
-    for source_file in changed_source_files:
-        source_path = Path(source_file)
-        doc_filename = source_path.stem + '.md'
-        doc_path = docs_dir / doc_filename
-        
-        if doc_path.exists():
-            doc_files_to_process.append(str(doc_path))
+    # Only process docs for source files that actually changed
+    doc_files_to_process = changed_docs()
     
     if not doc_files_to_process:
         print("No documentation files found for changed source files")
@@ -5,6 +5,7 @@ Usage:
   python cicd-cli.py analyze <file>
   python cicd-cli.py gen-docs <file>
   python cicd-cli.py build-site
+  python cicd-cli.py serve [--port 8000]
   python cicd-cli.py full-run
 """
 
@@ -41,6 +42,13 @@ def main():
     # Build Site
     subparsers.add_parser('build-site', help='Build documentation site')
     
+    # Serve
+    serve_parser = subparsers.add_parser('serve', help='Serve the docs site with watch mode and live reload')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    serve_parser.add_argument('--port', default='8000', help='Port to listen on')
+    serve_parser.add_argument('--no-source-docs', action='store_true',
+                              help="Only watch docs/, don't regenerate docs for changed sources")
+
     # Full Run
     subparsers.add_parser('full-run', help='Run full pipeline (local simulation)')
 
@@ -53,13 +61,17 @@ def main():
         run_script('code-analyzer.py')
         
     elif args.command == 'gen-docs':
-        if args.file:
-            with open('changed_files.txt', 'w') as f: f.write(args.file)
-        run_script('generate-docs.py')
+        run_script('generate-docs.py', [args.file] if args.file else [])
         
     elif args.command == 'build-site':
         run_script('site_generator.py')
         
+    elif args.command == 'serve':
+        serve_args = ['--host', args.host, '--port', args.port]
+        if args.no_source_docs:
+            serve_args.append('--no-source-docs')
+        run_script('dev_server.py', serve_args)
+
     elif args.command == 'full-run':
         print("🚀 Starting Full Pipeline Simulation")
         print("-" * 50)
@@ -0,0 +1,59 @@
+import unittest
+import sys
+import os
+
+# Add scripts to path (polyglot is a package)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.github', 'scripts')))
+
+from polyglot.dependency_graph import DependencyGraph
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        # app -> service -> (repo <-> models) -> db
+        self.graph = DependencyGraph.from_adjacency({
+            'app.py': ['service.py', 'service.py'],
+            'service.py': ['repo.py'],
+            'repo.py': ['models.py', 'db.py'],
+            'models.py': ['repo.py'],
+            'db.py': [],
+            'cli.py': ['app.py'],
+        })
+
+    def test_forward_and_reverse_lookups(self):
+        self.assertEqual(self.graph.dependencies('app.py'), ['service.py'])
+        self.assertEqual(sorted(self.graph.dependents('repo.py')), ['models.py', 'service.py'])
+        self.assertEqual(self.graph.dependents('missing.py'), [])
+        self.assertEqual(self.graph.edge_count, 6)
+
+    def test_cycles(self):
+        self.assertEqual(self.graph.cycles(), [['models.py', 'repo.py']])
+
+    def test_self_import_is_a_cycle(self):
+        graph = DependencyGraph.from_adjacency({'a.py': ['a.py']})
+        self.assertEqual(graph.cycles(), [['a.py']])
+
+    def test_topological_layers(self):
+        self.assertEqual(self.graph.topological_layers(), [
+            ['db.py'],
+            ['models.py', 'repo.py'],
+            ['service.py'],
+            ['app.py'],
+            ['cli.py'],
+        ])
+
+    def test_bounded_transitive_closure(self):
+        self.assertEqual(
+            sorted(self.graph.transitive_dependents('db.py')),
+            ['app.py', 'cli.py', 'models.py', 'repo.py', 'service.py']
+        )
+        self.assertEqual(self.graph.transitive_dependencies('app.py', max_depth=1), ['service.py'])
+        self.assertEqual(len(self.graph.transitive_dependencies('cli.py', limit=2)), 2)
+
+    def test_deep_chain_does_not_recurse(self):
+        n = 50000
+        graph = DependencyGraph.from_adjacency({f"m{i}": [f"m{i + 1}"] for i in range(n)})
+        self.assertEqual(graph.cycles(), [])
+        self.assertEqual(len(graph.topological_layers()), n + 1)
+
+if __name__ == '__main__':
+    unittest.main()
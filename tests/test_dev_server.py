@@ -0,0 +1,113 @@
+import unittest
+import shutil
+import tempfile
+import threading
+import urllib.request
+import sys
+import os
+from pathlib import Path
+from unittest import mock
+
+# Add scripts to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.github', 'scripts')))
+
+import dev_server
+import site_generator
+
+class TestSnapshots(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.root = Path(self.test_dir)
+        (self.root / 'src').mkdir()
+        (self.root / 'src' / 'app.py').write_text("x = 1", encoding='utf-8')
+        (self.root / 'node_modules').mkdir()
+        (self.root / 'node_modules' / 'lib.js').write_text("x", encoding='utf-8')
+        (self.root / 'README.md').write_text("# hi", encoding='utf-8')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_snapshot_filters_and_prunes(self):
+        found = dev_server.snapshot(self.root, {'.py', '.js'}, {'node_modules'})
+        self.assertEqual(list(found), [str(self.root / 'src' / 'app.py')])
+
+    def test_changed_paths(self):
+        before = dev_server.snapshot(self.root, {'.py'})
+        (self.root / 'src' / 'app.py').write_text("x = 22", encoding='utf-8')
+        (self.root / 'src' / 'new.py').write_text("y = 1", encoding='utf-8')
+        after = dev_server.snapshot(self.root, {'.py'})
+
+        self.assertEqual(dev_server.changed_paths(before, after),
+                         [str(self.root / 'src' / 'app.py'), str(self.root / 'src' / 'new.py')])
+
+class TestDevServer(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.docs = Path(self.test_dir) / 'docs'
+        self.docs.mkdir()
+        (self.docs / 'alpha.md').write_text("# Alpha", encoding='utf-8')
+        self.server = dev_server.DevServer(self.docs, Path(self.test_dir) / 'site', workspace=self.test_dir,
+                                           port=0, source_docs=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_docs_change_rebuilds_and_bumps_version(self):
+        self.server.build()
+        self.server._docs = self.server.snapshot_docs()
+        version = self.server.hub.version
+
+        (self.docs / 'alpha.md').write_text("# Alpha\n\nEdited", encoding='utf-8')
+        self.assertEqual(self.server.poll_docs(), [str(self.docs / 'alpha.md')])
+
+        self.assertEqual(self.server.hub.version, version + 1)
+        self.assertEqual(self.server.poll_docs(), [])
+
+    def test_html_gets_reload_client(self):
+        self.server.build()
+        http = self.server.make_server()
+        threading.Thread(target=http.serve_forever, daemon=True).start()
+        try:
+            port = http.server_address[1]
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/alpha.html") as response:
+                page = response.read().decode('utf-8')
+                self.assertEqual(response.headers['Cache-Control'], 'no-store')
+        finally:
+            http.shutdown()
+            http.server_close()
+
+        self.assertIn(dev_server.RELOAD_PATH, page)
+        self.assertLess(page.index(dev_server.RELOAD_PATH), page.index('</body>'))
+
+    def test_default_site_is_a_throwaway_directory(self):
+        server = dev_server.DevServer(self.docs, workspace=self.test_dir, port=0, source_docs=False)
+        server.build()
+
+        self.assertTrue((server.site_dir / 'alpha.html').exists())
+        self.assertNotEqual(server.site_dir.resolve(), site_generator.SITE_DIR.resolve())
+        server.close()
+        self.assertFalse(server.site_dir.exists())
+        # A given site directory is never removed
+        self.server.build()
+        self.server.close()
+        self.assertTrue(self.server.site_dir.exists())
+
+    def test_changed_sources_are_passed_to_generate_docs(self):
+        self.server._pending_sources = {'src/b.py', 'src/a.py'}
+        with mock.patch.object(dev_server.subprocess, 'run') as run:
+            self.server._regenerate_docs()
+
+        self.assertEqual(run.call_args[0][0][-2:], ['src/a.py', 'src/b.py'])
+        self.assertEqual(os.listdir(self.test_dir), ['docs'])
+
+class TestReloadHub(unittest.TestCase):
+    def test_wait_returns_on_bump(self):
+        hub = dev_server.ReloadHub()
+        threading.Timer(0.05, hub.bump).start()
+        self.assertEqual(hub.wait(0, timeout=5), 1)
+
+    def test_wait_times_out(self):
+        self.assertEqual(dev_server.ReloadHub().wait(0, timeout=0.01), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,6 @@
 import unittest
+import shutil
+import tempfile
 import sys
 import os
 from pathlib import Path
@@ -6,9 +8,14 @@ from pathlib import Path
 # Fix paths
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.github', 'scripts')))
 
-from diagram_generator import DiagramGenerator
+import diagram_generator
+from diagram_generator import DiagramGenerator, DependencyDiagramGenerator, generate_cached_diagram
+from polyglot.polyglot_analyzer import PolyglotAnalyzer
 
 class TestDiagramGenerator(unittest.TestCase):
+    def setUp(self):
+        diagram_generator._diagram_cache.clear()
+
     def test_python_class_diagram(self):
         code = """
 class Animal:
@@ -40,5 +47,139 @@ class User extends BaseEntity {
         self.assertIn("class User", diagram)
         self.assertIn("BaseEntity <|-- User", diagram)
 
+    def test_member_cap_is_reported(self):
+        methods = "\n".join(f"    def m{i}(self): pass" for i in range(8))
+        gen = DiagramGenerator(max_members=5)
+        gen._parse_python(f"class Big:\n{methods}\n")
+        diagram = gen.generate_class_diagram()
+
+        self.assertIn("+m4()", diagram)
+        self.assertNotIn("+m5()", diagram)
+        self.assertIn("+... 3 more methods", diagram)
+
+    def test_tree_sitter_typescript(self):
+        code = """
+export class User extends BaseEntity implements Serializable {
+    private token: string;
+    login(): void {}
+    protected audit() {}
+}
+"""
+        gen = DiagramGenerator()
+        gen.parse_file('user.ts', code, analyzer=PolyglotAnalyzer())
+        diagram = gen.generate_class_diagram()
+
+        self.assertIn("BaseEntity <|-- User", diagram)
+        self.assertIn("Serializable <|-- User", diagram)
+        self.assertIn("-token", diagram)
+        self.assertIn("+login()", diagram)
+        self.assertIn("#audit()", diagram)
+
+    def test_tree_sitter_reuses_tree(self):
+        code = """
+package main
+
+type Base struct {}
+type Server struct {
+    Base
+    Addr string
+}
+
+func (s *Server) Start() {}
+"""
+        analyzer = PolyglotAnalyzer()
+        tree = analyzer.parse(code, '.go')
+        gen = DiagramGenerator()
+        gen.parse_file('server.go', code, analyzer=analyzer, tree=tree)
+        diagram = gen.generate_class_diagram()
+
+        self.assertIn("Base <|-- Server", diagram)
+        self.assertIn("+Addr", diagram)
+        self.assertIn("+Start()", diagram)
+
+    def test_cached_diagram(self):
+        cache_dir = Path(tempfile.mkdtemp())
+        try:
+            code = "class A:\n    def run(self): pass\n"
+            first = generate_cached_diagram('a.py', code, analyzer=PolyglotAnalyzer(), cache_dir=cache_dir)
+            self.assertIn("+run()", first)
+            self.assertEqual(len(list(cache_dir.glob('*.mmd'))), 1)
+
+            # Disk hit: a fresh process-level cache must not need a parser
+            class Unused:
+                parsers = {'py': None}
+            diagram_generator._diagram_cache.clear()
+            self.assertEqual(generate_cached_diagram('a.py', code, analyzer=Unused(), cache_dir=cache_dir), first)
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_cache_key_includes_parser(self):
+        cache_dir = Path(tempfile.mkdtemp())
+        try:
+            class NoParsers:
+                parsers = {}
+            code = "class A:\n    def run(self): pass\n"
+            generate_cached_diagram('a.py', code, analyzer=NoParsers(), cache_dir=cache_dir)
+            generate_cached_diagram('a.py', code, analyzer=PolyglotAnalyzer(), cache_dir=cache_dir)
+
+            # The fallback diagram isn't reused once Tree-sitter handles the file
+            self.assertEqual(len(list(cache_dir.glob('*.mmd'))), 2)
+        finally:
+            shutil.rmtree(cache_dir)
+
+class TestDependencyDiagramGenerator(unittest.TestCase):
+    def setUp(self):
+        self.graph = {
+            'api/users.py': ['core/db.py', 'core/auth.py'],
+            'api/orders.py': ['core/db.py', 'api/users.py'],
+            'core/db.py': [],
+            'core/auth.py': ['core/db.py'],
+            'cli.py': ['api/users.py'],
+        }
+
+    def test_small_graph_renders_files(self):
+        gen = DependencyDiagramGenerator(self.graph, max_nodes=10)
+        diagram = gen.generate_overview()
+
+        self.assertTrue(diagram.startswith("flowchart LR"))
+        self.assertIn('["api/users.py"]', diagram)
+        self.assertIn('subgraph', diagram)
+        self.assertEqual(len(gen.generate_pages()), 1)
+
+    def test_large_graph_collapses_and_splits(self):
+        gen = DependencyDiagramGenerator(self.graph, max_nodes=3)
+        overview = gen.generate_overview()
+
+        self.assertIn('["api (2 files)"]', overview)
+        self.assertIn('click', overview)
+        self.assertIn('"core.md"', overview)
+        self.assertIn('-->|3|', overview) # three file-level edges from api into core
+
+        pages = gen.generate_pages()
+        self.assertEqual(sorted(pages), ['api.md', 'core.md', 'index.md', 'top-level.md'])
+        self.assertIn('(core.md)', pages['index.md'])
+        self.assertIn('["core/"]', pages['api.md'])
+        self.assertIn('click', pages['api.md'])
+        self.assertNotIn('.html', pages['index.md'] + pages['api.md'])
+
+    def test_slugs_never_collide(self):
+        graph = {'main.py': ['index/a.py', 'top-level/b.py', 'a b/c.py', 'a-b/d.py']}
+        gen = DependencyDiagramGenerator(graph, max_nodes=2)
+        pages = gen.generate_pages()
+
+        self.assertEqual(gen.slug('.'), 'top-level')
+        self.assertEqual(sorted(pages), ['a-b-2.md', 'a-b.md', 'index-2.md', 'index.md',
+                                         'top-level-2.md', 'top-level.md'])
+        self.assertIn('# Dependency Graph: .', pages['top-level.md'])
+        self.assertIn('# Dependency Graph: top-level', pages['top-level-2.md'])
+
+    def test_top_k_pruning(self):
+        graph = {f"pkg{i}/m.py": ['hub/core.py'] for i in range(20)}
+        gen = DependencyDiagramGenerator(graph, max_nodes=5)
+        overview = gen.generate_overview()
+
+        self.assertIn('hub (1 files)', overview)
+        self.assertIn('16 less-connected nodes omitted', overview)
+
 if __name__ == '__main__':
     unittest.main()
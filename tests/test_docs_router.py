@@ -0,0 +1,99 @@
+import unittest
+import tempfile
+import sys
+import os
+from pathlib import Path
+
+# Add scripts to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.github', 'scripts')))
+
+import docs_router
+from docs_router import DocsRouter, glob_to_regex, load_routing_config, parse_simple_yaml
+
+ROUTING = """# Routing
+routes:
+  # API modules
+  - glob: "**/auth*"
+    pages: "api/authentication.md"
+    wiki: "Authentication-API"
+
+  - glob: "**/*test*"
+    pages: "guides/testing.md"
+    wiki: Testing-Guide   # unquoted
+
+strategy:
+  prefer_rules: true              # Try rules first
+  llm_fallback: false
+"""
+
+
+class TestGlobs(unittest.TestCase):
+    def matches(self, glob, path):
+        import re
+        return re.fullmatch(glob_to_regex(glob), path) is not None
+
+    def test_double_star_prefix(self):
+        self.assertTrue(self.matches('**/auth*', 'auth.ts'))
+        self.assertTrue(self.matches('**/auth*', 'src/services/auth_service.py'))
+        self.assertFalse(self.matches('**/auth*', 'src/oauth.py'))
+
+    def test_directory_covers_contents(self):
+        self.assertTrue(self.matches('**/auth*', 'src/auth/login.ts'))
+        self.assertTrue(self.matches('src/**', 'src/a/b/c.py'))
+
+    def test_single_star_stays_in_segment(self):
+        self.assertTrue(self.matches('src/*.py', 'src/app.py'))
+        self.assertFalse(self.matches('src/*.py', 'lib/src/app.py'))
+        self.assertTrue(self.matches('src/?.py', 'src/a.py'))
+
+
+class TestRoutingConfig(unittest.TestCase):
+    def test_simple_parser(self):
+        config = parse_simple_yaml(ROUTING)
+
+        self.assertEqual(config['routes'][0], {
+            'glob': '**/auth*', 'pages': 'api/authentication.md', 'wiki': 'Authentication-API'
+        })
+        self.assertEqual(config['routes'][1]['wiki'], 'Testing-Guide')
+        self.assertEqual(config['strategy'], {'prefer_rules': True, 'llm_fallback': False})
+
+    def test_simple_parser_agrees_with_repo_config(self):
+        path = Path(__file__).parent.parent / '.github' / 'docs-routing.yml'
+        config = parse_simple_yaml(path.read_text())
+        self.assertEqual(len(config['routes']), 9)
+        self.assertTrue(all(set(r) == {'glob', 'pages', 'wiki'} for r in config['routes']))
+        if docs_router.yaml:
+            self.assertEqual(config, docs_router.yaml.safe_load(path.read_text()))
+
+    def test_missing_file(self):
+        self.assertEqual(load_routing_config(Path(tempfile.gettempdir()) / 'no-such-routing.yml'), {})
+
+
+class TestDocsRouter(unittest.TestCase):
+    def setUp(self):
+        self.router = DocsRouter(parse_simple_yaml(ROUTING)['routes'], {'llm_fallback': False})
+
+    def test_first_rule_wins(self):
+        # Matches both rules; file order decides
+        self.assertEqual(self.router.match('tests/auth_test.py')['wiki'], 'Authentication-API')
+        self.assertEqual(self.router.match('tests/login_test.py')['wiki'], 'Testing-Guide')
+
+    def test_hit_rate(self):
+        self.router.match('src/auth.py')
+        self.router.match('src/billing.py')
+
+        self.assertIsNone(self.router.match('src/app.py'))
+        self.assertAlmostEqual(self.router.hit_rate(), 1 / 3)
+        self.assertIn('1/3', self.router.report())
+
+    def test_strategy_defaults(self):
+        self.assertEqual(self.router.strategy, {'prefer_rules': True, 'llm_fallback': False})
+
+    def test_no_routes(self):
+        router = DocsRouter([])
+        self.assertIsNone(router.match('src/auth.py'))
+        self.assertEqual(router.hit_rate(), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
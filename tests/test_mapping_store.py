@@ -0,0 +1,184 @@
+import unittest
+import shutil
+import tempfile
+import threading
+import json
+import sys
+import os
+from pathlib import Path
+
+# Add scripts to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.github', 'scripts')))
+
+from mapping_store import MappingStore
+
+PAGES_MAPPING = {
+    'version': '1.0',
+    'last_updated': '2025-01-01T00:00:00',
+    'file_to_page': {
+        'auth.ts': ['api/auth.md', 'features/auth.md'],
+        'db.ts': 'modules/db.md',
+    },
+    'page_metadata': {
+        'api/auth.md': {'created': '2025-01-01', 'sources': ['auth.ts'], 'last_action': 'create'},
+        'features/auth.md': {'created': '2025-01-01', 'sources': ['auth.ts']},
+        'modules/db.md': {'created': '2025-01-01', 'sources': ['db.ts']},
+    },
+    'site_structure': {'index.md': {'title': 'Home'}},
+}
+
+
+class TestMappingStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.json_path = self.tmp / 'pages-mapping.json'
+        self.json_path.write_text(json.dumps(PAGES_MAPPING))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def open(self, **kwargs):
+        kwargs.setdefault('multi_page', True)
+        kwargs.setdefault('files_key', 'sources')
+        store = MappingStore(self.json_path, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_import_and_lookups(self):
+        store = self.open()
+
+        self.assertEqual(store.pages_for('auth.ts'), ['api/auth.md', 'features/auth.md'])
+        self.assertEqual(store.pages_for('db.ts'), ['modules/db.md'])
+        self.assertEqual(store.files_for('api/auth.md'), ['auth.ts'])
+        self.assertEqual(store.page_metadata('api/auth.md')['last_action'], 'create')
+        self.assertEqual(store.get('site_structure'), {'index.md': {'title': 'Home'}})
+        self.assertEqual(store.page_count(), 3)
+        self.assertEqual(store.file_count(), 2)
+
+    def test_export_round_trip(self):
+        store = self.open()
+        store.export_json()
+
+        exported = json.loads(self.json_path.read_text())
+        expected = dict(PAGES_MAPPING)
+        expected['file_to_page'] = {'auth.ts': ['api/auth.md', 'features/auth.md'], 'db.ts': ['modules/db.md']}
+        del expected['last_updated']
+        del exported['last_updated']
+        self.assertEqual(exported, expected)
+
+        # The export is what the store already holds, so reopening doesn't re-import
+        self.assertFalse(self.open().sync_from_json())
+
+    def test_record_upserts(self):
+        store = self.open()
+        store.record('auth.ts', 'api/auth.md', last_action='append')
+        store.record('auth.ts', 'modules/auth.md', last_action='create')
+
+        self.assertEqual(store.pages_for('auth.ts'), ['api/auth.md', 'features/auth.md', 'modules/auth.md'])
+        self.assertEqual(store.page_metadata('api/auth.md')['last_action'], 'append')
+        self.assertEqual(store.page_metadata('api/auth.md')['created'], '2025-01-01')
+        self.assertIn('created', store.page_metadata('modules/auth.md'))
+
+    def test_single_page_record_replaces(self):
+        self.json_path.write_text(json.dumps({
+            'file_to_page': {'auth.ts': 'Auth'},
+            'page_metadata': {'Auth': {'files': ['auth.ts']}, 'Old': {'files': ['auth.ts']}},
+        }))
+        store = self.open(multi_page=False, files_key='files')
+        # The stale entry under Old is dropped on import
+        self.assertEqual(store.files_for('Old'), [])
+
+        store.record('auth.ts', 'Security')
+        self.assertEqual(store.page_for('auth.ts'), 'Security')
+        self.assertEqual(store.files_for('Auth'), [])
+        self.assertEqual(store.to_dict()['file_to_page'], {'auth.ts': 'Security'})
+
+    def test_reimports_changed_json(self):
+        store = self.open()
+        store.record('new.ts', 'api/new.md')
+
+        changed = dict(PAGES_MAPPING, file_to_page={'db.ts': ['modules/db.md']})
+        self.json_path.write_text(json.dumps(changed))
+
+        # The new file's mapping is taken; what this store recorded stays on top of it
+        self.assertTrue(store.sync_from_json())
+        self.assertEqual(store.pages_for('db.ts'), ['modules/db.md'])
+        self.assertEqual(store.pages_for('new.ts'), ['api/new.md'])
+
+    def test_export_merges_with_a_newer_json(self):
+        first = self.open(db_path=self.tmp / 'first.db')
+        second = self.open(db_path=self.tmp / 'second.db')
+        first.record('one.ts', 'api/one.md')
+        second.record('two.ts', 'api/two.md')
+        second.record('auth.ts', 'api/auth.md', last_action='append')
+
+        first.export_json()
+        second.export_json()
+
+        exported = json.loads(self.json_path.read_text())
+        self.assertEqual(exported['file_to_page']['one.ts'], ['api/one.md'])
+        self.assertEqual(exported['file_to_page']['two.ts'], ['api/two.md'])
+        self.assertEqual(exported['page_metadata']['api/auth.md']['last_action'], 'append')
+        self.assertEqual(exported['page_metadata']['api/auth.md']['created'], '2025-01-01')
+
+        # Once exported, a later re-import no longer re-applies them
+        self.json_path.write_text(json.dumps(PAGES_MAPPING))
+        second.sync_from_json()
+        self.assertEqual(second.pages_for('two.ts'), [])
+
+    def test_single_page_merge_keeps_the_local_move(self):
+        self.json_path.write_text(json.dumps({'file_to_page': {'auth.ts': 'Auth'},
+                                              'page_metadata': {'Auth': {'files': ['auth.ts']}}}))
+        first = self.open(multi_page=False, files_key='files', db_path=self.tmp / 'first.db')
+        second = self.open(multi_page=False, files_key='files', db_path=self.tmp / 'second.db')
+        first.record('db.ts', 'Database')
+        second.record('auth.ts', 'Security')
+
+        first.export_json()
+        second.export_json()
+        self.assertEqual(json.loads(self.json_path.read_text())['file_to_page'],
+                         {'db.ts': 'Database', 'auth.ts': 'Security'})
+
+    def test_defaults_without_json(self):
+        self.json_path.unlink()
+        store = self.open(defaults={'version': '1.0'})
+
+        self.assertEqual(store.get('version'), '1.0')
+        self.assertEqual(store.to_dict()['file_to_page'], {})
+
+    def test_transaction_rolls_back(self):
+        store = self.open()
+        with self.assertRaises(RuntimeError):
+            with store.transaction():
+                store.record('tmp.ts', 'api/tmp.md')
+                raise RuntimeError('boom')
+
+        self.assertEqual(store.pages_for('tmp.ts'), [])
+
+    def test_concurrent_writers(self):
+        self.open()  # import once up front
+        errors = []
+
+        def worker(n):
+            try:
+                store = MappingStore(self.json_path, multi_page=True, files_key='sources')
+                for i in range(20):
+                    store.record(f"w{n}_{i}.ts", f"api/page{i % 5}.md")
+                store.close()
+            except Exception as e:  # surfaced below
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        store = self.open()
+        self.assertEqual(store.file_count(), 2 + 80)
+        self.assertEqual(len(store.files_for('api/page0.md')), 16)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,225 @@
+import unittest
+import sys
+import os
+
+# Add scripts to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.github', 'scripts')))
+
+from markdown_sections import (MarkdownDocument, MergeConflict, first_heading, normalize_title, single_root,
+                               strip_fences, structural_merge)
+
+DOCS_DIR = os.path.join(os.path.dirname(__file__), '..', 'docs')
+
+# wiki-manager.py uses a hyphen, so load it with importlib
+import importlib.util
+spec = importlib.util.spec_from_file_location(
+    "wiki_manager", os.path.join(os.path.dirname(__file__), '..', '.github', 'scripts', 'wiki-manager.py'))
+wiki_manager = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(wiki_manager)
+
+
+def read_doc(name):
+    with open(os.path.join(DOCS_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+PAGE = """---
+title: Auth
+---
+
+Intro text.
+
+# auth.ts
+
+Overview.
+
+## `login()`
+
+Old login docs.
+
+```python
+# not a heading
+```
+
+### Parameters
+
+- user
+
+## logout()
+
+Logout docs.
+
+# payments.ts
+
+Payments.
+"""
+
+class TestMarkdownDocument(unittest.TestCase):
+    def test_sections_skip_frontmatter_and_fences(self):
+        doc = MarkdownDocument(PAGE)
+        self.assertEqual([(level, title) for level, title, _ in doc.sections],
+                         [(1, 'auth.ts'), (2, '`login()`'), (3, 'Parameters'), (2, 'logout()'), (1, 'payments.ts')])
+
+    def test_section_includes_subsections(self):
+        doc = MarkdownDocument(PAGE)
+        text = doc.text(doc.find('login'))
+
+        self.assertTrue(text.startswith('## `login()`'))
+        self.assertIn('### Parameters', text)
+        self.assertNotIn('logout', text)
+        self.assertEqual(doc.path(2), ['auth.ts', '`login()`', 'Parameters'])
+
+    def test_replace_splices_in_place(self):
+        doc = MarkdownDocument(PAGE)
+        merged = doc.replace(doc.find('login'), "## `login()`\n\nNew login docs.")
+
+        self.assertIn("## `login()`\n\nNew login docs.\n\n## logout()", merged)
+        self.assertNotIn('Old login docs', merged)
+        self.assertTrue(merged.startswith("---\ntitle: Auth\n---\n\nIntro text."))
+        self.assertTrue(merged.endswith("# payments.ts\n\nPayments.\n"))
+
+    def test_replace_restores_dropped_heading(self):
+        doc = MarkdownDocument(PAGE)
+        merged = doc.replace(doc.find('logout'), "Only a body.")
+        self.assertIn("## logout()\n\nOnly a body.\n\n# payments.ts", merged)
+
+    def test_find_missing_and_helpers(self):
+        self.assertIsNone(MarkdownDocument(PAGE).find('refresh'))
+        self.assertEqual(normalize_title('🏗️ Structure'), 'structure')
+        self.assertEqual(first_heading("text\n\n# email.ts\n"), 'email.ts')
+        self.assertEqual(strip_fences("```markdown\n# A\n```"), '# A')
+
+OLD_SECTION = """# auth.ts
+
+Old overview.
+
+## `login()`
+
+Old login.
+
+### Parameters
+
+- user
+
+## `logout()`
+
+Bye.
+
+## `legacy()`
+
+Gone soon.
+"""
+
+NEW_DOC = """# auth.ts
+
+New overview.
+
+## `login(user, opts)`
+
+New login.
+
+### Parameters
+
+- user
+- opts
+
+## `logout()`
+
+Bye.
+
+## `refresh()`
+
+Refresh tokens.
+"""
+
+class TestStructuralMerge(unittest.TestCase):
+    def test_adds_replaces_and_removes_by_symbol(self):
+        merged, stats = structural_merge(OLD_SECTION, NEW_DOC)
+
+        self.assertEqual(stats, {'added': 1, 'replaced': 1, 'removed': 1, 'unchanged': 1})
+        self.assertEqual(merged, NEW_DOC)
+
+    def test_keeps_old_heading_level(self):
+        merged, _ = structural_merge("## auth.ts\n\nOld.\n\n### `login()`\n\nOld login.\n", NEW_DOC)
+
+        self.assertTrue(merged.startswith("## auth.ts\n\nNew overview."))
+        self.assertIn("### `login(user, opts)`", merged)
+        self.assertIn("#### Parameters", merged)
+
+    def test_ambiguous_structures_conflict(self):
+        duplicate = "# auth.ts\n\n## login\n\na\n\n## login\n\nb\n"
+        unrelated = "# auth.ts\n\n## Usage\n\nx\n"
+        two_roots = NEW_DOC + "\n# extra\n"
+
+        for old, new in ((duplicate, NEW_DOC), (unrelated, "# auth.ts\n\n## Setup\n\ny\n"),
+                         (OLD_SECTION, two_roots), (OLD_SECTION, "# auth.ts\n\nflat\n")):
+            with self.assertRaises(MergeConflict):
+                structural_merge(old, new)
+
+    def test_different_root_heading_conflicts(self):
+        # A hand-written section targeted by section_title must not be overwritten
+        with self.assertRaises(MergeConflict):
+            structural_merge("## Sessions\n\nHand-written notes.\n\n### `login()`\n\nx\n", NEW_DOC)
+
+    def test_changed_leaf_conflicts(self):
+        with self.assertRaises(MergeConflict):
+            structural_merge("## auth.ts\n\nHand-written notes.\n", NEW_DOC)
+        merged, _ = structural_merge("## auth.ts\n\nNew overview.\n", NEW_DOC)
+        self.assertIn("### `refresh()`", merged)
+
+    def test_splice_into_page(self):
+        page = "---\ntitle: Auth\n---\n\n" + OLD_SECTION + "\n# payments.ts\n\nPay.\n"
+        doc = MarkdownDocument(page)
+        index = doc.find(first_heading(NEW_DOC))
+
+        merged, _ = structural_merge(doc.text(index), NEW_DOC)
+        result = doc.replace(index, merged)
+
+        self.assertIn("Refresh tokens.\n\n# payments.ts", result)
+        self.assertNotIn("legacy", result)
+
+class TestGeneratedDocs(unittest.TestCase):
+    """Docs as generate-docs writes them: a '# auth.ts' stub, then the LLM's own '# ...' headings"""
+
+    def setUp(self):
+        self.auth = read_doc('auth.md')
+        self.database = read_doc('database.md')
+        self.manager = wiki_manager.WikiManager.__new__(wiki_manager.WikiManager)
+        self.manager.merge_stats = {'structural': 0, 'llm': 0, 'appended': 0}
+
+    def test_single_root(self):
+        doc = MarkdownDocument(single_root(self.auth))
+
+        self.assertGreater(len([s for s in MarkdownDocument(self.auth).sections if s[0] == 1]), 1)
+        self.assertEqual([s for s in doc.sections if s[0] == 1], [doc.sections[0]])
+        self.assertEqual(doc.span(0), (0, len(doc.lines)))
+        self.assertEqual(single_root(single_root(self.auth)), single_root(self.auth))
+
+    def test_block_covers_the_whole_legacy_doc(self):
+        page = "# Authentication\n\n" + self.auth + "\n\n---\n\n" + self.database
+        doc = MarkdownDocument(page)
+        block = doc.block_text(doc.find('auth.ts'))
+
+        self.assertEqual(block.strip().rstrip('-').strip(), self.auth.strip())
+
+    def test_regenerated_doc_replaces_its_block_once(self):
+        # A wiki page holding two docs as they were written before single_root()
+        page = "# Authentication\n\n*Last updated: x*\n\n" + self.auth + "\n\n---\n\n" + self.database
+        regenerated = self.auth.replace('minimal, type‑safe API', 'small, typed API')
+
+        merged = self.manager._merge_wiki_content(page, regenerated, 'Authentication')
+
+        self.assertEqual(self.manager.merge_stats, {'structural': 1, 'llm': 0, 'appended': 0})
+        # The doc's content appears once, not once per run
+        self.assertEqual(merged.count('Authentication Module'), 1)
+        self.assertEqual(merged.count('small, typed API'), 1)
+        self.assertNotIn('minimal, type‑safe API', merged)
+        # The other doc on the page is untouched
+        self.assertTrue(merged.endswith(self.database))
+
+        # Merging again changes nothing
+        again = self.manager._merge_wiki_content(merged, regenerated, 'Authentication')
+        self.assertEqual(again, merged)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import json
+import time
+import threading
+import sys
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add scripts to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.github', 'scripts')))
+
+from notifier import Notifier, Sink, configured_sinks, PUSHBULLET_URL
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Local webhook: /ok -> 204, /slow -> 204 after a delay, /fail -> 500"""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.received.append((self.path, json.loads(body), self.headers.get('Access-Token')))
+        if self.path == '/slow':
+            time.sleep(1.0)
+        status = 500 if self.path == '/fail' else 204
+        self.send_response(status)
+        self.end_headers()
+        if status == 500:
+            self.wfile.write(b'boom')
+
+    def log_message(self, *args):
+        pass
+
+
+class TestNotifier(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+        self.server.received = []
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def sink(self, path, **kwargs):
+        return Sink(path.strip('/').title(), self.base + path, **kwargs)
+
+    def test_delivers_to_every_sink(self):
+        deliveries = Notifier().dispatch([
+            (self.sink('/ok'), {'n': 1}),
+            (self.sink('/ok', headers={'Access-Token': 'secret'}), {'n': 2}),
+        ])
+
+        self.assertTrue(all(d.ok for d in deliveries))
+        self.assertEqual(sorted(body['n'] for _, body, _ in self.server.received), [1, 2])
+        self.assertIn('secret', [token for _, _, token in self.server.received])
+        self.assertTrue(all(d.latency > 0 for d in deliveries))
+
+    def test_failures_are_reported_per_sink(self):
+        ok, failed = Notifier().dispatch([(self.sink('/ok'), {}), (self.sink('/fail'), {})])
+
+        self.assertTrue(ok.ok)
+        self.assertFalse(failed.ok)
+        self.assertEqual(failed.status, 500)
+        self.assertIn('HTTP 500: boom', failed.describe())
+
+    def test_slow_sink_is_bounded_by_the_deadline(self):
+        start = time.monotonic()
+        slow, ok = Notifier(deadline=0.3).dispatch([(self.sink('/slow'), {}), (self.sink('/ok'), {})])
+
+        # The fast sink isn't held up, and the dispatch returns at the deadline
+        self.assertLess(time.monotonic() - start, 0.9)
+        self.assertTrue(ok.ok)
+        self.assertFalse(slow.ok)
+        self.assertEqual(slow.error, 'deadline exceeded')
+        # The request went out, so it may still land
+        self.assertTrue(slow.unknown)
+        self.assertIn('may have been delivered', slow.describe())
+        self.assertFalse(ok.unknown)
+
+    def test_unreachable_sink(self):
+        self.server.server_close()
+        delivery, = Notifier(deadline=2).dispatch([(Sink('Gone', 'http://127.0.0.1:9/hook'), {})])
+        self.assertFalse(delivery.ok)
+        self.assertIsNone(delivery.status)
+        self.assertFalse(delivery.unknown)
+
+    def test_no_messages(self):
+        self.assertEqual(Notifier().dispatch([]), [])
+
+
+class TestConfiguredSinks(unittest.TestCase):
+    def test_only_configured_sinks(self):
+        sinks = configured_sinks({'DISCORD_WEBHOOK_URL': 'https://discord/x', 'PUSHBULLET': 'tok', 'SLACK_WEBHOOK_URL': ''})
+
+        self.assertEqual(list(sinks), ['discord', 'pushbullet'])
+        self.assertEqual(sinks['pushbullet'].url, PUSHBULLET_URL)
+        self.assertEqual(sinks['pushbullet'].headers, {'Access-Token': 'tok'})
+
+
+if __name__ == '__main__':
+    unittest.main()
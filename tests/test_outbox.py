@@ -0,0 +1,368 @@
+import unittest
+import shutil
+import tempfile
+import json
+import threading
+import subprocess
+import time
+import sys
+import os
+from pathlib import Path
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add scripts to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.github', 'scripts')))
+
+import outbox
+from outbox import Outbox
+from notifier import Delivery, Notifier, Sink
+
+# send-notifications.py uses a hyphen, so load it with importlib
+import importlib.util
+spec = importlib.util.spec_from_file_location(
+    "send_notifications", os.path.join(os.path.dirname(__file__), '..', '.github', 'scripts', 'send-notifications.py'))
+send_notifications = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(send_notifications)
+
+
+class Webhook(BaseHTTPRequestHandler):
+    """Local webhook stand-in: answers with the server's scripted (status, headers) responses, then 204"""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.received.append(json.loads(body))
+        status, headers = self.server.script.pop(0) if self.server.script else (204, {})
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def digest(sink_key, events):
+    return {'digest': [e['id'] for e in events]}
+
+
+class TestOutbox(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Webhook)
+        self.server.received = []
+        self.server.script = []
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.clock = Clock()
+        self.sinks = {'discord': Sink('Discord', f"http://127.0.0.1:{self.server.server_address[1]}/hook")}
+        self.notifier = Notifier(deadline=5)
+
+    def outbox(self):
+        return Outbox(self.tmp / 'outbox.json', window=600, clock=self.clock)
+
+    def push(self, box, event_id):
+        box.enqueue('discord', {'single': event_id}, {'id': event_id, 'title': f"commit {event_id}"})
+
+    def flush(self, box, force=False):
+        return box.flush(self.sinks, digest, self.notifier, force=force)
+
+    def test_burst_is_coalesced_into_a_digest(self):
+        box = self.outbox()
+        self.push(box, 'a')
+        self.assertTrue(self.flush(box)[0].ok)
+
+        # Later pushes inside the window are held...
+        for event_id in ('b', 'c', 'd'):
+            self.clock.now += 30
+            self.push(box, event_id)
+            self.assertEqual(self.flush(box), [])
+        # ...and go out together once it closes
+        self.clock.now += 600
+        self.assertTrue(self.flush(box)[0].ok)
+
+        self.assertEqual(self.server.received, [{'single': 'a'}, {'digest': ['b', 'c', 'd']}])
+        self.assertEqual(box.pending, [])
+
+    def test_force_ignores_the_window(self):
+        box = self.outbox()
+        self.push(box, 'a')
+        self.flush(box)
+        self.clock.now += 10
+        self.push(box, 'b')
+
+        self.assertTrue(self.flush(box, force=True)[0].ok)
+        self.assertEqual(self.server.received[-1], {'single': 'b'})
+
+    def test_rerun_replaces_the_queued_event(self):
+        box = self.outbox()
+        self.push(box, 'a')
+        self.push(box, 'a')
+        self.assertEqual(len(box.pending), 1)
+
+    def test_failures_retry_with_backoff(self):
+        self.server.script = [(500, {}), (502, {})]
+        box = self.outbox()
+        self.push(box, 'a')
+
+        self.assertFalse(self.flush(box)[0].ok)
+        self.assertEqual(box.pending[0]['attempts'], 1)
+        self.assertEqual(box.pending[0]['next_attempt'], self.clock.now + outbox.BASE_BACKOFF)
+
+        # Not retried before the backoff elapses
+        self.clock.now += outbox.BASE_BACKOFF - 1
+        self.assertEqual(self.flush(box), [])
+        self.clock.now += 1
+        self.assertFalse(self.flush(box)[0].ok)
+        self.assertEqual(box.pending[0]['next_attempt'], self.clock.now + 2 * outbox.BASE_BACKOFF)
+
+        self.clock.now += 2 * outbox.BASE_BACKOFF
+        self.assertTrue(self.flush(box)[0].ok)
+        self.assertEqual(len(self.server.received), 3)
+        self.assertEqual(box.pending, [])
+
+    def test_gives_up_after_max_attempts(self):
+        self.server.script = [(500, {})] * outbox.MAX_ATTEMPTS
+        box = self.outbox()
+        self.push(box, 'a')
+        for _ in range(outbox.MAX_ATTEMPTS):
+            self.flush(box)
+            self.clock.now += outbox.MAX_BACKOFF
+
+        self.assertEqual(box.pending, [])
+        self.assertEqual(box.dead[0]['event']['id'], 'a')
+        self.assertEqual(box.dead[0]['last_error'], 'HTTP 500')
+
+    def test_rejected_payload_is_not_retried(self):
+        self.server.script = [(400, {})]
+        box = self.outbox()
+        self.push(box, 'a')
+        self.flush(box)
+
+        self.assertEqual(box.pending, [])
+        self.assertEqual(len(box.dead), 1)
+
+    def test_unknown_outcome_is_not_resent(self):
+        class CutOff:
+            def dispatch(self, messages):
+                return [Delivery(sink, False, error='deadline exceeded', unknown=True) for sink, _ in messages]
+
+        box = self.outbox()
+        self.push(box, 'a')
+        box.flush(self.sinks, digest, CutOff())
+
+        self.assertEqual(box.pending, [])
+        self.assertEqual(box.dead, [])
+        # It counts as a send for the coalescing window
+        self.push(box, 'b')
+        self.assertEqual(self.flush(box), [])
+
+    def test_rate_limit_is_respected(self):
+        self.server.script = [(429, {'Retry-After': '120'})]
+        box = self.outbox()
+        self.push(box, 'a')
+
+        delivery, = self.flush(box)
+        self.assertEqual(delivery.retry_after, 120)
+        # A 429 doesn't spend an attempt, but blocks the sink as asked
+        self.assertEqual(box.pending[0]['attempts'], 0)
+        self.clock.now += 60
+        self.assertEqual(self.flush(box), [])
+        self.clock.now += 60
+        self.assertTrue(self.flush(box)[0].ok)
+
+    def test_event_without_payload_goes_out_as_a_digest(self):
+        box = self.outbox()
+        box.enqueue('discord', None, {'id': 'a'})
+        self.flush(box)
+        self.assertEqual(self.server.received, [{'digest': ['a']}])
+
+    def test_survives_a_restart(self):
+        box = self.outbox()
+        self.push(box, 'a')
+        self.flush(box)
+        self.push(box, 'b')
+        box.save()
+
+        # A later run picks up the held event and the window state
+        reloaded = self.outbox()
+        self.assertEqual([item['event']['id'] for item in reloaded.pending], ['b'])
+        self.assertEqual(self.flush(reloaded), [])
+        self.clock.now += 600
+        self.assertTrue(self.flush(reloaded)[0].ok)
+        self.assertFalse((self.tmp / 'outbox.json.tmp').exists())
+
+
+class TestQueueNewCommits(unittest.TestCase):
+    """Runs that were cancelled while waiting for the outbox still get their commits queued"""
+
+    def setUp(self):
+        self.repo = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.repo)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.repo)
+        self.git('init', '-q')
+        self.git('config', 'user.email', 'dev@example.com')
+        self.git('config', 'user.name', 'dev')
+        self.box = Outbox(self.repo / 'outbox.json')
+        self.sinks = {'discord': Sink('Discord', 'http://127.0.0.1:9/hook')}
+        self.service = send_notifications.NotificationService()
+
+    def git(self, *args):
+        return subprocess.run(['git', *args], check=True, capture_output=True, text=True).stdout.strip()
+
+    def commit(self, message):
+        (self.repo / 'file.txt').write_text(message)
+        self.git('add', 'file.txt')
+        self.git('commit', '-q', '-m', message)
+        return self.git('rev-parse', 'HEAD')
+
+    def run_for(self, sha, running=()):
+        """queue_new_commits as the push run for `sha` would call it, while the runs for `running` are going"""
+        current = {'event': {'id': sha, 'sha': sha[:7], 'title': 'full'}, 'payloads': {'discord': {'full': sha}}}
+        return send_notifications.queue_new_commits(self.box, self.sinks, self.service, current,
+                                                    in_flight=lambda commit: commit in running)
+
+    def flush(self, running=()):
+        return send_notifications.queue_new_commits(self.box, self.sinks, self.service,
+                                                    in_flight=lambda commit: commit in running)
+
+    def queued(self):
+        return [(item['event']['title'], item['payload']) for item in self.box.pending]
+
+    def test_first_run_queues_only_its_push(self):
+        self.commit('one')
+        two = self.commit('two')
+
+        self.assertEqual(self.run_for(two), 1)
+        self.assertEqual(self.queued(), [('full', {'full': two})])
+        self.assertEqual(self.box.head, two)
+
+    def test_catches_up_on_cancelled_runs(self):
+        self.run_for(self.commit('one'))
+        self.box.pending = []
+        self.commit('feat: two')
+        self.commit('docs: Auto-update documentation [skip ci]')
+        four = self.commit('fix: four')
+
+        # The runs for 'two' never got the outbox; the bot's commit is never announced
+        self.assertEqual(self.run_for(four), 2)
+        self.assertEqual(self.queued(), [('feat: two', None), ('full', {'full': four})])
+        self.assertEqual(self.box.pending[0]['event']['files'], 1)
+        self.assertEqual(self.box.head, four)
+
+    def test_late_run_is_not_sent_twice(self):
+        self.run_for(self.commit('one'))
+        self.box.pending = []
+        two = self.commit('two')
+        three = self.commit('three')
+        self.run_for(three)
+        self.box.pending = [item for item in self.box.pending if item['event']['id'] != two]
+
+        # 'two's run was reported finished, so it was sent as part of the run for
+        # 'three': if its notify job still turns up, it queues nothing...
+        self.assertEqual(self.run_for(two), 0)
+        self.assertEqual([item['event']['id'] for item in self.box.pending], [three])
+        self.assertEqual(self.box.head, three)
+
+    def test_late_run_fills_in_a_waiting_event(self):
+        self.run_for(self.commit('one'))
+        two = self.commit('two')
+        self.run_for(self.commit('three'))
+
+        # ...but if it's still waiting, it gets the run's full payload
+        self.run_for(two)
+        self.assertIn(('full', {'full': two}), self.queued())
+        self.assertEqual(len(self.box.pending), 3)
+
+    def test_flush_only_records_where_it_started(self):
+        one = self.commit('one')
+        self.assertEqual(self.flush(), 0)
+        self.assertEqual(self.box.head, one)
+
+        self.commit('two')
+        self.assertEqual(self.flush(), 1)
+
+    def test_running_commit_is_left_to_its_own_run(self):
+        self.run_for(self.commit('one'))
+        self.box.pending = []
+        two = self.commit('two')
+        three = self.commit('three')
+
+        # 'two' is still being documented when 'three's run gets the outbox
+        self.assertEqual(self.run_for(three, running={two}), 1)
+        self.assertEqual(self.box.deferred, [two])
+        # ...so its own run queues the full notification
+        self.assertEqual(self.run_for(two), 1)
+        self.assertIn(('full', {'full': two}), self.queued())
+        self.assertEqual(self.box.deferred, [])
+
+    def test_scheduled_flush_waits_for_running_pushes(self):
+        self.run_for(self.commit('one'))
+        self.box.pending = []
+        two = self.commit('two')
+
+        self.assertEqual(self.flush(running={two}), 0)
+        self.assertEqual(self.box.pending, [])
+        self.assertEqual(self.flush(running={two}), 0)
+        # The run ended without notifying (cancelled): summarize it from git
+        self.assertEqual(self.flush(), 1)
+        self.assertEqual(self.queued(), [('two', None)])
+        self.assertEqual(self.box.deferred, [])
+        self.assertEqual(self.flush(), 0)
+
+    def test_run_status(self):
+        sha = self.commit('one')
+        with mock.patch.object(send_notifications, 'command', side_effect=lambda *args: {
+                'gh': '[{"status": "completed"}, {"status": "in_progress"}]'}.get(args[0])):
+            self.assertTrue(send_notifications.run_in_flight(sha))
+        with mock.patch.object(send_notifications, 'command', side_effect=lambda *args: {
+                'gh': '[{"status": "completed"}]'}.get(args[0])):
+            self.assertFalse(send_notifications.run_in_flight(sha))
+        # Without gh, a fresh commit's run is assumed to be going
+        with mock.patch.object(send_notifications, 'command', side_effect=lambda *args: {
+                'git': '%d' % time.time()}.get(args[0])):
+            self.assertTrue(send_notifications.run_in_flight(sha))
+        with mock.patch.object(send_notifications, 'command', side_effect=lambda *args: {
+                'git': '%d' % (time.time() - send_notifications.SETTLE_AFTER - 1)}.get(args[0])):
+            self.assertFalse(send_notifications.run_in_flight(sha))
+
+
+class TestDigestPayloads(unittest.TestCase):
+    def setUp(self):
+        self.service = send_notifications.NotificationService()
+        self.events = [{'id': f"sha{i}", 'sha': f"sha{i}"[:7], 'title': f"Commit {i}", 'actor': 'dev',
+                        'url': f"https://ci/{i}", 'files': 2, 'breaking': int(i == 1), 'wiki_pages': 0}
+                       for i in range(20)]
+
+    def test_discord_digest(self):
+        embed = self.service.digest_payload('discord', self.events)['embeds'][0]
+
+        self.assertIn('20 pushes', embed['title'])
+        self.assertIn('... and 5 earlier', embed['description'])
+        self.assertIn('Commit 19', embed['description'])
+        self.assertEqual(embed['fields'][0]['name'], '📄 Files Changed (40)')
+        self.assertIn('https://ci/19', embed['fields'][-1]['value'])
+
+    def test_slack_and_pushbullet_digests(self):
+        slack = self.service.digest_payload('slack', self.events)
+        self.assertIn('20 pushes', slack['blocks'][0]['text']['text'])
+
+        push = self.service.digest_payload('pushbullet', self.events)
+        self.assertEqual(push['type'], 'link')
+        self.assertIn('1 BREAKING', push['body'])
+
+
+if __name__ == '__main__':
+    unittest.main()
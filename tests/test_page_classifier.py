@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+
+# Add scripts to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.github', 'scripts')))
+
+import page_classifier
+from page_classifier import NO_PAGE, PageClassifier, path_features
+
+HISTORY = [
+    ('tests/test_auth.py', 'Testing-Guide'),
+    ('tests/test_billing.py', 'Testing-Guide'),
+    ('tests/test_users.py', 'Testing-Guide'),
+    ('tests/test_search.py', 'Testing-Guide'),
+    ('src/notify/slack_notifier.py', 'Notification-Service'),
+    ('src/notify/discord_notifier.py', 'Notification-Service'),
+    ('src/notify/email_notifier.py', 'Notification-Service'),
+    ('src/api/users.py', 'API-Users'),
+    ('src/api/orders.py', 'API-Orders'),
+    ('src/utils/format.py', 'Utilities'),
+    ('src/utils/dates.py', 'Utilities'),
+]
+
+
+class TestFeatures(unittest.TestCase):
+    def test_path_features(self):
+        features = path_features('src/api/userAuth.ts')
+
+        self.assertEqual(features.count('auth'), 2)
+        self.assertIn('dir:api', features)
+        self.assertIn('ext:.ts', features)
+
+
+class TestPageClassifier(unittest.TestCase):
+    def setUp(self):
+        self.classifier = PageClassifier().train(HISTORY)
+
+    def test_confident_on_familiar_files(self):
+        page, confidence = self.classifier.predict('tests/test_orders.py')
+        self.assertEqual(page, 'Testing-Guide')
+        self.assertGreaterEqual(confidence, page_classifier.CONFIDENCE_THRESHOLD)
+
+        self.assertEqual(self.classifier.confident('src/notify/sms_notifier.py')[0], 'Notification-Service')
+
+    def test_unsure_on_new_kinds_of_files(self):
+        # Shares only the extension and src/ with history: left to the LLM
+        self.assertIsNone(self.classifier.confident('src/payments/refund.py'))
+
+    def test_unknown_features_give_no_prediction(self):
+        self.assertEqual(self.classifier.predict('lib/kernel.rs'), (None, 0.0))
+
+    def test_needs_enough_history(self):
+        small = PageClassifier().train(HISTORY[:3])
+        self.assertEqual(small.predict('tests/test_orders.py'), (None, 0.0))
+
+    def test_posterior_sums_to_one(self):
+        import math
+        scores = self.classifier.scores('src/api/invoices.py')
+        top = max(scores.values())
+        total = sum(math.exp(s - top) for s in scores.values())
+        _, confidence = self.classifier.predict('src/api/invoices.py')
+        self.assertAlmostEqual(confidence, 1.0 / total)
+
+    def test_no_page_label(self):
+        history = [(path, 'features/notify.md' if 'notify' in path else NO_PAGE) for path, _ in HISTORY]
+        classifier = PageClassifier().train(history)
+
+        self.assertEqual(classifier.confident('tests/test_orders.py')[0], NO_PAGE)
+        self.assertEqual(classifier.confident('src/notify/sms_notifier.py')[0], 'features/notify.md')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import unittest
+import shutil
+import tempfile
+import sys
+import os
+import subprocess
+from pathlib import Path
+from unittest import mock
+
+# Add scripts to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.github', 'scripts')))
+
+from page_index import PageIndex, PageRetriever, blob_id, doc_query, parse_page
+
+PAGE = """---
+title: Authentication
+layout: default
+---
+
+# Auth
+
+Handles login and token refresh
+for every service.
+
+```python
+# not a heading
+```
+
+## Login
+
+Details.
+
+## Tokens
+"""
+
+class TestParsePage(unittest.TestCase):
+    def test_metadata(self):
+        meta = parse_page(PAGE)
+
+        self.assertEqual(meta['title'], 'Authentication')
+        self.assertEqual(meta['frontmatter']['layout'], 'default')
+        self.assertEqual(meta['headings'], [[1, 'Auth'], [2, 'Login'], [2, 'Tokens']])
+        self.assertEqual(meta['summary'], 'Handles login and token refresh for every service.')
+
+    def test_title_falls_back_to_h1(self):
+        self.assertEqual(parse_page("# Payments\n\nText")['title'], 'Payments')
+
+class TestPageIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.pages = Path(self.test_dir) / 'site'
+        (self.pages / 'api').mkdir(parents=True)
+        (self.pages / 'api' / 'auth.md').write_text(PAGE, encoding='utf-8')
+        (self.pages / 'index.md').write_text("# Home", encoding='utf-8')
+        self.index_file = Path(self.test_dir) / 'index.json'
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_refresh_is_incremental_and_persisted(self):
+        index = PageIndex(self.pages, self.index_file)
+        self.assertEqual(index.refresh()['updated'], 2)
+        index.save()
+
+        reloaded = PageIndex(self.pages, self.index_file)
+        self.assertEqual(reloaded.refresh(), {'indexed': 2, 'updated': 0, 'removed': 0})
+        self.assertEqual(reloaded.pages('api/'), ['api/auth.md'])
+
+        (self.pages / 'api' / 'auth.md').write_text(PAGE + "\n## Sessions\n", encoding='utf-8')
+        (self.pages / 'index.md').unlink()
+        stats = reloaded.refresh()
+
+        self.assertEqual((stats['updated'], stats['removed']), (1, 1))
+        self.assertIn([2, 'Sessions'], reloaded.get('api/auth.md')['headings'])
+
+    def test_fresh_checkout_leaves_the_index_untouched(self):
+        index = PageIndex(self.pages, self.index_file)
+        index.refresh()
+        index.save()
+        saved = self.index_file.read_text(encoding='utf-8')
+
+        # A checkout gives every file a new mtime; identical content isn't re-indexed
+        for page in self.pages.rglob('*.md'):
+            os.utime(page, ns=(1, 1))
+        reloaded = PageIndex(self.pages, self.index_file)
+        self.assertEqual(reloaded.refresh()['updated'], 0)
+        self.assertFalse(reloaded.dirty)
+        self.assertNotIn('mtime_ns', saved)
+
+    def test_git_tracked_pages_are_not_read(self):
+        def git(*args):
+            subprocess.run(['git', *args], cwd=self.test_dir, check=True, capture_output=True)
+        try:
+            git('init', '-q')
+            git('add', 'site')
+        except (OSError, subprocess.CalledProcessError):
+            self.skipTest("git unavailable")
+        index = PageIndex(self.pages, self.index_file)
+        index.refresh()
+        index.save()
+        self.assertEqual(index.get('index.md')['blob'], blob_id(b"# Home"))
+
+        reloaded = PageIndex(self.pages, self.index_file)
+        with mock.patch.object(PageIndex, '_read', side_effect=AssertionError("page read")):
+            self.assertEqual(reloaded.refresh()['updated'], 0)
+
+        # Only the page the worktree changed and the untracked one are read
+        (self.pages / 'index.md').write_text("# Home page", encoding='utf-8')
+        (self.pages / 'new.md').write_text("# New", encoding='utf-8')
+        with mock.patch.object(PageIndex, '_read', autospec=True, side_effect=PageIndex._read) as read:
+            self.assertEqual(reloaded.refresh()['updated'], 2)
+        self.assertEqual(sorted(call.args[1] for call in read.call_args_list), ['index.md', 'new.md'])
+
+    def test_refresh_page_with_written_content(self):
+        index = PageIndex(self.pages, self.index_file)
+        index.refresh()
+        content = "# API Reference\n\n- auth\n"
+        (self.pages / 'api' / 'index.md').write_text(content, encoding='utf-8')
+        self.assertTrue(index.refresh_page('api/index.md', content=content))
+
+        self.assertEqual(index.get('api/index.md')['title'], 'API Reference')
+        self.assertEqual(index.refresh()['updated'], 0)
+
+    def test_describe_uses_metadata_only(self):
+        index = PageIndex(self.pages, self.index_file)
+        index.refresh()
+
+        line = index.describe('api/auth.md')
+        self.assertIn('Authentication - Handles login', line)
+        self.assertIn('sections: Login; Tokens', line)
+
+class TestPageRetriever(unittest.TestCase):
+    def setUp(self):
+        self.entries = {
+            'api/authentication.md': {'path': 'api/authentication.md', 'title': 'Authentication',
+                                      'headings': [[2, 'login'], [2, 'refreshToken']], 'summary': 'JWT login flow'},
+            'api/payments.md': {'path': 'api/payments.md', 'title': 'Payments',
+                                'headings': [[2, 'chargeCard']], 'summary': 'Stripe charges and refunds'},
+            'api/index.md': {'path': 'api/index.md', 'title': 'API Reference',
+                             'headings': [], 'summary': 'Authentication, payments and more'},
+            'features/auth-system.md': {'path': 'features/auth-system.md', 'title': 'Auth System',
+                                        'headings': [[2, 'Login']], 'summary': 'How users log in'},
+        }
+
+    def test_ranks_by_relevance_within_prefix(self):
+        retriever = PageRetriever(self.entries)
+        ranked = retriever.top_k("token refresh for login", k=5, prefix='api/', exclude={'api/index.md'})
+
+        self.assertEqual([path for path, _ in ranked], ['api/authentication.md'])
+
+    def test_title_outweighs_summary(self):
+        ranked = PageRetriever(self.entries).top_k("payments", k=2, prefix='api/')
+        self.assertEqual(ranked[0][0], 'api/payments.md')
+
+    def test_doc_query_uses_structure(self):
+        query = doc_query("# auth.ts\n\nHandles sessions.\n\n## verifyToken\n", 'src/auth.ts')
+        for term in ('auth', 'verifyToken', 'sessions'):
+            self.assertIn(term, query)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import shutil
+import tempfile
+import json
+import sys
+import os
+from pathlib import Path
+
+# Add scripts to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.github', 'scripts')))
+
+from provenance import ProvenanceIndex, load_extension_languages, source_from_doc
+
+DOC = """# auth.py
+
+*Auto-generated from `src/services/auth.py`*
+
+## Overview
+"""
+
+
+class TestProvenanceIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.index_file = self.tmp / 'docs-provenance.json'
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_record_and_reload(self):
+        index = ProvenanceIndex(self.index_file)
+        index.record(Path('docs') / 'auth.md', 'src/services/auth.py', 'abc123')
+        index.save()
+
+        reloaded = ProvenanceIndex(self.index_file)
+        entry = reloaded.get('docs/auth.md')
+        self.assertEqual(entry['source'], 'src/services/auth.py')
+        self.assertEqual(entry['hash'], 'abc123')
+        self.assertEqual(entry['language'], 'python')
+
+    def test_resolve_prefers_recorded_entry(self):
+        index = ProvenanceIndex(self.index_file)
+        index.record('docs/auth.md', 'lib/auth.ts', 'abc123')
+
+        self.assertEqual(index.resolve('docs/auth.md', DOC)['source'], 'lib/auth.ts')
+
+    def test_resolve_falls_back_to_doc_header(self):
+        index = ProvenanceIndex(self.index_file)
+
+        entry = index.resolve('docs/auth.md', DOC)
+        self.assertEqual(entry['source'], 'src/services/auth.py')
+        self.assertIsNone(entry['hash'])
+        self.assertIsNone(index.resolve('docs/notes.md', '# Notes\n\nHand written.\n'))
+
+    def test_source_spellings_are_normalized(self):
+        index = ProvenanceIndex(self.index_file)
+        index.record('./docs/auth.md', './lib/auth.ts', 'abc123')
+        self.assertEqual(index.get('docs/auth.md')['source'], 'lib/auth.ts')
+
+        header = DOC.replace('src/services/auth.py', './src/services/auth.py')
+        self.assertEqual(index.resolve('docs/other.md', header)['source'], 'src/services/auth.py')
+
+    def test_save_only_when_dirty(self):
+        ProvenanceIndex(self.index_file).save()
+        self.assertFalse(self.index_file.exists())
+
+    def test_ignores_other_versions(self):
+        self.index_file.write_text(json.dumps({'version': 0, 'docs': {'docs/a.md': {'source': 'a.py'}}}))
+        self.assertIsNone(ProvenanceIndex(self.index_file).get('docs/a.md'))
+
+
+class TestHelpers(unittest.TestCase):
+    def test_source_from_doc(self):
+        self.assertEqual(source_from_doc(DOC), 'src/services/auth.py')
+        self.assertIsNone(source_from_doc('# Title\n'))
+
+    def test_extension_languages(self):
+        languages = load_extension_languages()
+        self.assertEqual(languages['.py'], 'python')
+        self.assertEqual(languages['.tsx'], 'typescript')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,265 @@
+import unittest
+import shutil
+import tempfile
+import json
+import sys
+import os
+from pathlib import Path
+from unittest import mock
+
+# Add scripts to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.github', 'scripts')))
+
+import publisher
+from publisher import Doc, PublishingEngine, changed_docs, routing_prompt
+from provenance import ProvenanceIndex
+from docs_router import DocsRouter
+
+# pages-manager.py uses a hyphen, so load it with importlib
+import importlib.util
+spec = importlib.util.spec_from_file_location(
+    "pages_manager", os.path.join(os.path.dirname(__file__), '..', '.github', 'scripts', 'pages-manager.py'))
+pages_manager = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(pages_manager)
+
+
+class FakeTarget:
+    def __init__(self, name, known=None):
+        self.name = name
+        self.known = known or {}
+        self.published = []
+        self.finished = None
+
+    def rule_route(self, doc, rule):
+        return rule.get(self.name)
+
+    def known_route(self, doc):
+        return self.known.get(doc.source)
+
+    def routing_context(self):
+        return f"### Target {self.name}"
+
+    def routing_prompt(self, doc):
+        return f"{self.name} notes for {doc.source}"
+
+    def routing_schema(self):
+        return '{"page": "Name"}'
+
+    def parse_route(self, doc, answer):
+        if not answer.get('page'):
+            raise ValueError("no page")
+        return answer['page']
+
+    def fallback_route(self, doc):
+        return 'fallback'
+
+    def publish(self, doc, route):
+        self.published.append((doc.source, route))
+        return [{'file': doc.source, 'page': route}]
+
+    def finish(self, changes):
+        self.finished = changes
+
+
+class FakeClient:
+    """Returns the given responses in turn (the last one repeats)"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    @property
+    def calls(self):
+        return len(self.prompts)
+
+    def call_chat(self, **kwargs):
+        self.prompts.append(kwargs['messages'][-1]['content'])
+        response = self.responses[min(len(self.prompts), len(self.responses)) - 1]
+        return json.dumps(response) if response is not None else None
+
+
+class TestPublishingEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.provenance = ProvenanceIndex(self.tmp / 'provenance.json')
+        self.docs = []
+        for name in ('auth', 'db'):
+            doc = self.tmp / f"{name}.md"
+            doc.write_text(f"# {name}.py\n\n*Auto-generated from `src/{name}.py`*\n")
+            self.docs.append(str(doc))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def publish(self, targets, *responses, router=None):
+        client = FakeClient(*responses)
+        with mock.patch.object(publisher, 'get_client', return_value=client):
+            engine = PublishingEngine(targets, self.provenance, router or DocsRouter([]))
+            changes = engine.publish(self.docs)
+        return changes, client
+
+    def test_one_call_for_all_docs_and_targets(self):
+        pages, wiki = FakeTarget('pages'), FakeTarget('wiki')
+        decision = {'pages': {'page': 'api/x.md'}, 'wiki': {'page': 'X'}}
+        changes, client = self.publish([pages, wiki], {'1': decision, '2': decision})
+
+        self.assertEqual(client.calls, 1)
+        self.assertEqual(pages.published, [('src/auth.py', 'api/x.md'), ('src/db.py', 'api/x.md')])
+        self.assertEqual(wiki.published, [('src/auth.py', 'X'), ('src/db.py', 'X')])
+        self.assertEqual(len(changes['wiki']), 2)
+        self.assertEqual(wiki.finished, changes['wiki'])
+
+    def test_known_routes_skip_the_llm(self):
+        pages = FakeTarget('pages', known={'src/auth.py': 'api/auth.md', 'src/db.py': 'api/db.md'})
+        wiki = FakeTarget('wiki', known={'src/auth.py': 'Auth'})
+        _, client = self.publish([pages, wiki], {'1': {'wiki': {'page': 'Data'}}})
+
+        # Only db.py's wiki page was unknown
+        self.assertEqual(client.calls, 1)
+        self.assertEqual(wiki.published, [('src/auth.py', 'Auth'), ('src/db.py', 'Data')])
+
+    def test_rules_route_before_the_llm(self):
+        router = DocsRouter([{'glob': '**/auth*', 'pages': 'api/authentication.md', 'wiki': 'Authentication-API'}])
+        pages, wiki = FakeTarget('pages'), FakeTarget('wiki')
+        _, client = self.publish([pages, wiki], {'1': {'pages': {'page': 'api/db.md'}, 'wiki': {'page': 'Data'}}},
+                                 router=router)
+
+        # auth.py is fully rule-routed; only db.py needs the LLM
+        self.assertEqual(client.calls, 1)
+        self.assertEqual(wiki.published, [('src/auth.py', 'Authentication-API'), ('src/db.py', 'Data')])
+        self.assertEqual(router.stats, {'matched': 1, 'unmatched': 1})
+
+    def test_rules_only_as_fallback(self):
+        router = DocsRouter([{'glob': '**/auth*', 'wiki': 'Authentication-API'}],
+                            {'prefer_rules': False, 'llm_fallback': False})
+        wiki = FakeTarget('wiki')
+        _, client = self.publish([wiki], {'1': {'wiki': {'page': 'X'}}}, router=router)
+
+        self.assertEqual(client.calls, 0)
+        self.assertEqual(wiki.published, [('src/auth.py', 'Authentication-API'), ('src/db.py', 'fallback')])
+
+    def test_only_failed_items_are_retried(self):
+        pages, wiki = FakeTarget('pages'), FakeTarget('wiki')
+        batch = {'1': {'pages': {'page': 'api/auth.md'}, 'wiki': {'page': 'Auth'}},
+                 '2': {'pages': {'page': 'api/db.md'}, 'wiki': {'page': ''}}}
+        _, client = self.publish([pages, wiki], batch, {'1': {'wiki': {'page': 'Data'}}})
+
+        # db.py is re-asked on its own, for the wiki only
+        self.assertEqual(client.calls, 2)
+        self.assertIn('Decide for: wiki\n', client.prompts[1])
+        self.assertNotIn('src/auth.py', client.prompts[1])
+        self.assertEqual(pages.published, [('src/auth.py', 'api/auth.md'), ('src/db.py', 'api/db.md')])
+        self.assertEqual(wiki.published, [('src/auth.py', 'Auth'), ('src/db.py', 'Data')])
+
+    def test_invalid_answer_falls_back_per_target(self):
+        pages, wiki = FakeTarget('pages'), FakeTarget('wiki')
+        self.publish([pages, wiki], {'1': {'pages': {'page': 'api/x.md'}, 'wiki': {'page': ''}}})
+
+        self.assertEqual(pages.published[0][1], 'api/x.md')
+        self.assertEqual(wiki.published[0][1], 'fallback')
+
+    def test_llm_failure_falls_back(self):
+        wiki = FakeTarget('wiki')
+        _, client = self.publish([wiki], None)
+
+        # No answer at all: nothing to gain from re-asking per doc
+        self.assertEqual(client.calls, 1)
+        self.assertEqual([route for _, route in wiki.published], ['fallback', 'fallback'])
+
+    def test_batches_are_bounded(self):
+        for i in range(publisher.ROUTING_BATCH_SIZE):
+            doc = self.tmp / f"extra{i}.md"
+            doc.write_text(f"*Auto-generated from `src/extra{i}.py`*\n")
+            self.docs.append(str(doc))
+        answer = {str(n): {'wiki': {'page': 'X'}} for n in range(1, publisher.ROUTING_BATCH_SIZE + 1)}
+        wiki = FakeTarget('wiki')
+        _, client = self.publish([wiki], answer)
+
+        self.assertEqual(client.calls, 2)
+        self.assertEqual(len(wiki.published), publisher.ROUTING_BATCH_SIZE + 2)
+        self.assertEqual({route for _, route in wiki.published}, {'X'})
+
+    def test_single_item_answer_without_id(self):
+        wiki = FakeTarget('wiki')
+        with mock.patch.object(publisher, 'get_client', return_value=FakeClient({'wiki': {'page': 'Auth'}})):
+            engine = PublishingEngine([wiki], self.provenance, DocsRouter([]))
+            routes = engine.route(Doc('docs/auth.md', '# Auth', 'src/auth.py'))
+        self.assertEqual(routes, {'wiki': 'Auth'})
+
+    def test_prompt_has_every_item_and_target(self):
+        pages, wiki = FakeTarget('pages'), FakeTarget('wiki')
+        prompt = routing_prompt([(Doc('docs/auth.md', '# Auth', 'src/auth.py'), [pages, wiki]),
+                                 (Doc('docs/db.md', '# DB', 'src/db.py'), [wiki])])
+
+        # Target instructions appear once; doc-specific notes per item
+        self.assertEqual(prompt.count('### Target wiki'), 1)
+        self.assertIn('## Item "1": src/auth.py\nDecide for: pages, wiki', prompt)
+        self.assertIn('## Item "2": src/db.py\nDecide for: wiki', prompt)
+        self.assertIn('pages notes for src/auth.py', prompt)
+        self.assertNotIn('pages notes for src/db.py', prompt)
+        self.assertIn('"wiki": {"page": "Name"}', prompt)
+
+
+class TestChangedDocs(unittest.TestCase):
+    def test_maps_changed_sources_to_docs(self):
+        tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+        (tmp / 'docs').mkdir()
+        (tmp / 'docs' / 'auth.md').write_text('# auth')
+        (tmp / 'changed_files.txt').write_text('src/auth.py\nlib/auth.ts\nsrc/missing.py\n')
+
+        self.assertEqual(changed_docs(str(tmp / 'changed_files.txt'), tmp / 'docs'), [str(tmp / 'docs' / 'auth.md')])
+
+
+class TestPagesRouting(unittest.TestCase):
+    def setUp(self):
+        self.manager = pages_manager.PagesManager.__new__(pages_manager.PagesManager)
+        self.doc = Doc('docs/auth.md', '# Auth', 'src/auth.py')
+
+    def test_parse_route_validates_each_perspective(self):
+        routes = self.manager.parse_route(self.doc, [
+            {'type': 'api', 'action': 'CREATE', 'page_path': 'auth.md'},
+            {'type': 'module', 'action': 'append', 'page_path': 'modules/auth.md', 'section_title': 'Login'},
+            {'type': 'unknown', 'action': 'create', 'page_path': 'x/y.md'},
+            {'type': 'feature', 'action': 'delete', 'page_path': 'features/auth.md'},
+        ])
+
+        self.assertEqual([(r['page_path'], r['action']) for r in routes],
+                         [('api/auth.md', 'create'), ('modules/auth.md', 'append')])
+        self.assertEqual(routes[1]['section_title'], 'Login')
+
+    def test_parse_route_rejects_empty(self):
+        with self.assertRaises(ValueError):
+            self.manager.parse_route(self.doc, [{'type': 'bogus'}])
+
+
+class TestPagesAppend(unittest.TestCase):
+    def setUp(self):
+        self.manager = pages_manager.PagesManager.__new__(pages_manager.PagesManager)
+        self.manager.merge_stats = {'structural': 0, 'llm': 0, 'appended': 0}
+        with open(os.path.join(os.path.dirname(__file__), '..', 'docs', 'auth.md'), encoding='utf-8') as f:
+            self.doc = pages_manager.single_root(f.read())
+
+    def test_append_is_deterministic(self):
+        page = "---\ntitle: Auth\n---\n\n# Authentication\n\nIntro.\n"
+        with mock.patch.object(pages_manager, 'get_client', side_effect=AssertionError("no LLM on append")):
+            first = self.manager._append_or_update(page, self.doc, 'Sessions')
+            regenerated = self.doc.replace('minimal, type‑safe API', 'small, typed API')
+            second = self.manager._append_or_update(first, regenerated, 'Sessions')
+
+        self.assertIn("## Sessions\n\n### auth.ts", first)
+        self.assertEqual(self.manager.merge_stats, {'structural': 1, 'llm': 0, 'appended': 1})
+        self.assertEqual(second.count('Authentication Module'), 1)
+        self.assertEqual(second.count('## Sessions'), 1)
+        self.assertIn('small, typed API', second)
+
+    def test_conflicting_append_adds_a_section(self):
+        page = "# auth.ts\n\nHand-written notes.\n"
+        merged = self.manager._append_or_update(page, self.doc, None)
+
+        self.assertTrue(merged.startswith(page))
+        self.assertEqual(self.manager.merge_stats['appended'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import json
+import sys
+import os
+
+# Add scripts to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.github', 'scripts')))
+
+from search_index import (
+    SearchIndexBuilder, tokenize, stem, encode_postings, decode_postings, DOC_BLOCK
+)
+
+class TestTokenizer(unittest.TestCase):
+    def test_splits_identifiers_and_stems(self):
+        tokens = tokenize("validateToken handles expired_tokens and Processing")
+        self.assertEqual(tokens, ['validate', 'token', 'handl', 'expir', 'token', 'process'])
+
+    def test_short_words_keep_their_suffix(self):
+        self.assertEqual(stem('uses'), 'use')
+        self.assertEqual(stem('bed'), 'bed')
+
+class TestPostings(unittest.TestCase):
+    def test_delta_roundtrip(self):
+        postings = [(3, 1), (10, 4), (11, 2), (500, 1)]
+        encoded = encode_postings(postings)
+
+        self.assertEqual(encoded, [3, 1, 7, 4, 1, 2, 489, 1])
+        self.assertEqual(decode_postings(encoded), postings)
+
+class TestSearchIndexBuilder(unittest.TestCase):
+    def test_sharded_layout(self):
+        builder = SearchIndexBuilder()
+        builder.add('auth.html', 'auth', "# Auth\n\nValidates tokens for the login flow.")
+        builder.add('database.html', 'database', "# Database\n\nConnection pooling and tokens.")
+        files = builder.build()
+
+        meta = json.loads(files['meta.json'])
+        self.assertEqual(meta['docs'], 2)
+        self.assertIn('to', meta['shards'])
+
+        shard = json.loads(files['t/to.json'])
+        self.assertEqual(decode_postings(shard['token']), [(0, 1), (1, 1)])
+        # Title terms are weighted
+        self.assertGreater(decode_postings(json.loads(files['t/au.json'])['auth'])[0][1], 1)
+
+        docs = json.loads(files['d/0.json'])
+        self.assertEqual(docs[1][:2], ['database.html', 'database'])
+
+    def test_doc_blocks(self):
+        builder = SearchIndexBuilder()
+        for i in range(DOC_BLOCK + 1):
+            builder.add(f"p{i}.html", f"p{i}", "text")
+        files = builder.build()
+
+        self.assertIn('d/1.json', files)
+        self.assertEqual(len(json.loads(files['d/1.json'])), 1)
+
+if __name__ == '__main__':
+    unittest.main()
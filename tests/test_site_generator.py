@@ -0,0 +1,328 @@
+import unittest
+import json
+import shutil
+import tempfile
+import sys
+import os
+from pathlib import Path
+from unittest import mock
+
+# Add scripts to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.github', 'scripts')))
+
+import site_generator
+
+class TestIncrementalBuild(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.docs = Path(self.test_dir) / 'docs'
+        self.site = Path(self.test_dir) / 'docs-site'
+        self.docs.mkdir()
+        (self.docs / 'alpha.md').write_text("# Alpha\n\nFirst page", encoding='utf-8')
+        (self.docs / 'beta.md').write_text("# Beta\n\nSecond page", encoding='utf-8')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def build(self, **kwargs):
+        return site_generator.build_site(self.docs, self.site, **kwargs)
+
+    def test_first_build_renders_everything(self):
+        stats = self.build()
+        self.assertEqual(sorted(stats['rendered']), ['alpha', 'beta'])
+        self.assertTrue((self.site / 'alpha.html').exists())
+        self.assertTrue((self.site / 'index.html').exists())
+        self.assertTrue((self.site / site_generator.MANIFEST_NAME).exists())
+
+    def test_rebuild_only_touches_changed_page(self):
+        self.build()
+        (self.docs / 'beta.md').write_text("# Beta\n\nEdited", encoding='utf-8')
+
+        stats = self.build()
+        self.assertEqual(stats['rendered'], ['beta'])
+        self.assertEqual(stats['unchanged'], ['alpha'])
+        self.assertIn('Edited', (self.site / 'beta.html').read_text(encoding='utf-8'))
+
+    def test_page_set_change_re_emits_nav(self):
+        self.build()
+        (self.docs / 'gamma.md').write_text("# Gamma", encoding='utf-8')
+
+        stats = self.build()
+        self.assertEqual(sorted(stats['rendered']), ['alpha', 'beta', 'gamma'])
+        self.assertIn('gamma.html', (self.site / 'alpha.html').read_text(encoding='utf-8'))
+
+    def test_removed_source_deletes_only_its_output(self):
+        # pages-manager writes markdown into the same directory
+        (self.site / 'api').mkdir(parents=True)
+        (self.site / 'api' / 'auth.md').write_text("# Auth", encoding='utf-8')
+        (self.site / 'notes.html').write_text("hand written", encoding='utf-8')
+        self.build()
+
+        (self.docs / 'beta.md').unlink()
+        stats = self.build()
+
+        self.assertIn('beta.html', stats['removed'])
+        self.assertFalse((self.site / 'beta.html').exists())
+        self.assertTrue((self.site / 'api' / 'auth.md').exists())
+        self.assertTrue((self.site / 'notes.html').exists())
+
+    def test_split_page_parts_are_searchable(self):
+        sections = ''.join(f"## Part {word}\n\n{word} " + "filler text. " * 20 + "\n\n"
+                           for word in ('aardvark', 'zebra', 'quokka'))
+        (self.docs / 'long.md').write_text("# Long\n\n" + sections, encoding='utf-8')
+
+        def docs():
+            return {url: title for url, title, _ in json.loads((self.site / 'search' / 'd' / '0.json').read_text(encoding='utf-8'))}
+
+        def shard_urls(term):
+            urls = list(docs())
+            postings = json.loads((self.site / 'search' / 't' / f'{term[:2]}.json').read_text(encoding='utf-8'))[term]
+            doc_id, found = 0, []
+            for delta in postings[::2]:
+                doc_id += delta
+                found.append(urls[doc_id])
+            return found
+
+        with mock.patch.object(site_generator, 'SPLIT_PAGE_SIZE', 500), \
+                mock.patch.object(site_generator, 'SPLIT_PART_SIZE', 300):
+            self.build()
+            self.assertEqual(docs()['long--4.html'], 'long (4/4)')
+            self.assertEqual(shard_urls('quokka'), ['long--4.html'])
+
+            # Still indexed part by part when only another page changed
+            (self.docs / 'beta.md').write_text("# Beta\n\nEdited", encoding='utf-8')
+            self.assertEqual(self.build()['rendered'], ['beta'])
+            self.assertEqual(shard_urls('zebra'), ['long--3.html'])
+            self.assertNotIn('long.html', shard_urls('quokka'))
+
+    def test_search_index_tracks_page_changes(self):
+        self.build()
+        meta = json.loads((self.site / 'search' / 'meta.json').read_text(encoding='utf-8'))
+        self.assertEqual(meta['docs'], 2)
+        self.assertTrue(list((self.site / 'assets').glob('search.*.js')))
+
+        (self.docs / 'beta.md').write_text("# Beta\n\nZebra crossing", encoding='utf-8')
+        self.build()
+        self.assertIn('"zebra"', (self.site / 'search' / 't' / 'ze.json').read_text(encoding='utf-8'))
+
+        (self.docs / 'beta.md').unlink()
+        self.build()
+        self.assertFalse((self.site / 'search' / 't' / 'ze.json').exists())
+
+    def test_tampered_output_is_regenerated(self):
+        self.build()
+        (self.site / 'alpha.html').write_text("broken", encoding='utf-8')
+
+        stats = self.build()
+        self.assertEqual(stats['rendered'], ['alpha'])
+
+    def test_assets_are_fingerprinted_and_pages_reference_them(self):
+        self.build()
+        styles = list((self.site / 'assets').glob('styles.*.css'))
+        self.assertEqual(len(styles), 1)
+        self.assertIn(f'href="assets/{styles[0].name}"', (self.site / 'alpha.html').read_text(encoding='utf-8'))
+        self.assertIn('immutable', (self.site / '_headers').read_text(encoding='utf-8'))
+        self.assertNotIn('highlight.js', (self.site / 'alpha.html').read_text(encoding='utf-8'))
+
+    def test_changed_asset_gets_new_name_and_old_one_is_removed(self):
+        self.build()
+        old = next((self.site / 'assets').glob('styles.*.css')).name
+
+        original = site_generator.CSS_STYLES
+        site_generator.CSS_STYLES = original + "\nbody { margin: 1px; }"
+        try:
+            stats = self.build()
+        finally:
+            site_generator.CSS_STYLES = original
+
+        self.assertIn(f'assets/{old}', stats['removed'])
+        self.assertEqual(sorted(stats['rendered']), ['alpha', 'beta'])
+
+    def test_vendored_asset_served_locally(self):
+        vendor = Path(self.test_dir) / 'vendor'
+        vendor.mkdir()
+        (vendor / 'mermaid.min.js').write_text("/* mermaid */", encoding='utf-8')
+
+        assets = site_generator.site_assets(vendor)
+        href, data = assets['mermaid.min.js']
+        self.assertRegex(href, r'^assets/mermaid\.min\.[0-9a-f]{8}\.js$')
+        self.assertEqual(data, b"/* mermaid */")
+
+    def test_missing_vendored_asset_is_not_downloaded(self):
+        vendor = Path(self.test_dir) / 'vendor'
+        href, data = site_generator.site_assets(vendor)['mermaid.min.js']
+
+        self.assertEqual(href, site_generator.VENDOR_ASSETS['mermaid.min.js'])
+        self.assertIsNone(data)
+        self.assertFalse(vendor.exists())
+
+    def test_vendor_assets_are_committed(self):
+        for name in site_generator.VENDOR_ASSETS:
+            self.assertTrue((site_generator.VENDOR_DIR / name).is_file(), name)
+
+    def test_compressed_siblings_follow_outputs(self):
+        (self.docs / 'beta.md').write_text("# Beta\n\n" + "Long paragraph. " * 200, encoding='utf-8')
+        stats = self.build()
+
+        self.assertTrue((self.site / 'beta.html.gz').exists())
+        self.assertLess(stats['bytes']['gzip'], stats['bytes']['raw'])
+        report = json.loads((self.site / site_generator.SIZE_REPORT_NAME).read_text(encoding='utf-8'))
+        self.assertIn('beta.html', report['files'])
+
+        (self.docs / 'beta.md').unlink()
+        self.build()
+        self.assertFalse((self.site / 'beta.html.gz').exists())
+
+    def test_unchanged_outputs_are_not_recompressed(self):
+        (self.docs / 'beta.md').write_text("# Beta\n\n" + "Long paragraph. " * 200, encoding='utf-8')
+        self.build()
+        gz = self.site / 'beta.html.gz'
+        os.utime(gz, (0, 0))
+
+        self.build()
+        self.assertEqual(gz.stat().st_mtime, 0)
+
+    def test_oversized_page_split_into_parts(self):
+        sections = "".join(f"## Section {i}\n\n" + "Some text. " * 400 + "\n\n" for i in range(12))
+        (self.docs / 'beta.md').write_text("# Beta\n\nIntro\n\n" + sections, encoding='utf-8')
+        original = site_generator.SPLIT_PAGE_SIZE, site_generator.SPLIT_PART_SIZE
+        site_generator.SPLIT_PAGE_SIZE, site_generator.SPLIT_PART_SIZE = 20_000, 10_000
+        try:
+            self.build()
+            first = (self.site / 'beta.html').read_text(encoding='utf-8')
+            self.assertIn('href="beta--2.html#section-3"', first)
+            self.assertIn('id="section-0"', first)
+            self.assertTrue((self.site / 'beta--2.html').exists())
+
+            (self.docs / 'beta.md').write_text("# Beta\n\nShort now", encoding='utf-8')
+            stats = self.build()
+        finally:
+            site_generator.SPLIT_PAGE_SIZE, site_generator.SPLIT_PART_SIZE = original
+
+        self.assertIn('beta--2.html', stats['removed'])
+        self.assertFalse((self.site / 'beta--2.html').exists())
+
+    def test_diagram_loader_only_on_pages_with_diagrams(self):
+        (self.docs / 'beta.md').write_text("# Beta\n\n```mermaid\ngraph TD\n  A-->B\n```", encoding='utf-8')
+        self.build()
+
+        self.assertIn('data-mermaid=', (self.site / 'beta.html').read_text(encoding='utf-8'))
+        self.assertNotIn('mermaid', (self.site / 'alpha.html').read_text(encoding='utf-8'))
+
+class TestMinify(unittest.TestCase):
+    def test_html_whitespace_collapsed_outside_pre(self):
+        page = "<ul>\n    <li><a href='a'>A</a>  text</li>\n</ul>\n<!-- note -->\n<pre>  keep\n   this</pre>"
+        self.assertEqual(site_generator.minify_html(page),
+                         "<ul><li><a href='a'>A</a> text</li></ul><pre>  keep\n   this</pre>")
+
+    def test_css_minified(self):
+        css = "/* c */\n.a, .b > p {\n    color: red;\n    margin: 0 auto;\n}\n"
+        self.assertEqual(site_generator.minify_css(css), ".a,.b>p{color:red;margin:0 auto}")
+
+    def test_minified_page_keeps_code_block(self):
+        html = site_generator.markdown_to_html("```python\nif x:\n    y = 1\n```")
+        self.assertIn(html, site_generator.minify_html(f"<article>\n  {html}\n</article>"))
+
+class TestPaginate(unittest.TestCase):
+    def test_small_page_untouched(self):
+        self.assertEqual(site_generator.paginate('p', '<h2>A</h2><p>x</p>'), [('p.html', '<h2>A</h2><p>x</p>')])
+
+    def test_sections_packed_and_anchored(self):
+        body = '<p>intro</p>' + ''.join(f'<h2>Setup</h2><p>{"x" * 50}</p>' for _ in range(6))
+        parts = site_generator.paginate('p', body, max_size=100, part_size=220)
+
+        self.assertEqual([f for f, _ in parts], ['p.html', 'p--2.html', 'p--3.html'])
+        self.assertIn('<h2 id="setup-2">Setup</h2>', parts[0][1])
+        self.assertIn('href="p--3.html#setup-6"', parts[0][1])
+        self.assertIn('<li class="current"><a href="p--2.html">', parts[1][1])
+
+    def test_raw_html_block_is_not_cut(self):
+        block = '<details>\n<summary>More</summary>\n<h2>Inside</h2>\n<p>' + 'y' * 80 + '</p>\n</details>'
+        body = f'<h2>One</h2>\n<p>{"x" * 80}</p>\n{block}\n<h2>Two</h2>\n<p>{"z" * 80}</p>'
+        parts = site_generator.split_sections(body, max_size=100, part_size=50)
+
+        self.assertEqual(''.join(parts), body)
+        self.assertEqual(len(parts), 2)
+        self.assertTrue(parts[0].endswith('</details>\n'))
+        self.assertTrue(parts[1].startswith('<h2>Two</h2>'))
+
+class TestNavigation(unittest.TestCase):
+    def test_compiled_template_matches_format(self):
+        values = dict(title='t', page='t', nav_group='t', styles_href='s.css', diagram_script='', search_src='q.js',
+                      active_index='', nav_links='<li>x</li>', nav_script='',
+                      breadcrumbs='Docs > t', date='2025-01-01', content='<p>body</p>')
+        self.assertEqual(site_generator.PAGE_TEMPLATE.render(**values), site_generator.HTML_TEMPLATE.format(**values))
+
+    def test_active_link_spliced_per_page(self):
+        nav = site_generator.Navigation(['alpha', 'beta', 'gamma'])
+        page = nav.for_page('beta')
+
+        self.assertEqual(page.count('class="active"'), 1)
+        self.assertIn('<a href="beta.html" class="active">beta</a>', page)
+        self.assertNotIn('active', nav.html)
+
+    def test_lazy_nav_json(self):
+        files = site_generator.nav_json_files(['debug_api', 'debug_ts', 'llm'])
+        tree = json.loads(files['nav.json'])
+
+        self.assertEqual([(g['name'], g['count']) for g in tree['groups']], [('debug', 2), ('llm', 1)])
+        self.assertEqual(json.loads(files[tree['groups'][0]['src']]), ['debug_api', 'debug_ts'])
+
+class TestLazyNavBuild(TestIncrementalBuild):
+    def build(self, **kwargs):
+        return site_generator.build_site(self.docs, self.site, lazy_nav=True, **kwargs)
+
+    def test_pages_do_not_inline_nav(self):
+        self.build()
+        page = (self.site / 'alpha.html').read_text(encoding='utf-8')
+
+        self.assertNotIn('beta.html', page)
+        self.assertRegex(page, r'assets/nav\.[0-9a-f]{8}\.js')
+        self.assertTrue((self.site / 'nav.json').exists())
+
+    def test_page_set_change_re_emits_nav(self):
+        self.build()
+        (self.docs / 'gamma.md').write_text("# Gamma", encoding='utf-8')
+        self.build()
+
+        self.assertIn('"gamma"', (self.site / 'nav.json').read_text(encoding='utf-8'))
+
+    def test_switching_back_to_inline_removes_nav_files(self):
+        self.build()
+        site_generator.build_site(self.docs, self.site, lazy_nav=False)
+
+        self.assertFalse((self.site / 'nav.json').exists())
+        self.assertIn('beta.html', (self.site / 'alpha.html').read_text(encoding='utf-8'))
+
+class TestParallelRendering(unittest.TestCase):
+    def test_parallel_matches_serial(self):
+        docs = [f"# Page {i}\n\n| a | b |\n|---|---|\n| {i} | x |\n\n```python\nprint({i})\n```\n" for i in range(40)]
+
+        serial = site_generator.render_markdown_batch(docs, workers=1)
+        parallel = site_generator.render_markdown_batch(docs, workers=2)
+
+        self.assertEqual(serial, parallel)
+        self.assertIn('<table>', serial[0])
+
+    def test_code_highlighted_at_build_time(self):
+        html = site_generator.markdown_to_html("```python\ndef f():\n    return 1\n```")
+
+        self.assertIn('class="highlight"', html)
+        self.assertIn('<span class="k">def</span>', html)
+
+    def test_mermaid_fence_left_for_mermaid(self):
+        html = site_generator.markdown_to_html("Intro\n\n```mermaid\ngraph TD\n  A-->B\n```\n\nAfter")
+
+        self.assertIn('<pre class="mermaid">graph TD\n  A--&gt;B</pre>', html)
+        self.assertNotIn('highlight', html)
+        self.assertIn('<p>After</p>', html)
+
+    def test_reused_instance_does_not_leak_state(self):
+        first = site_generator.markdown_to_html("[ref]: http://example.com\n\n[link][ref]")
+        second = site_generator.markdown_to_html("[link][ref]")
+
+        self.assertIn('href="http://example.com"', first)
+        self.assertNotIn('href', second)
+
+if __name__ == '__main__':
+    unittest.main()
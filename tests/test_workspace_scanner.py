@@ -0,0 +1,92 @@
+import unittest
+import shutil
+import tempfile
+import sys
+import os
+import subprocess
+from pathlib import Path
+
+# Add scripts to path (polyglot is a package)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.github', 'scripts')))
+
+from polyglot.workspace_scanner import WorkspaceScanner, IgnoreRules
+
+class TestWorkspaceScanner(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.root = Path(self.test_dir)
+
+        (self.root / "main.py").write_text("import utils", encoding="utf-8")
+        (self.root / "utils.py").write_text("def helper(): pass", encoding="utf-8")
+        (self.root / "notes.txt").write_text("not code", encoding="utf-8")
+
+        # Always-pruned directories
+        (self.root / "node_modules" / "pkg").mkdir(parents=True)
+        (self.root / "node_modules" / "pkg" / "index.js").write_text("export const x = 1;", encoding="utf-8")
+        (self.root / ".llm-cache").mkdir()
+        (self.root / ".llm-cache" / "junk.py").write_text("x = 1", encoding="utf-8")
+
+        # .gitignore-driven exclusions
+        (self.root / ".gitignore").write_text("generated/\n*.gen.ts\n!keep.gen.ts\n", encoding="utf-8")
+        (self.root / "generated").mkdir()
+        (self.root / "generated" / "out.py").write_text("x = 1", encoding="utf-8")
+        (self.root / "api.gen.ts").write_text("export const a = 1;", encoding="utf-8")
+        (self.root / "keep.gen.ts").write_text("export const b = 1;", encoding="utf-8")
+
+        # Oversized file
+        (self.root / "huge.py").write_text("x = 1\n" * 1000, encoding="utf-8")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_walk_fallback_prunes_and_honours_gitignore(self):
+        scanner = WorkspaceScanner(self.test_dir, max_file_size=1000)
+        files = scanner.list_files()
+
+        self.assertEqual(files, ['keep.gen.ts', 'main.py', 'utils.py'])
+        self.assertIn('huge.py', scanner.skipped)
+
+    def test_git_tracked_files_are_kept(self):
+        # build/, env/... are only pruned when walking; tracked sources there are real code
+        (self.root / "tools" / "build").mkdir(parents=True)
+        (self.root / "tools" / "build" / "gen.py").write_text("x = 1", encoding="utf-8")
+        (self.root / "src" / "env").mkdir(parents=True)
+        (self.root / "src" / "env" / "settings.py").write_text("x = 1", encoding="utf-8")
+        (self.root / ".gitignore").write_text("node_modules/\n.llm-cache/\ngenerated/\n", encoding="utf-8")
+        try:
+            subprocess.run(['git', 'init', '-q'], cwd=self.root, check=True)
+            subprocess.run(['git', 'add', 'main.py', 'tools', 'src'], cwd=self.root, check=True)
+        except (OSError, subprocess.CalledProcessError):
+            self.skipTest("git unavailable")
+
+        files = WorkspaceScanner(self.test_dir, max_file_size=1000).list_files()
+        self.assertIn('tools/build/gen.py', files)
+        self.assertIn('src/env/settings.py', files)
+        self.assertNotIn('node_modules/pkg/index.js', files)
+
+    def test_scan_in_process(self):
+        scanner = WorkspaceScanner(self.test_dir, max_file_size=1000)
+        file_map = scanner.scan(workers=1)
+
+        self.assertEqual(sorted(file_map), ['keep.gen.ts', 'main.py', 'utils.py'])
+        self.assertIn('utils', file_map['main.py']['imports'])
+        self.assertIn('helper', file_map['utils.py']['symbols'])
+
+    def test_scan_process_pool_matches_serial(self):
+        for i in range(80):
+            (self.root / f"mod_{i}.py").write_text(f"import utils\ndef f{i}(): pass", encoding="utf-8")
+
+        serial = WorkspaceScanner(self.test_dir).scan(workers=1)
+        parallel = WorkspaceScanner(self.test_dir).scan(workers=2)
+
+        self.assertEqual(serial, parallel)
+
+    def test_ignore_rules_anchored(self):
+        rules = IgnoreRules()
+        rules.rules.append(('', 'docs/build', False, False, True))
+
+        self.assertTrue(rules.is_ignored('docs/build', True))
+        self.assertFalse(rules.is_ignored('src/docs/build', True))
+
+if __name__ == '__main__':
+    unittest.main()